@@ -0,0 +1,71 @@
+from datetime import datetime
+from sqlalchemy import Table, Column, Integer, String, MetaData
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from etl_project.connectors.postgresql import PostgreSqlClient
+
+
+class ApiUsageLogging:
+    """
+    Accumulates the api credits used per provider and calendar month in a table of the logging database.
+    monthly_quotas optionally maps a provider to the number of credits its plan allows per month.
+    """
+
+    def __init__(
+        self,
+        postgresql_client: PostgreSqlClient,
+        monthly_quotas: dict = {},
+        usage_table_name: str = "api_usage",
+    ):
+        self.monthly_quotas = monthly_quotas
+        self.usage_table_name = usage_table_name
+        self.postgresql_client = postgresql_client
+        self.metadata = MetaData()
+        self.table = Table(
+            self.usage_table_name,
+            self.metadata,
+            Column("provider", String, primary_key=True),
+            Column("month", String, primary_key=True),
+            Column("credits", Integer),
+            Column("updated_at", String),
+        )
+        self.postgresql_client.create_all_tables(metadata=self.metadata)
+
+    def log(self, provider: str, credits: int, timestamp: datetime = None) -> int:
+        """
+        Adds credits to the provider's total for the month of timestamp (now by default).
+
+        Returns:
+            int: The provider's total credits for the month.
+        """
+        timestamp = datetime.now() if timestamp is None else timestamp
+        month = timestamp.strftime("%Y-%m")
+        insert_statement = postgresql.insert(self.table).values(
+            provider=provider, month=month, credits=credits, updated_at=timestamp
+        )
+        upsert_statement = insert_statement.on_conflict_do_update(
+            index_elements=["provider", "month"],
+            set_={
+                "credits": self.table.c.credits + insert_statement.excluded.credits,
+                "updated_at": insert_statement.excluded.updated_at,
+            },
+        ).returning(self.table.c.credits)
+        return self.postgresql_client.engine.execute(upsert_statement).scalar()
+
+    def is_over_quota(self, provider: str, credits: int) -> bool:
+        """
+        Returns whether a monthly credit total exceeds the provider's monthly quota, if it has one.
+        """
+        monthly_quota = self.monthly_quotas.get(provider)
+        return monthly_quota is not None and credits > monthly_quota
+
+    def get_credits(self, provider: str, month: str) -> int:
+        """
+        Returns the credits used by a provider in a month ("YYYY-MM").
+        """
+        credits = self.postgresql_client.engine.execute(
+            select(self.table.c.credits).where(
+                (self.table.c.provider == provider) & (self.table.c.month == month)
+            )
+        ).scalar()
+        return 0 if credits is None else credits
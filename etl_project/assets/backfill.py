@@ -0,0 +1,74 @@
+from datetime import datetime
+import pandas as pd
+from sqlalchemy import Table, Column, String, MetaData
+from sqlalchemy import insert, select
+from etl_project.connectors.postgresql import PostgreSqlClient
+
+
+def get_partitions(start_date: str, end_date: str, partition_days: int) -> list[tuple[str, str]]:
+    """
+    Splits the date range [start_date, end_date] into consecutive partitions of at most partition_days days.
+
+    Args:
+        start_date: first date in the format "YYYY-MM-DD"
+        end_date: last date in the format "YYYY-MM-DD"
+        partition_days: maximum number of days per partition
+
+    Returns:
+        list[tuple[str, str]]: (partition_start, partition_end) pairs with inclusive bounds, oldest partition first.
+    """
+    if partition_days < 1:
+        raise Exception("partition_days must be at least 1.")
+    if start_date > end_date:
+        raise Exception(f"start_date '{start_date}' is after end_date '{end_date}'.")
+    dates = pd.date_range(start=start_date, end=end_date).strftime("%Y-%m-%d").tolist()
+    return [
+        (dates[i], dates[min(i + partition_days, len(dates)) - 1])
+        for i in range(0, len(dates), partition_days)
+    ]
+
+
+class BackfillCheckpoint:
+    """
+    Records the completed partitions of a backfill in a database table, so that an interrupted backfill
+    can be resumed without reloading the partitions that already succeeded.
+    """
+
+    def __init__(
+        self,
+        backfill_name: str,
+        postgresql_client: PostgreSqlClient,
+        checkpoint_table_name: str = "backfill_checkpoints",
+    ):
+        self.backfill_name = backfill_name
+        self.checkpoint_table_name = checkpoint_table_name
+        self.postgresql_client = postgresql_client
+        self.metadata = MetaData()
+        self.table = Table(
+            self.checkpoint_table_name,
+            self.metadata,
+            Column("backfill_name", String, primary_key=True),
+            Column("partition_start", String, primary_key=True),
+            Column("partition_end", String, primary_key=True),
+            Column("timestamp", String),
+        )
+        self.postgresql_client.create_all_tables(metadata=self.metadata)
+
+    def get_completed_partitions(self) -> set[tuple[str, str]]:
+        """Returns the (partition_start, partition_end) pairs that have completed."""
+        rows = self.postgresql_client.engine.execute(
+            select(self.table.c.partition_start, self.table.c.partition_end).where(
+                self.table.c.backfill_name == self.backfill_name
+            )
+        ).all()
+        return {(row.partition_start, row.partition_end) for row in rows}
+
+    def mark_completed(self, partition_start: str, partition_end: str) -> None:
+        """Records a partition as completed."""
+        insert_statement = insert(self.table).values(
+            backfill_name=self.backfill_name,
+            partition_start=partition_start,
+            partition_end=partition_end,
+            timestamp=datetime.now(),
+        )
+        self.postgresql_client.engine.execute(insert_statement)
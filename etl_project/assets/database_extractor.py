@@ -1,8 +1,11 @@
 from jinja2 import Environment
 from etl_project.connectors.postgresql import PostgreSqlClient
 from pathlib import Path
-from sqlalchemy import Table, MetaData
+from sqlalchemy import Table, MetaData, text
+from sqlalchemy.exc import StatementError
+import datetime
 import logging
+from typing import Iterator
 
 
 class SqlExtractConfig:
@@ -15,7 +18,12 @@ class SqlExtractConfig:
         source_table_name: str,
         extract_type: str = FULL_EXTRACT,
         incremental_column: str = None,
+        incremental_lookback: int = None,
     ):
+        """
+        incremental_lookback re-extracts the rows of the last incremental_lookback days (or units, for a numeric
+        incremental_column) before the target's max, so rows restated in the source within it are upserted again.
+        """
         if extract_type not in SqlExtractConfig.EXTRACT_TYPES:
             raise Exception(
                 f"Extract type '{extract_type}' is not supported. Please choose from {SqlExtractConfig.EXTRACT_TYPES}."
@@ -27,6 +35,7 @@ class SqlExtractConfig:
         self.source_table_name = source_table_name
         self.extract_type = extract_type
         self.incremental_column = incremental_column
+        self.incremental_lookback = incremental_lookback
 
 
 class SqlExtractParser:
@@ -55,6 +64,11 @@ class SqlExtractParser:
 
 
 class DatabaseTableExtractor:
+    PYTHON_TRANSFER = "python"
+    PUSHDOWN_TRANSFER = "pushdown"
+    AUTO_TRANSFER = "auto"
+    TRANSFER_MODES = [PYTHON_TRANSFER, PUSHDOWN_TRANSFER, AUTO_TRANSFER]
+
     def __init__(
         self,
         sql_extract_parser: SqlExtractParser,
@@ -65,48 +79,193 @@ class DatabaseTableExtractor:
         self.source_postgresql_client = source_postgresql_client
         self.target_postgresql_client = target_postgresql_client
 
-    def _full_extract(self) -> list[dict]:
-        return self.source_postgresql_client.run_sql(
-            self.sql_extract_parser.get_templated_sql(is_incremental=False)
-        )
+    def _get_full_extract_sql(self) -> str:
+        return self.sql_extract_parser.get_templated_sql(is_incremental=False)
+
+    def _get_incremental_value(self):
+        incremental_value = self._get_watermark()
+        lookback = self.sql_extract_parser.config.incremental_lookback
+        if incremental_value is None or lookback is None:
+            return incremental_value
+        if isinstance(incremental_value, (datetime.date, datetime.datetime)):
+            return incremental_value - datetime.timedelta(days=lookback)
+        return incremental_value - lookback
 
-    def _get_incremental_value(self) -> str:
+    def _get_watermark(self):
+        table_name = self.sql_extract_parser.config.source_table_name
+        incremental_column = self.sql_extract_parser.config.incremental_column
+        target_table, _ = self.target_postgresql_client.get_table_schema(table_name=table_name)
+        if target_table.info.get("partition_column") == incremental_column:
+            # the newest non-empty range partition holds the max, so older partitions are never scanned.
+            # a DEFAULT partition may hold rows of any date, so it is always scanned.
+            max_values = []
+            for partition_name in self.target_postgresql_client.get_partitions(table_name):
+                incremental_value = self._get_max_value(partition_name, incremental_column)
+                if incremental_value is not None:
+                    max_values.append(incremental_value)
+                    break
+            default_partition = self.target_postgresql_client.get_default_partition(table_name)
+            if default_partition is not None:
+                max_values.append(self._get_max_value(default_partition, incremental_column))
+            return max([value for value in max_values if value is not None], default=None)
+        return self._get_max_value(table_name, incremental_column)
+
+    def _get_max_value(self, table_name: str, column_name: str) -> str:
         sql = f"""
-            select max({self.sql_extract_parser.config.incremental_column}) as incremental_value
-            from {self.sql_extract_parser.config.source_table_name}
+            select max({column_name}) as incremental_value
+            from {table_name}
         """
         sql_response = self.target_postgresql_client.run_sql(sql)
         return sql_response[0].get("incremental_value")
 
-    def _incremental_extract(self) -> list[dict]:
+    def _get_incremental_extract_sql(self) -> str:
         if self.target_postgresql_client.table_exists(
             self.sql_extract_parser.config.source_table_name
         ):
             incremental_value = self._get_incremental_value()
-            templated_sql = self.sql_extract_parser.get_templated_sql(
+            return self.sql_extract_parser.get_templated_sql(
                 is_incremental=True, incremental_value=incremental_value
             )
-            return self.source_postgresql_client.run_sql(templated_sql)
         else:
             logging.info(
                 f"Table '{self.sql_extract_parser.config.source_table_name}' does not exist. Performing full extract."
             )
-            return self._full_extract()
+            return self._get_full_extract_sql()
 
-    def extract(self) -> list[dict]:
-        """
-        Performs database table extraction using either a full extract or incremental extract pattern.
-        The extraction method used will depend on the SqlExtractParser instance passed to the constructor.
-        """
+    def _get_extract_sql(self) -> str:
         if self.sql_extract_parser.config.extract_type == SqlExtractConfig.FULL_EXTRACT:
-            return self._full_extract()
+            return self._get_full_extract_sql()
         elif (self.sql_extract_parser.config.extract_type == SqlExtractConfig.INCREMENTAL_EXTRACT):
-            return self._incremental_extract()
+            return self._get_incremental_extract_sql()
         else:
             raise Exception(
                 f"Extraction type '{self.sql_extract_parser.config.extract_type}' is not supported. Skipping extraction."
             )
 
+    def extract(self) -> list[dict]:
+        """
+        Performs database table extraction using either a full extract or incremental extract pattern.
+        The extraction method used will depend on the SqlExtractParser instance passed to the constructor.
+        """
+        return self.source_postgresql_client.run_sql(self._get_extract_sql())
+
+    def extract_in_batches(self, batch_size: int = 10000) -> Iterator[list[dict]]:
+        """
+        Same as extract(), but yields the rows in lists of at most batch_size dictionaries streamed from a
+        server-side cursor, so memory is bounded by the batch size rather than the table size.
+        """
+        return self.source_postgresql_client.run_sql_in_batches(self._get_extract_sql(), batch_size=batch_size)
+
+    def is_same_server(self) -> bool:
+        """
+        Returns whether the source and target databases are on the same server, i.e. the clients connect to the
+        same host name and port.
+        """
+        source, target = self.source_postgresql_client, self.target_postgresql_client
+        return (source.host_name, str(source.port)) == (target.host_name, str(target.port))
+
+    def can_pushdown(self) -> bool:
+        """
+        Returns whether transfer_pushdown() can be used: the source and target databases are on the same server
+        and the dblink extension is installed in the target database.
+        """
+        return self.is_same_server() and self.target_postgresql_client.extension_exists("dblink")
+
+    def _get_dblink_connection_string(self) -> str:
+        source = self.source_postgresql_client
+
+        def quote_value(value) -> str:
+            return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+        return " ".join(
+            f"{keyword}={quote_value(value)}"
+            for keyword, value in [
+                ("host", source.host_name),
+                ("port", source.port),
+                ("dbname", source.database_name),
+                ("user", source.username),
+                ("password", source.password),
+            ]
+        )
+
+    def transfer_pushdown(self, table: Table, metadata: MetaData) -> int:
+        """
+        Upserts the extracted rows into the target table with an INSERT ... SELECT run on the target database,
+        which reads them from the source database through dblink, so the rows never pass through Python.
+        The dblink extension must be installed in the target database (see create_dblink.sql) and the target
+        server must be able to connect to the source with the source client's host and credentials.
+        Like PostgreSqlClient.upsert(), the target table and the partitions the rows fall into are created if
+        they don't exist. For a partitioned table the rows are first staged in a temporary table on the target,
+        so the partitions can be created from them without running the extract on the source twice.
+        The connection string passed to dblink holds the source password, so if the transfer fails the exception
+        raised carries only the database's error message, never the statement's parameters.
+
+        Existing rows are only rewritten when a non-key column changed.
+
+        Returns:
+            int: The number of rows inserted or updated.
+        """
+        target_postgresql_client = self.target_postgresql_client
+        quote = target_postgresql_client.engine.dialect.identifier_preparer.quote
+        target_postgresql_client.create_table(table_name=table.name, metadata=metadata)
+        columns = [column.name for column in table.columns]
+        key_columns = [pk_column.name for pk_column in table.primary_key.columns.values()]
+        column_list = ", ".join(quote(column) for column in columns)
+        column_definitions = ", ".join(
+            f"{quote(column.name)} {column.type.compile(dialect=target_postgresql_client.engine.dialect)}"
+            for column in table.columns
+        )
+        dblink_select = f"""
+            select {column_list}
+            from dblink(cast(:connection_string as text), cast(:extract_sql as text)) as extract ({column_definitions})
+        """
+        dblink_parameters = {
+            "connection_string": self._get_dblink_connection_string(),
+            "extract_sql": self._get_extract_sql(),
+        }
+        update_columns = [column for column in columns if column not in key_columns]
+        conflict_action = "do nothing"
+        if update_columns:
+            # like PostgreSqlClient.upsert() with skip_unchanged, rows are only rewritten when a column changed
+            current_values = ", ".join(f"{quote(table.name)}.{quote(column)}" for column in update_columns)
+            new_values = ", ".join(f"excluded.{quote(column)}" for column in update_columns)
+            conflict_action = (
+                "do update set "
+                + ", ".join(f"{quote(column)} = excluded.{quote(column)}" for column in update_columns)
+                + f" where ({current_values}) is distinct from ({new_values})"
+            )
+        interval = table.info.get("partition_interval")
+        try:
+            with target_postgresql_client.engine.begin() as connection:
+                if interval is None:
+                    select_sql, select_parameters = dblink_select, dblink_parameters
+                else:
+                    staging_table_name = quote(f"{table.name}__pushdown")
+                    connection.execute(
+                        text(f"create temporary table {staging_table_name} on commit drop as {dblink_select}"),
+                        **dblink_parameters,
+                    )
+                    # cast back to date: date_trunc returns a timestamp in the session's time zone
+                    column_name = quote(table.info["partition_column"])
+                    partition_starts = connection.execute(
+                        f"select distinct cast(date_trunc('{interval}', {column_name}) as date) as {column_name} "
+                        f"from {staging_table_name}"
+                    ).all()
+                    target_postgresql_client.create_partitions(
+                        data=[dict(row) for row in partition_starts], table=table
+                    )
+                    select_sql, select_parameters = f"select {column_list} from {staging_table_name}", {}
+                return connection.execute(
+                    text(f"""
+                        insert into {quote(table.name)} ({column_list})
+                        {select_sql}
+                        on conflict ({', '.join(quote(column) for column in key_columns)}) {conflict_action}
+                    """),
+                    **select_parameters,
+                ).rowcount
+        except StatementError as e:
+            raise Exception(f"Transferring '{table.name}' with dblink failed: {e.orig}") from None
+
     def get_table_schema(self) -> tuple[Table, MetaData]:
         """
         Retrieves the schema of a table from the source PostgreSQL database.
@@ -1,22 +1,27 @@
 import pandas as pd
 from pathlib import Path
+from typing import Iterator
 from sqlalchemy import Table, MetaData
 from etl_project.connectors.postgresql import PostgreSqlClient
 from etl_project.connectors.fixer_api import FixerApiClient
 from etl_project.connectors.market_stack_api import MarketStackApiClient
 
 
-def extract_fixer_table(fixer_api_client: FixerApiClient) -> pd.DataFrame:
+def extract_fixer_table(
+    fixer_api_client: FixerApiClient, start_date: str = None, end_date: str = None
+) -> pd.DataFrame:
     """
     Extracts exchange rates data from the Fixer API using the provided FixerApiClient.
 
     Parameters:
         fixer_api_client (FixerApiClient): An instance of the FixerApiClient class used to interact with the Fixer API.
+        start_date (str): Optional first date in the format "YYYY-MM-DD".
+        end_date (str): Optional last date in the format "YYYY-MM-DD".
 
     Returns:
         pd.DataFrame: A pandas DataFrame containing the extracted exchange rates data.
     """
-    data = fixer_api_client.get_exchange_rates()
+    data = fixer_api_client.get_exchange_rates(start_date=start_date, end_date=end_date)
     df_currency = pd.json_normalize(data)
     return df_currency
 
@@ -36,6 +41,25 @@ def extract_market_stack_table(market_stack_api_client: MarketStackApiClient) ->
     return df_stocks
 
 
+def extract_market_stack_pages(
+    market_stack_api_client: MarketStackApiClient, date_from: str = None, date_to: str = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Extracts stock information from the MarketStack API one page at a time, so that each page can be
+    transformed and loaded before the next one is held in memory.
+
+    Parameters:
+        market_stack_api_client (MarketStackApiClient): An instance of the MarketStackApiClient class.
+        date_from (str): Optional start date in the format "YYYY-MM-DD".
+        date_to (str): Optional end date in the format "YYYY-MM-DD".
+
+    Returns:
+        Iterator[pd.DataFrame]: One DataFrame per page of stock information.
+    """
+    for page in market_stack_api_client.get_stocks_pages(date_from=date_from, date_to=date_to):
+        yield pd.json_normalize(page)
+
+
 def transform_fixer_table(df_currency: pd.DataFrame) -> pd.DataFrame:
     """
     Transform the fixer table.
@@ -65,9 +89,11 @@ def transform_market_stack_table(df_stocks: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: The transformed DataFrame with normalized data, removed columns, and formatted date.
     """
-    data_column = df_stocks['data']
-    normalized_data = pd.json_normalize(data_column[0])
-    normalized_data['symbol'] = [entry['symbol'] for entry in data_column[0]]
+    entries = [entry for data in df_stocks['data'] for entry in data]
+    if len(entries) == 0:
+        return pd.DataFrame(columns=['date', 'symbol'])
+    normalized_data = pd.json_normalize(entries)
+    normalized_data['symbol'] = [entry['symbol'] for entry in entries]
     normalized_data = normalized_data[['date', 'symbol'] + [col for col in normalized_data.columns if col not in ['date', 'symbol']]]
     columns_to_delete = ['adj_high', 'adj_low', 'adj_close', 'adj_open', 'adj_volume', 'split_factor', 'dividend']
     normalized_data.drop(columns=columns_to_delete, inplace=True)
@@ -82,7 +108,9 @@ def load(
     table: Table,
     metadata: MetaData,
     load_method: str = "overwrite",
-) -> None:
+    use_copy: bool = True,
+    skip_unchanged: bool = False,
+) -> dict:
     """
     Load dataframe to a database.
 
@@ -92,19 +120,36 @@ def load(
         table: sqlalchemy table
         metadata: sqlalchemy metadata
         load_method: supports one of: [insert, upsert, overwrite]
+        use_copy: bulk load the dataframe with COPY, encoded column by column. If False, the dataframe is
+            converted to a dict per row and loaded with a multi-row INSERT
+        skip_unchanged: for upsert, only rewrite existing rows whose non-key columns changed
+
+    Returns:
+        dict: For upsert, the number of rows inserted, updated and left unchanged. None otherwise.
     """
     if load_method == "insert":
-        postgresql_client.insert(
-            data=df.to_dict(orient="records"), table=table, metadata=metadata
-        )
+        if use_copy:
+            postgresql_client.insert_dataframe(df=df, table=table, metadata=metadata)
+        else:
+            postgresql_client.insert(
+                data=df.to_dict(orient="records"), table=table, metadata=metadata
+            )
     elif load_method == "upsert":
-        postgresql_client.upsert(
-            data=df.to_dict(orient="records"), table=table, metadata=metadata
-        )
+        if use_copy:
+            return postgresql_client.upsert_dataframe(
+                df=df, table=table, metadata=metadata, skip_unchanged=skip_unchanged
+            )
+        else:
+            return postgresql_client.upsert(
+                data=df.to_dict(orient="records"), table=table, metadata=metadata, skip_unchanged=skip_unchanged
+            )
     elif load_method == "overwrite":
-        postgresql_client.overwrite(
-            data=df.to_dict(orient="records"), table=table, metadata=metadata
-        )
+        if use_copy:
+            postgresql_client.overwrite_dataframe(df=df, table=table, metadata=metadata)
+        else:
+            postgresql_client.overwrite(
+                data=df.to_dict(orient="records"), table=table, metadata=metadata
+            )
     else:
         raise Exception(
             "Please specify a correct load method: [insert, upsert, overwrite]"
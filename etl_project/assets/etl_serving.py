@@ -1,37 +1,312 @@
 from jinja2 import Environment
 from graphlib import TopologicalSorter
+from datetime import datetime
+import hashlib
+import json
+import time
+import uuid
+from sqlalchemy import Table, Column, String, MetaData
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 
 from etl_project.connectors.postgresql import PostgreSqlClient
+from etl_project.assets.pipeline_logging import PipelineLogging
 from etl_project.assets.database_extractor import (
     SqlExtractParser,
     DatabaseTableExtractor,
 )
 
 
+def _get_worker_client(postgresql_client: PostgreSqlClient) -> PostgreSqlClient:
+    """
+    Returns a new client of the same database, with a schema cache of its own, for a worker thread.
+    """
+    return PostgreSqlClient(
+        server_name=postgresql_client.host_name,
+        database_name=postgresql_client.database_name,
+        username=postgresql_client.username,
+        password=postgresql_client.password,
+        port=postgresql_client.port,
+    )
+
+
+def _extract_load_table(
+    asset: str,
+    template_environment: Environment,
+    source_postgresql_client: PostgreSqlClient,
+    target_postgresql_client: PostgreSqlClient,
+    max_workers: int,
+    atomic: bool,
+    batch_size: int,
+    transfer_mode: str,
+    pipeline_logging: PipelineLogging = None,
+    fingerprint_store: "TransformFingerprintStore" = None,
+) -> None:
+    """
+    Extracts and loads the table of a single extract template, see extract_load().
+    """
+    sql_extract_parser = SqlExtractParser(
+        file_path=asset, environment=template_environment
+    )
+    database_table_extractor = DatabaseTableExtractor(
+        sql_extract_parser=sql_extract_parser,
+        source_postgresql_client=source_postgresql_client,
+        target_postgresql_client=target_postgresql_client,
+    )
+    table_schema, metadata = database_table_extractor.get_table_schema()
+    if transfer_mode == DatabaseTableExtractor.PUSHDOWN_TRANSFER or (
+        transfer_mode == DatabaseTableExtractor.AUTO_TRANSFER and database_table_extractor.can_pushdown()
+    ):
+        try:
+            row_count = database_table_extractor.transfer_pushdown(table=table_schema, metadata=metadata)
+            if pipeline_logging is not None:
+                pipeline_logging.logger.info(f"Transferred {row_count} rows of '{table_schema.name}' with dblink")
+            if fingerprint_store is not None and row_count > 0:
+                fingerprint_store.record_change(table_schema.name)
+            return
+        except Exception as e:
+            if transfer_mode == DatabaseTableExtractor.PUSHDOWN_TRANSFER:
+                raise
+            if pipeline_logging is not None:
+                pipeline_logging.logger.warning(f"{e}. Transferring '{table_schema.name}' through Python instead")
+    if batch_size is None:
+        table_batches = [database_table_extractor.extract()]
+    else:
+        table_batches = database_table_extractor.extract_in_batches(batch_size=batch_size)
+    written_count = 0
+    for table_data in table_batches:
+        upsert_counts = target_postgresql_client.upsert_in_chunks(
+            data=table_data,
+            table=table_schema,
+            metadata=metadata,
+            max_workers=max_workers,
+            atomic=atomic,
+            skip_unchanged=True,
+        )
+        written_count += upsert_counts["inserted"] + upsert_counts["updated"]
+    if fingerprint_store is not None and written_count > 0:
+        fingerprint_store.record_change(table_schema.name)
+
+
 def extract_load(
     template_environment: Environment,
     source_postgresql_client: PostgreSqlClient,
     target_postgresql_client: PostgreSqlClient,
-):
+    max_workers: int = 1,
+    atomic: bool = False,
+    batch_size: int = None,
+    transfer_mode: str = DatabaseTableExtractor.AUTO_TRANSFER,
+    table_max_workers: int = 1,
+    pipeline_logging: PipelineLogging = None,
+    fingerprint_store: "TransformFingerprintStore" = None,
+) -> dict[str, float]:
     """
     Perform data extraction specified in a jinja template_environment.
 
     Data is extracted using a source_postgresql_client, and loaded using a target_postgresql_client.
+    With the `pushdown` transfer_mode, each table is upserted by the target database itself, which reads the rows
+    from the source through dblink (see DatabaseTableExtractor.transfer_pushdown()). With `auto`, the default,
+    pushdown is used when both databases are on the same server and dblink is installed in the target database, and
+    a table whose pushdown fails is transferred through Python instead. With `python`, rows are always transferred through Python as follows.
+    Each table is upserted in the largest chunks the driver allows, max_workers chunks at a time.
+    If atomic is True, each table's chunks are committed together in one transaction.
+    If batch_size is given, rows are streamed from the source in batches of that size and each batch is upserted
+    before the next is fetched (so atomic then applies per batch); otherwise each table is extracted in full first.
+
+    Up to table_max_workers templates are processed at a time, each worker with clients (and so connections and
+    schema caches) of its own. A table that fails doesn't stop the others: once every table is done, an exception
+    naming the failed tables, and how many succeeded, is raised.
+    If pipeline_logging is given, the time each table took, or its error, is logged.
+    Existing rows are only rewritten when a column changed. If a fingerprint_store is given, every table the load
+    inserted or changed rows in is recorded as changed, so transforms that read it are rebuilt even when the
+    changes left its row count and watermark as they were (see TransformFingerprintStore.record_change()).
+
+    Returns:
+        dict: The seconds each template took, by template name.
     """
-    for asset in template_environment.list_templates():
-        sql_extract_parser = SqlExtractParser(
-            file_path=asset, environment=template_environment
+    if transfer_mode not in DatabaseTableExtractor.TRANSFER_MODES:
+        raise Exception(
+            f"Transfer mode '{transfer_mode}' is not supported. Please choose from {DatabaseTableExtractor.TRANSFER_MODES}."
         )
-        database_table_extractor = DatabaseTableExtractor(
-            sql_extract_parser=sql_extract_parser,
-            source_postgresql_client=source_postgresql_client,
-            target_postgresql_client=target_postgresql_client,
+    assets = template_environment.list_templates()
+    asset_seconds = {}
+    failed_assets = {}
+
+    def run_asset(asset: str) -> None:
+        start = time.perf_counter()
+        if table_max_workers > 1:
+            asset_source_client = _get_worker_client(source_postgresql_client)
+            asset_target_client = _get_worker_client(target_postgresql_client)
+        else:
+            asset_source_client, asset_target_client = source_postgresql_client, target_postgresql_client
+        _extract_load_table(
+            asset=asset,
+            template_environment=template_environment,
+            source_postgresql_client=asset_source_client,
+            target_postgresql_client=asset_target_client,
+            max_workers=max_workers,
+            atomic=atomic,
+            batch_size=batch_size,
+            transfer_mode=transfer_mode,
+            pipeline_logging=pipeline_logging,
+            fingerprint_store=fingerprint_store,
         )
-        table_schema, metadata = database_table_extractor.get_table_schema()
-        table_data = database_table_extractor.extract()
-        target_postgresql_client.upsert_in_chunks(
-            data=table_data, table=table_schema, metadata=metadata
+        asset_seconds[asset] = time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=table_max_workers) as executor:
+        futures = {executor.submit(run_asset, asset): asset for asset in assets}
+        for future in as_completed(futures):
+            asset = futures[future]
+            if future.exception() is not None:
+                failed_assets[asset] = future.exception()
+                if pipeline_logging is not None:
+                    pipeline_logging.logger.error(f"Extract and load of {asset} failed: {future.exception()}")
+            elif pipeline_logging is not None:
+                pipeline_logging.logger.info(f"Extract and load of {asset} finished in {asset_seconds[asset]:.3f}s")
+    if table_max_workers > 1:
+        # the workers' clients created and altered tables this client may have cached
+        target_postgresql_client.invalidate_schema_cache()
+    if failed_assets:
+        raise Exception(
+            f"{len(failed_assets)} of {len(assets)} tables failed to extract and load, "
+            f"{len(assets) - len(failed_assets)} succeeded. "
+            + " | ".join(f"{asset}: {error}" for asset, error in failed_assets.items())
         )
+    return asset_seconds
+
+
+class TransformFingerprintStore:
+    """
+    Records, per transform table, the fingerprint of the inputs its current contents were built from, in a table
+    of the serving database. See SqlTransform.get_fingerprint().
+    Extracted tables are recorded too, with a new token each time extract_load() changes their rows.
+    """
+
+    def __init__(
+        self,
+        postgresql_client: PostgreSqlClient,
+        fingerprint_table_name: str = "transform_fingerprints",
+    ):
+        self.fingerprint_table_name = fingerprint_table_name
+        self.postgresql_client = postgresql_client
+        self.metadata = MetaData()
+        self.table = Table(
+            self.fingerprint_table_name,
+            self.metadata,
+            Column("table_name", String, primary_key=True),
+            Column("fingerprint", String),
+            Column("built_at", String),
+        )
+        self.postgresql_client.create_all_tables(metadata=self.metadata)
+
+    def get_fingerprint(self, table_name: str) -> str:
+        """
+        Returns the fingerprint the table was last built with, or None if it has none.
+        """
+        return self.postgresql_client.engine.execute(
+            select(self.table.c.fingerprint).where(self.table.c.table_name == table_name)
+        ).scalar()
+
+    def set_fingerprint(self, table_name: str, fingerprint: str) -> None:
+        """
+        Records the fingerprint the table was just built with.
+        """
+        insert_statement = postgresql.insert(self.table).values(
+            table_name=table_name, fingerprint=fingerprint, built_at=datetime.now()
+        )
+        self.postgresql_client.engine.execute(
+            insert_statement.on_conflict_do_update(
+                index_elements=["table_name"],
+                set_={
+                    "fingerprint": insert_statement.excluded.fingerprint,
+                    "built_at": insert_statement.excluded.built_at,
+                },
+            )
+        )
+
+    def record_change(self, table_name: str) -> None:
+        """
+        Records that rows of the table were inserted or changed, by giving it a new fingerprint. Transforms that
+        declare the table as a source include its fingerprint in theirs, so they are rebuilt on their next run.
+        """
+        self.set_fingerprint(table_name, uuid.uuid4().hex)
+
+
+class SqlTransformConfig:
+    TABLE_MATERIALIZATION = "table"
+    INCREMENTAL_MATERIALIZATION = "incremental"
+    MATERIALIZATIONS = [TABLE_MATERIALIZATION, INCREMENTAL_MATERIALIZATION]
+
+    def __init__(
+        self,
+        primary_key: list[str] = None,
+        indexes: list = [],
+        cluster_by: list[str] = None,
+        materialized: str = TABLE_MATERIALIZATION,
+        incremental_column: str = None,
+        incremental_lookback=None,
+        sources: list = [],
+    ):
+        """
+        Declares how a transform's table is built, set in an optional config block of its template:
+
+            ```
+            {% set config = {
+                "materialized": "incremental",
+                "incremental_column": "date",
+                "incremental_lookback": 7,
+                "primary_key": ["date", "symbol"],
+                "indexes": [["symbol"], {"columns": ["date"], "unique": false}],
+                "cluster_by": ["date", "symbol"],
+                "sources": [{"table": "stock_price", "watermark": "date"}, "currency_exchange_rate"]
+            } %}
+            ```
+
+        A `table` model is rebuilt in full on every run. An `incremental` model is only rebuilt when it doesn't
+        exist yet; after that the template is rendered with is_incremental and incremental_value (the model's
+        current max of incremental_column, less incremental_lookback) and its rows are merged into the table on the
+        primary key, so rows restated upstream within the lookback replace the ones merged before.
+        incremental_lookback is a number (days for a date column) or an interval such as "12 hours".
+        Each index is a list of columns or a dict with `columns` and optionally `unique`.
+        cluster_by must be the columns of the primary key or of one of the indexes.
+        sources lists every table the template reads, as a table name or a dict with `table` and optionally a
+        `watermark` column. Models that declare their sources are skipped while those tables are unchanged,
+        see SqlTransform.get_fingerprint().
+        """
+        if materialized not in SqlTransformConfig.MATERIALIZATIONS:
+            raise Exception(
+                f"Materialization '{materialized}' is not supported. Please choose from {SqlTransformConfig.MATERIALIZATIONS}."
+            )
+        if materialized == SqlTransformConfig.INCREMENTAL_MATERIALIZATION and (
+            incremental_column is None or primary_key is None
+        ):
+            raise Exception(
+                "Please specify an incremental_column and a primary_key for incremental models in your transform's config block."
+            )
+        self.materialized = materialized
+        self.incremental_column = incremental_column
+        self.incremental_lookback = incremental_lookback
+        self.primary_key = primary_key
+        self.indexes = [
+            index if isinstance(index, dict) else {"columns": index} for index in indexes
+        ]
+        for index in self.indexes:
+            if not index.get("columns"):
+                raise Exception("Please specify the columns of every index in your transform's config block.")
+        self.sources = [
+            source if isinstance(source, dict) else {"table": source} for source in sources
+        ]
+        for source in self.sources:
+            if not source.get("table"):
+                raise Exception("Please specify the table of every source in your transform's config block.")
+        self.cluster_by = cluster_by
+        if cluster_by is not None and cluster_by != primary_key and cluster_by not in [
+            index["columns"] for index in self.indexes
+        ]:
+            raise Exception(
+                f"cluster_by {cluster_by} must be the columns of the primary key or of one of the indexes."
+            )
 
 
 class SqlTransform:
@@ -40,29 +315,238 @@ class SqlTransform:
         postgresql_client: PostgreSqlClient,
         environment: Environment,
         table_name: str,
+        full_refresh: bool = False,
+        fingerprint_store: TransformFingerprintStore = None,
     ):
+        """
+        full_refresh rebuilds incremental models in full instead of merging new rows.
+        If a fingerprint_store is given, materialize() skips the table while its fingerprint is unchanged.
+        """
         self.postgresql_client = postgresql_client
         self.environment = environment
         self.table_name = table_name
+        self.full_refresh = full_refresh
+        self.fingerprint_store = fingerprint_store
+        # why the last materialize() built the table, or None if it was skipped
+        self.build_reason = None
         self.template = self.environment.get_template(f"{table_name}.sql")
+        self.config = SqlTransformConfig(**getattr(self.template.make_module(), "config", {}))
+
+    def _get_index_name(self, table_name: str, columns: list[str]) -> str:
+        return f"{table_name}_{'_'.join(columns)}_idx"
 
-    def create_table_as(self) -> None:
+    def create_table_as(self) -> dict[str, float]:
         """
-        Drops the table if it exists and creates a new copy of the table using the provided select statement.
+        Creates a new copy of the table using the provided select statement.
+        The copy is built in a shadow table, then gets the primary key and indexes declared in the template's
+        config block, is clustered and analyzed, and is finally swapped in. Readers of the table are only
+        blocked for the swap and never see it missing, half built or without its indexes.
+
+        Returns:
+            dict: The seconds each step took, including the build of every index.
         """
-        exec_sql = f"""
-            drop table if exists {self.table_name};
-            create table {self.table_name} as (
+        quote = self.postgresql_client.engine.dialect.identifier_preparer.quote
+        shadow_table_name = self.postgresql_client.get_shadow_table_name(self.table_name)
+        step_seconds = {}
+
+        def run_step(step_name: str, sql: str) -> None:
+            start = time.perf_counter()
+            self.postgresql_client.execute_sql(sql)
+            step_seconds[step_name] = time.perf_counter() - start
+
+        run_step("create_table_as", f"""
+            drop table if exists {shadow_table_name};
+            create table {shadow_table_name} as (
                 {self.template.render()}
             )
+        """)
+        if self.config.primary_key is not None:
+            run_step(
+                "primary_key",
+                f"alter table {quote(shadow_table_name)} add constraint {quote(shadow_table_name + '_pkey')} "
+                f"primary key ({', '.join(quote(column) for column in self.config.primary_key)})",
+            )
+        for index in self.config.indexes:
+            index_name = self._get_index_name(shadow_table_name, index["columns"])
+            run_step(
+                f"index {self._get_index_name(self.table_name, index['columns'])}",
+                f"create {'unique ' if index.get('unique') else ''}index {quote(index_name)} "
+                f"on {quote(shadow_table_name)} ({', '.join(quote(column) for column in index['columns'])})",
+            )
+        if self.config.cluster_by is not None:
+            if self.config.cluster_by == self.config.primary_key:
+                cluster_index_name = shadow_table_name + "_pkey"
+            else:
+                cluster_index_name = self._get_index_name(shadow_table_name, self.config.cluster_by)
+            run_step("cluster", f"cluster {quote(shadow_table_name)} using {quote(cluster_index_name)}")
+        run_step("analyze", f"analyze {quote(shadow_table_name)}")
+        start = time.perf_counter()
+        self.postgresql_client.swap_shadow_table(self.table_name)
+        step_seconds["swap"] = time.perf_counter() - start
+        return step_seconds
+
+    def merge_incremental(self) -> dict[str, float]:
+        """
+        Merges the rows newer than the table's current watermark (the max of its incremental_column, less the
+        incremental_lookback) into the table, updating rows whose primary key already exists, and analyzes it.
+
+        Returns:
+            dict: The seconds each step took.
         """
-        self.postgresql_client.execute_sql(exec_sql)
+        quote = self.postgresql_client.engine.dialect.identifier_preparer.quote
+        step_seconds = {}
+        start = time.perf_counter()
+        watermark = f"max({quote(self.config.incremental_column)})"
+        lookback = self.config.incremental_lookback
+        if isinstance(lookback, str):
+            watermark += f" - interval '{lookback}'"
+        elif lookback is not None:
+            watermark += f" - {lookback}"
+        incremental_value = self.postgresql_client.run_sql(
+            f"select {watermark} as incremental_value from {quote(self.table_name)}"
+        )[0]["incremental_value"]
+        table_schema, _ = self.postgresql_client.get_table_schema(self.table_name)
+        columns = [column.name for column in table_schema.columns]
+        update_columns = [column for column in columns if column not in self.config.primary_key]
+        column_list = ", ".join(quote(column) for column in columns)
+        conflict_action = "do nothing"
+        if update_columns:
+            conflict_action = "do update set " + ", ".join(
+                f"{quote(column)} = excluded.{quote(column)}" for column in update_columns
+            )
+        self.postgresql_client.execute_sql(f"""
+            insert into {quote(self.table_name)} ({column_list})
+            select {column_list} from (
+                {self.template.render(is_incremental=incremental_value is not None, incremental_value=incremental_value)}
+            ) as new_rows
+            on conflict ({', '.join(quote(column) for column in self.config.primary_key)}) {conflict_action}
+        """)
+        step_seconds["merge"] = time.perf_counter() - start
+        start = time.perf_counter()
+        self.postgresql_client.execute_sql(f"analyze {quote(self.table_name)}")
+        step_seconds["analyze"] = time.perf_counter() - start
+        return step_seconds
 
+    def get_fingerprint(self) -> str:
+        """
+        Returns a fingerprint of everything the table is built from: the rendered SQL, the config block and, for
+        each declared source, its row count, the max of its watermark column and, if the source is itself a
+        transform or a table loaded by extract_load() with the same fingerprint_store, its recorded fingerprint.
+        A change upstream therefore also changes the fingerprint of every transform downstream of it, including
+        rows restated in place by extract_load(). Rows updated in place by anything else, without changing a
+        source's row count or watermark, are not detected; use full_refresh to rebuild after such changes.
+        """
+        quote = self.postgresql_client.engine.dialect.identifier_preparer.quote
+        sources_state = []
+        for source in self.config.sources:
+            select_list = "count(*) as row_count"
+            if source.get("watermark") is not None:
+                select_list += f", max({quote(source['watermark'])}) as watermark"
+            state = self.postgresql_client.run_sql(f"select {select_list} from {quote(source['table'])}")[0]
+            state["table"] = source["table"]
+            state["fingerprint"] = self.fingerprint_store.get_fingerprint(source["table"])
+            sources_state.append(state)
+        fingerprint_input = json.dumps(
+            {"sql": self.template.render(), "config": vars(self.config), "sources": sources_state},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(fingerprint_input.encode()).hexdigest()
 
-def transform(dag: TopologicalSorter):
+    def materialize(self) -> dict[str, float]:
+        """
+        Builds the table as its config block declares: incremental models that already exist with the declared
+        primary key are merged with merge_incremental() unless full_refresh is set, everything else is rebuilt
+        with create_table_as().
+        With a fingerprint_store, tables that declare their sources are skipped when they exist and their
+        fingerprint is the one they were last built with; build_reason records why the table was built, or is
+        None if it was skipped.
+
+        Returns:
+            dict: The seconds each step took, empty if the table was skipped.
+        """
+        fingerprint = None
+        if self.fingerprint_store is not None and self.config.sources:
+            fingerprint = self.get_fingerprint()
+        if fingerprint is None:
+            self.build_reason = "no sources declared" if self.fingerprint_store is not None else "no fingerprint store"
+        elif self.full_refresh:
+            self.build_reason = "full refresh"
+        elif not self.postgresql_client.table_exists(self.table_name):
+            self.build_reason = "table does not exist"
+        else:
+            previous_fingerprint = self.fingerprint_store.get_fingerprint(self.table_name)
+            if fingerprint == previous_fingerprint:
+                self.build_reason = None
+                return {}
+            self.build_reason = "no previous fingerprint" if previous_fingerprint is None else "fingerprint changed"
+        # a table built without the declared primary key (e.g. by an earlier version of its template) cannot be
+        # merged into on that key, so it is rebuilt in full instead
+        if (
+            self.config.materialized == SqlTransformConfig.INCREMENTAL_MATERIALIZATION
+            and not self.full_refresh
+            and self.postgresql_client.table_exists(self.table_name)
+            and self.postgresql_client.get_primary_key(self.table_name) == self.config.primary_key
+        ):
+            step_seconds = self.merge_incremental()
+        else:
+            step_seconds = self.create_table_as()
+        if fingerprint is not None:
+            self.fingerprint_store.set_fingerprint(self.table_name, fingerprint)
+        return step_seconds
+
+
+def transform(dag: TopologicalSorter, pipeline_logging: PipelineLogging = None, max_workers: int = 1) -> dict[str, float]:
     """
-    Performs `create table as` on all nodes in the provided DAG.
+    Materializes all nodes in the provided DAG, see SqlTransform.materialize().
+    Every node whose dependencies are done is run, up to max_workers nodes at a time. If a node fails, the nodes
+    already running finish, nodes downstream of it are skipped, and once nothing is left to run an exception
+    naming the failed nodes is raised.
+    If pipeline_logging is given, whether each node was built (and why) or skipped as unchanged is logged, as is the
+    time each node took and each of its build steps (and indexes).
+
+    Returns:
+        dict: The seconds each node took, by table name.
     """
-    dag_rendered = tuple(dag.static_order())
-    for node in dag_rendered:
-        node.create_table_as()
+    node_seconds = {}
+    failed_nodes = {}
+
+    def run_node(node: SqlTransform) -> dict[str, float]:
+        start = time.perf_counter()
+        step_seconds = node.materialize()
+        node_seconds[node.table_name] = time.perf_counter() - start
+        return step_seconds
+
+    dag.prepare()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {executor.submit(run_node, node): node for node in dag.get_ready()}
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                node = running.pop(future)
+                if future.exception() is not None:
+                    failed_nodes[node.table_name] = future.exception()
+                    if pipeline_logging is not None:
+                        pipeline_logging.logger.error(
+                            f"Transform {node.table_name} failed, its downstream nodes are skipped: {future.exception()}"
+                        )
+                    continue
+                dag.done(node)
+                if pipeline_logging is not None:
+                    if node.build_reason is None:
+                        pipeline_logging.logger.info(f"Transform {node.table_name} skipped: its inputs are unchanged")
+                    else:
+                        pipeline_logging.logger.info(f"Transform {node.table_name} built: {node.build_reason}")
+                    for step_name, seconds in future.result().items():
+                        pipeline_logging.logger.info(f"Transform {node.table_name}: {step_name} took {seconds:.3f}s")
+                    pipeline_logging.logger.info(
+                        f"Transform {node.table_name} finished in {node_seconds[node.table_name]:.3f}s"
+                    )
+            for node in dag.get_ready():
+                running[executor.submit(run_node, node)] = node
+    if failed_nodes:
+        raise Exception(
+            f"{len(failed_nodes)} transforms failed and their downstream transforms were skipped. "
+            + " | ".join(f"{table_name}: {error}" for table_name, error in failed_nodes.items())
+        )
+    return node_seconds
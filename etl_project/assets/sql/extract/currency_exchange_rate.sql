@@ -1,16 +1,16 @@
 {% set config = {
     "extract_type": "incremental",
     "incremental_column": "date",
+    "incremental_lookback": 7,
     "source_table_name": "currency_exchange_rate"
 } %}
 
 select
     date,
     base,
-    rate_usd,
-    rate_cny,
-    rate_inr,
-    rate_aud
+{%- for currency in currencies %}
+    rate_{{ currency }}{{ "," if not loop.last }}
+{%- endfor %}
 from
     {{ config["source_table_name"] }}
 
@@ -1,6 +1,7 @@
 {% set config = {
     "extract_type": "incremental",
     "incremental_column": "date",
+    "incremental_lookback": 7,
     "source_table_name": "stock_price"
 } %}
 
@@ -1,3 +1,10 @@
+{% set config = {
+    "primary_key": ["date", "symbol"],
+    "indexes": [["symbol"]],
+    "cluster_by": ["symbol"],
+    "sources": [{"table": "stock_prices_in_currencies", "watermark": "date"}]
+} %}
+
 with distinct_dates as (
 	select
 		symbol,
@@ -13,9 +20,9 @@ calculations as (
 		spic.symbol,
 		avg(spic.close_usd) over (partition by spic.symbol) as avg_close_usd,
 		avg(spic.close_eur) over (partition by spic.symbol) as avg_close_eur,
-		avg(spic.close_cny) over (partition by spic.symbol) as avg_close_cny,
-		avg(spic.close_inr) over (partition by spic.symbol) as avg_close_inr,
-		avg(spic.close_aud) over (partition by spic.symbol) as avg_close_aud,
+	{%- for currency in currencies if currency not in ["usd", "eur"] %}
+		avg(spic.close_{{ currency }}) over (partition by spic.symbol) as avg_close_{{ currency }},
+	{%- endfor %}
 		sum(spic.volume) over (partition by spic.symbol) as total_volume,
 		dd.total_days
 	from
@@ -30,9 +37,9 @@ select
     symbol,
     round(cast(avg_close_usd as numeric), 2) as avg_close_usd,
     round(cast(avg_close_eur as numeric), 2) as avg_close_eur,
-    round(cast(avg_close_cny as numeric), 2) as avg_close_cny,
-    round(cast(avg_close_inr as numeric), 2) as avg_close_inr,
-    round(cast(avg_close_aud as numeric), 2) as avg_close_aud,
+    {%- for currency in currencies if currency not in ["usd", "eur"] %}
+    round(cast(avg_close_{{ currency }} as numeric), 2) as avg_close_{{ currency }},
+    {%- endfor %}
     total_volume,
     total_days
 from
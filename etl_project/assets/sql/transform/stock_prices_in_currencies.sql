@@ -1,12 +1,25 @@
+{% set config = {
+    "materialized": "incremental",
+    "incremental_column": "date",
+    "incremental_lookback": 7,
+    "primary_key": ["date", "symbol"],
+    "indexes": [["symbol"]],
+    "cluster_by": ["date", "symbol"],
+    "sources": [
+        {"table": "stock_price", "watermark": "date"},
+        {"table": "currency_exchange_rate", "watermark": "date"}
+    ]
+} %}
+
 with initial_calculations as (
 	select
 		sp.date,
 		sp.symbol,
 		sp.close as close_usd,
 		(sp.close / cer.rate_usd) as close_eur,
-		(sp.close / cer.rate_usd) * cer.rate_cny as close_cny,
-		(sp.close / cer.rate_usd) * cer.rate_inr as close_inr,
-		(sp.close / cer.rate_usd) * cer.rate_aud as close_aud,
+	{%- for currency in currencies if currency not in ["usd", "eur"] %}
+		(sp.close / cer.rate_usd) * cer.rate_{{ currency }} as close_{{ currency }},
+	{%- endfor %}
 		sp.volume
 	from
 		stock_price sp
@@ -16,15 +29,18 @@ with initial_calculations as (
 		sp.date = cer.date
 	where
 		sp.close > 0
+	{% if is_incremental %}
+		and sp.date > '{{ incremental_value }}'
+	{% endif %}
 ) 
 select
 	date,
 	symbol,
 	round(cast(close_usd as numeric), 2) as close_usd,
 	round(cast(close_eur as numeric), 2) as close_eur,
-	round(cast(close_cny as numeric), 2) as close_cny,
-	round(cast(close_inr as numeric), 2) as close_inr,
-	round(cast(close_aud as numeric), 2) as close_aud,
+	{%- for currency in currencies if currency not in ["usd", "eur"] %}
+	round(cast(close_{{ currency }} as numeric), 2) as close_{{ currency }},
+	{%- endfor %}
 	volume
 from
 	initial_calculations
@@ -1,14 +1,175 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 import requests
+from requests.adapters import HTTPAdapter
+from etl_project.connectors.response_cache import ResponseCache
+from etl_project.connectors.rate_limiter import get_rate_limiter
+
+
+def map_concurrently(func: Callable, items: Iterable, max_workers: int = 1) -> Iterator:
+    """
+    Applies func to every item using at most max_workers threads and yields the results in the order of items.
+    At most max_workers results are pending at any time, so memory stays bounded however many items there are.
+    """
+    if max_workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = deque()
+        for item in items:
+            futures.append(executor.submit(func, item))
+            if len(futures) >= max_workers:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
 
 class BaseApiClient:
-    def __init__(self, access_key: str):
+    RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+    # clients of the same provider share a rate limit and quota, see rate_limiter.set_rate_limit
+    PROVIDER = None
+
+    def __init__(
+        self,
+        access_key: str,
+        timeout: float = 30,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30,
+        pool_maxsize: int = 10,
+        response_cache: ResponseCache = None,
+    ):
         if access_key is None:
             raise Exception("API key cannot be set to None.")
         self.access_key = access_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.response_cache = response_cache
+
+        # a single session keeps connections alive and reuses them across requests and threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.request_stats: list[dict] = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._request_stats_lock = threading.Lock()
+
+    def _get_retry_delay(self, attempt: int, response: requests.Response = None) -> float:
+        """
+        Returns the number of seconds to wait before retrying.
+        A `Retry-After` header on the response is respected up to max_backoff, otherwise exponential backoff with
+        full jitter is used.
+        """
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after is not None:
+            try:
+                return min(max(float(retry_after), 0), self.max_backoff)
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    return min(max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0), self.max_backoff)
+                except (TypeError, ValueError):
+                    pass
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+    def _record_request(
+        self, base_url: str, status_code: int, latency: float, retries: int, throttled: float
+    ) -> None:
+        """
+        Records the latency, retry count and rate limiter wait of a request.
+        """
+        with self._request_stats_lock:
+            self.request_stats.append({
+                "url": base_url,
+                "status_code": status_code,
+                "latency": latency,
+                "retries": retries,
+                "throttled": throttled,
+            })
+
+    def get_request_stats(self) -> dict:
+        """
+        Summarises the requests made by this client.
+
+        Returns:
+            dict: The number of requests, total retries, credits (requests sent including retries), failed requests,
+                mean/max latency and total rate limiter wait in seconds, and response cache hits/misses.
+        """
+        with self._request_stats_lock:
+            latencies = [stat["latency"] for stat in self.request_stats]
+            return {
+                "requests": len(self.request_stats),
+                "retries": sum(stat["retries"] for stat in self.request_stats),
+                "credits": sum(stat["retries"] + 1 for stat in self.request_stats),
+                "failed": sum(1 for stat in self.request_stats if stat["status_code"] != 200),
+                "mean_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+                "max_latency": max(latencies, default=0.0),
+                "throttled": sum(stat["throttled"] for stat in self.request_stats),
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+            }
+
+    def reset_request_stats(self) -> None:
+        """
+        Clears the recorded request stats.
+        """
+        with self._request_stats_lock:
+            self.request_stats = []
+            self.cache_hits = 0
+            self.cache_misses = 0
+
+    def _send_request(self, base_url: str, params: dict) -> requests.Response:
+        """
+        Sends a GET request through the pooled session, retrying connection errors, timeouts and
+        retryable status codes (429 and 5xx) up to max_retries times.
+        Every attempt first waits for the provider's rate limiter, if one is set.
+        """
+        start = time.perf_counter()
+        attempt = 0
+        throttled = 0.0
+        rate_limiter = get_rate_limiter(self.PROVIDER)
+        while True:
+            if rate_limiter is not None:
+                throttled += rate_limiter.acquire()
+            try:
+                response = self.session.get(base_url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    self._record_request(base_url, None, time.perf_counter() - start, attempt, throttled)
+                    raise
+                time.sleep(self._get_retry_delay(attempt))
+                attempt += 1
+                continue
+            if response.status_code in BaseApiClient.RETRY_STATUS_CODES and attempt < self.max_retries:
+                time.sleep(self._get_retry_delay(attempt, response))
+                attempt += 1
+                continue
+            self._record_request(base_url, response.status_code, time.perf_counter() - start, attempt, throttled)
+            return response
+
+    def _is_cacheable(self, data: dict) -> bool:
+        """
+        Returns whether a successful response may be stored in the response cache.
+        Subclasses override this for APIs that report errors inside a 200 response.
+        """
+        return True
 
     def get_data(self, base_url: str, params: dict) -> dict:
         """
         Sends a GET request to the specified base URL with the given parameters and returns the response as a JSON object.
+        If the client has a response cache, cached responses are returned without sending a request.
 
         Args:
             base_url (str): The base URL to send the GET request to.
@@ -18,11 +179,24 @@ class BaseApiClient:
             dict: The response from the API as a JSON object.
 
         Raises:
-            Exception: If the GET request fails or returns a non-200 status code.
+            Exception: If the GET request fails or returns a non-200 status code after all retries.
         """
-        response = requests.get(base_url, params=params)
+        if self.response_cache is not None:
+            cached_data = self.response_cache.get(base_url, params)
+            with self._request_stats_lock:
+                if cached_data is not None:
+                    self.cache_hits += 1
+                else:
+                    self.cache_misses += 1
+            if cached_data is not None:
+                return cached_data
+
+        response = self._send_request(base_url, params)
         if response.status_code == 200:
-            return response.json()
+            data = response.json()
+            if self.response_cache is not None and self._is_cacheable(data):
+                self.response_cache.set(base_url, params, data)
+            return data
         else:
             raise Exception(
                 f"Failed to extract data from API. Status Code: {response.status_code}. Response: {response.text}"
@@ -0,0 +1,101 @@
+import threading
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, Engine
+from sqlalchemy.pool import QueuePool
+
+
+class TimedQueuePool(QueuePool):
+    """
+    A QueuePool that records how long checkouts wait for a connection and how many connections were in use at once.
+    """
+
+    def __init__(self, creator, **kw):
+        super().__init__(creator, **kw)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.peak_checked_out = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        connection = super()._do_get()
+        wait = time.perf_counter() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.peak_checked_out = max(self.peak_checked_out, self.checkedout())
+        return connection
+
+    def get_stats(self) -> dict:
+        """
+        Returns checkout wait times and connection usage since the pool was created.
+        """
+        with self._stats_lock:
+            return {
+                "pool_size": self.size(),
+                "max_overflow": self._max_overflow,
+                "checked_out": self.checkedout(),
+                "peak_checked_out": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "mean_wait": self.total_wait / self.checkouts if self.checkouts else 0.0,
+                "max_wait": self.max_wait,
+            }
+
+
+# pool settings applied to engines created from now on
+_pool_options = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_pre_ping": False,
+    "pool_recycle": -1,
+}
+# engines shared by every PostgreSqlClient in the process, keyed by connection url and pool settings
+_engines: dict[tuple, Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def configure_pools(**pool_options) -> None:
+    """
+    Sets the pool settings (pool_size, max_overflow, pool_timeout, pool_pre_ping, pool_recycle) used by engines
+    created from now on. Engines that already exist keep their settings.
+    """
+    unknown_options = set(pool_options) - set(_pool_options)
+    if unknown_options:
+        raise Exception(f"Unknown pool options {sorted(unknown_options)}. Please choose from {sorted(_pool_options)}.")
+    with _engines_lock:
+        _pool_options.update({key: value for key, value in pool_options.items() if value is not None})
+
+
+def get_engine(connection_url: URL) -> Engine:
+    """
+    Returns the engine for connection_url, creating it on first use.
+    Clients connecting with the same url share one engine, and so one connection pool.
+    """
+    with _engines_lock:
+        key = (connection_url.render_as_string(hide_password=False), tuple(sorted(_pool_options.items())))
+        if key not in _engines:
+            _engines[key] = create_engine(connection_url, poolclass=TimedQueuePool, **_pool_options)
+        return _engines[key]
+
+
+def get_pool_stats() -> dict[str, dict]:
+    """
+    Returns the pool stats of every engine created so far, keyed by the connection url without its password.
+    """
+    with _engines_lock:
+        engines = list(_engines.values())
+    return {repr(engine.url): engine.pool.get_stats() for engine in engines}
+
+
+def dispose_engines() -> None:
+    """
+    Closes the pooled connections of every engine and forgets the engines.
+    """
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
@@ -1,12 +1,57 @@
-import requests
+import logging
+from datetime import datetime, timezone
 import pandas as pd
-from etl_project.connectors.base_api_client import BaseApiClient
+from etl_project.connectors.base_api_client import BaseApiClient, map_concurrently
 
 
 class FixerApiClient(BaseApiClient):
-    def __init__(self, fixer_access_key: str):
-        super().__init__(fixer_access_key)
+    PROVIDER = "fixer"
+    DEFAULT_CURRENCIES = ["USD", "CNY", "INR", "AUD"]
+    DAILY_MODE = "daily"
+    TIMESERIES_MODE = "timeseries"
+    EXTRACTION_MODES = [DAILY_MODE, TIMESERIES_MODE]
+    # the timeseries endpoint accepts at most 365 days per request
+    MAX_TIMESERIES_DAYS = 365
+    # the error Fixer returns for endpoints the plan does not include
+    FUNCTION_ACCESS_RESTRICTED = "function_access_restricted"
+
+    def __init__(
+        self,
+        fixer_access_key: str,
+        base_url: str = "http://data.fixer.io/api",
+        currencies: list[str] = DEFAULT_CURRENCIES,
+        window_days: int = 6,
+        max_workers: int = 1,
+        extraction_mode: str = DAILY_MODE,
+        **kwargs,
+    ):
+        """
+        Keyword arguments not listed here (timeout, max_retries, backoff_factor, max_backoff, pool_maxsize,
+        response_cache) are passed through to BaseApiClient.
+        """
+        super().__init__(fixer_access_key, **kwargs)
+        if len(currencies) == 0:
+            raise Exception("Please specify at least one currency.")
+        if window_days < 1:
+            raise Exception("window_days must be at least 1.")
+        if max_workers < 1:
+            raise Exception("max_workers must be at least 1.")
+        if extraction_mode not in FixerApiClient.EXTRACTION_MODES:
+            raise Exception(
+                f"Extraction mode '{extraction_mode}' is not supported. Please choose from {FixerApiClient.EXTRACTION_MODES}."
+            )
         self.access_key = fixer_access_key
+        self.base_url = base_url
+        self.currencies = currencies
+        self.window_days = window_days
+        self.max_workers = max_workers
+        self.extraction_mode = extraction_mode
+
+    def _is_cacheable(self, data: dict) -> bool:
+        """
+        Fixer reports errors such as an exceeded quota in a 200 response with `success` set to false.
+        """
+        return data.get("success", False)
 
     def _get_latest_date(self) -> str:
         """
@@ -15,43 +60,127 @@ class FixerApiClient(BaseApiClient):
         Returns:
             str: The latest date in the format "YYYY-MM-DD".
         """
-        base_url = "http://data.fixer.io/api/latest"
+        base_url = f"{self.base_url}/latest"
         params = {
             "access_key": self.access_key
         }
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = self.get_data(base_url, params)
         return data.get("date")
     
-    def _get_date_range(self) -> list[str]:
+    def _get_date_range(self, start_date: str = None, end_date: str = None) -> list[str]:
         """
-        Returns a list of date strings representing a date range.
+        Returns a list of date strings representing a date range, latest date first.
+        When no end_date is given the range ends at the latest date reported by the Fixer API,
+        and when no start_date is given the range covers window_days days.
 
         Returns:
             list[str]: A list of date strings in the format "YYYY-MM-DD".
         """
-        latest_date = self._get_latest_date()
-        date_range = pd.date_range(end=latest_date, periods=6).strftime("%Y-%m-%d").tolist()
-        return date_range[::-1]
+        if end_date is None:
+            end_date = self._get_latest_date()
+        if start_date is None:
+            date_range = pd.date_range(end=end_date, periods=self.window_days)
+        else:
+            date_range = pd.date_range(start=start_date, end=end_date)
+        return date_range.strftime("%Y-%m-%d").tolist()[::-1]
 
-    def get_exchange_rates(self) -> list[dict]:
+    def _get_exchange_rates_for_date(self, date: str) -> dict:
         """
-        Retrieves exchange rates for a given date range.
+        Retrieves the historical exchange rates for a single date.
+
+        Args:
+            date (str): The date in the format "YYYY-MM-DD".
 
         Returns:
-            A list of dictionaries containing exchange rate data for each date in the range.
+            dict: The exchange rate data for the date.
         """
-        date_range = self._get_date_range()
-        exchange_rates = []
+        base_url = f"{self.base_url}/{date}"
+        params = {
+            "access_key": self.access_key,
+            "symbols": ",".join(self.currencies)
+        }
+        return self.get_data(base_url, params)
+
+    def _get_daily_exchange_rates(self, date_range: list[str]) -> list[dict]:
+        """
+        Retrieves exchange rates with one request per date.
+        When max_workers is greater than 1, the dates are fetched concurrently by at most max_workers threads.
+        """
+        return list(map_concurrently(self._get_exchange_rates_for_date, date_range, max_workers=self.max_workers))
+
+    def _get_timeseries(self, start_date: str, end_date: str) -> dict:
+        """
+        Retrieves the exchange rates for every date between start_date and end_date in a single request.
 
-        for date in date_range:
-            base_url = f"http://data.fixer.io/api/{date}"
-            params = {
-                "access_key": self.access_key,
-                "symbols": "USD,CNY,INR,AUD"
-            }
-            response = self.get_data(base_url, params)
-            exchange_rates.append(response)
+        Returns:
+            dict: The timeseries response, with a `rates` dictionary keyed by date.
+        """
+        base_url = f"{self.base_url}/timeseries"
+        params = {
+            "access_key": self.access_key,
+            "start_date": start_date,
+            "end_date": end_date,
+            "symbols": ",".join(self.currencies)
+        }
+        return self.get_data(base_url, params)
 
+    def _get_timeseries_exchange_rates(self, date_range: list[str]) -> list[dict]:
+        """
+        Retrieves exchange rates through the timeseries endpoint, one request per 365 days, and reshapes them
+        into the same per-date dictionaries returned by the historical endpoint.
+        Falls back to daily requests for any window whose timeseries request fails. If the plan does not include the
+        timeseries endpoint, the client switches to daily mode, so the failing request is not repeated (and its
+        credit spent) for the remaining windows or later calls.
+        """
+        exchange_rates = []
+        for i in range(0, len(date_range), FixerApiClient.MAX_TIMESERIES_DAYS):
+            window = date_range[i:i + FixerApiClient.MAX_TIMESERIES_DAYS]
+            if self.extraction_mode != FixerApiClient.TIMESERIES_MODE:
+                exchange_rates += self._get_daily_exchange_rates(window)
+                continue
+            timeseries = self._get_timeseries(start_date=window[-1], end_date=window[0])
+            if not timeseries.get("success", False):
+                if (timeseries.get("error") or {}).get("type") == FixerApiClient.FUNCTION_ACCESS_RESTRICTED:
+                    logging.warning(
+                        "The Fixer plan does not include timeseries requests. Switching to daily requests."
+                    )
+                    self.extraction_mode = FixerApiClient.DAILY_MODE
+                else:
+                    logging.warning(
+                        f"Fixer timeseries request failed ({timeseries.get('error')}). Falling back to daily requests."
+                    )
+                exchange_rates += self._get_daily_exchange_rates(window)
+                continue
+            for date in window:
+                if date not in timeseries.get("rates", {}):
+                    continue
+                exchange_rates.append({
+                    "success": True,
+                    "timestamp": int(datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()),
+                    "historical": True,
+                    "base": timeseries.get("base"),
+                    "date": date,
+                    "rates": timeseries["rates"][date],
+                })
         return exchange_rates
+
+    def get_exchange_rates(self, start_date: str = None, end_date: str = None) -> list[dict]:
+        """
+        Retrieves exchange rates for a given date range.
+        In timeseries mode the whole range is fetched with one request per 365 days, and the range ends today (UTC)
+        unless an end_date is given, so no separate request for the latest date is needed.
+
+        Args:
+            start_date (str): Optional first date in the format "YYYY-MM-DD". Defaults to window_days before end_date.
+            end_date (str): Optional last date in the format "YYYY-MM-DD". Defaults to the latest date.
+
+        Returns:
+            A list of dictionaries containing exchange rate data for each date in the range, latest date first.
+        """
+        if self.extraction_mode == FixerApiClient.TIMESERIES_MODE:
+            if end_date is None:
+                end_date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+            date_range = self._get_date_range(start_date=start_date, end_date=end_date)
+            return self._get_timeseries_exchange_rates(date_range)
+        date_range = self._get_date_range(start_date=start_date, end_date=end_date)
+        return self._get_daily_exchange_rates(date_range)
@@ -1,21 +1,179 @@
-import requests
-from etl_project.connectors.base_api_client import BaseApiClient
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+from etl_project.connectors.base_api_client import BaseApiClient, map_concurrently
 
 
 class MarketStackApiClient(BaseApiClient):
-    def __init__(self, market_stack_access_key: str):
-        super().__init__(market_stack_access_key)
+    PROVIDER = "market_stack"
+    DEFAULT_SYMBOLS = ["AAPL", "MSFT", "AMZN", "GOOGL"]
+    # the eod endpoint accepts at most 100 symbols per request
+    MAX_SYMBOLS_PER_REQUEST = 100
 
-    def get_stocks_info(self) -> dict:
+    def __init__(
+        self,
+        market_stack_access_key: str,
+        base_url: str = "http://api.marketstack.com/v1",
+        symbols: list[str] = DEFAULT_SYMBOLS,
+        batch_size: int = MAX_SYMBOLS_PER_REQUEST,
+        limit: int = 1000,
+        max_workers: int = 1,
+        window_days: int = None,
+        **kwargs,
+    ):
         """
-        Retrieves the end-of-day stock information for the specified symbols.
+        Keyword arguments not listed here (timeout, max_retries, backoff_factor, max_backoff, pool_maxsize,
+        response_cache) are passed through to BaseApiClient.
+        """
+        super().__init__(market_stack_access_key, **kwargs)
+        if len(symbols) == 0:
+            raise Exception("Please specify at least one symbol.")
+        if not 1 <= batch_size <= MarketStackApiClient.MAX_SYMBOLS_PER_REQUEST:
+            raise Exception(f"batch_size must be between 1 and {MarketStackApiClient.MAX_SYMBOLS_PER_REQUEST}.")
+        if not 1 <= limit <= 1000:
+            raise Exception("limit must be between 1 and 1000.")
+        if max_workers < 1:
+            raise Exception("max_workers must be at least 1.")
+        self.base_url = base_url
+        self.symbols = symbols
+        self.batch_size = batch_size
+        self.limit = limit
+        self.max_workers = max_workers
+        self.window_days = window_days
+        self.batch_reports: list[dict] = []
+        self._batch_reports_lock = threading.Lock()
+
+    def _get_eod_page(self, symbols: str, offset: int, date_from: str = None, date_to: str = None) -> dict:
+        """
+        Retrieves a single page of end-of-day stock information.
+
+        Args:
+            symbols (str): Comma separated stock symbols.
+            offset (int): The pagination offset of the page.
+            date_from (str): Optional start date in the format "YYYY-MM-DD".
+            date_to (str): Optional end date in the format "YYYY-MM-DD".
 
         Returns:
-            A dictionary containing the stock information for the specified symbols.
+            dict: The page, containing a `pagination` block and the `data` for the page.
         """
-        base_url = "http://api.marketstack.com/v1/eod"
+        base_url = f"{self.base_url}/eod"
         params = {
             "access_key": self.access_key,
-            "symbols": "AAPL,MSFT,AMZN,GOOGL"
+            "symbols": symbols,
+            "limit": self.limit,
+            "offset": offset,
         }
+        if date_from is not None:
+            params["date_from"] = date_from
+        if date_to is not None:
+            params["date_to"] = date_to
         return self.get_data(base_url, params)
+
+    def get_symbol_batches(self, symbols: list[str] = None) -> list[list[str]]:
+        """
+        Splits the symbols (the client's symbols by default) into batches of at most batch_size symbols.
+        """
+        symbols = self.symbols if symbols is None else symbols
+        return [symbols[i:i + self.batch_size] for i in range(0, len(symbols), self.batch_size)]
+
+    def _get_batch_page(self, batch_index: int, symbols: list[str], offset: int, date_from: str, date_to: str) -> dict:
+        """
+        Retrieves a page for a batch and records it in the batch's report.
+        Errors are recorded instead of raised, so that a failing batch does not stop the other batches.
+
+        Returns:
+            dict: The page, or None if the request failed.
+        """
+        start = time.perf_counter()
+        try:
+            page = self._get_eod_page(symbols=",".join(symbols), offset=offset, date_from=date_from, date_to=date_to)
+            error = None
+        except Exception as e:
+            page = None
+            error = str(e)
+            logging.error(f"MarketStack batch {batch_index} failed at offset {offset}: {e}")
+        with self._batch_reports_lock:
+            batch_report = self.batch_reports[batch_index]
+            batch_report["request_seconds"] += time.perf_counter() - start
+            if page is not None:
+                batch_report["pages"] += 1
+                batch_report["rows"] += len(page.get("data", []))
+            else:
+                batch_report["errors"].append(error)
+        return page
+
+    def get_stocks_pages(
+        self, symbols: list[str] = None, date_from: str = None, date_to: str = None
+    ) -> Iterator[dict]:
+        """
+        Retrieves the end-of-day stock information for the specified symbols and date range, one page at a time.
+
+        The symbols are split into batches of at most batch_size symbols. The first page of every batch is fetched
+        first, then their pagination blocks determine the remaining offsets; both stages use up to max_workers threads.
+        A failing request is logged and recorded in `batch_reports` without stopping the other batches.
+        When no date_from is given and the client has a window_days, only the last window_days days are requested.
+
+        Args:
+            symbols (list[str]): Stock symbols. Defaults to the client's symbols.
+            date_from (str): Optional start date in the format "YYYY-MM-DD".
+            date_to (str): Optional end date in the format "YYYY-MM-DD".
+
+        Returns:
+            An iterator of pages.
+        """
+        if date_from is None and self.window_days is not None:
+            date_from = (datetime.now(timezone.utc) - timedelta(days=self.window_days - 1)).strftime("%Y-%m-%d")
+        batches = self.get_symbol_batches(symbols)
+        self.batch_reports = [
+            {"batch": batch_index, "symbols": len(batch), "pages": 0, "rows": 0, "request_seconds": 0.0, "errors": []}
+            for batch_index, batch in enumerate(batches)
+        ]
+
+        remaining_pages = []
+        first_pages = map_concurrently(
+            lambda batch_index: self._get_batch_page(batch_index, batches[batch_index], 0, date_from, date_to),
+            range(len(batches)),
+            max_workers=self.max_workers,
+        )
+        for batch_index, first_page in enumerate(first_pages):
+            if first_page is None:
+                continue
+            yield first_page
+            pagination = first_page.get("pagination", {})
+            limit = pagination.get("limit") or self.limit
+            remaining_pages += [(batch_index, offset) for offset in range(limit, pagination.get("total", 0), limit)]
+
+        pages = map_concurrently(
+            lambda task: self._get_batch_page(task[0], batches[task[0]], task[1], date_from, date_to),
+            remaining_pages,
+            max_workers=self.max_workers,
+        )
+        for page in pages:
+            if page is not None:
+                yield page
+
+    def get_failed_batches(self) -> list[dict]:
+        """
+        Returns the reports of the batches from the last get_stocks_pages call that had at least one failed request.
+        """
+        return [batch_report for batch_report in self.batch_reports if batch_report["errors"]]
+
+    def get_stocks_info(self) -> dict:
+        """
+        Retrieves the end-of-day stock information for the specified symbols.
+
+        Returns:
+            A dictionary containing the stock information for the specified symbols across all pages.
+
+        Raises:
+            Exception: If any batch failed.
+        """
+        pages = list(self.get_stocks_pages())
+        if self.get_failed_batches():
+            raise Exception(f"Failed to extract data from API for batches: {self.get_failed_batches()}")
+        return {
+            "pagination": pages[0].get("pagination") if pages else None,
+            "data": [entry for page in pages for entry in page.get("data", [])],
+        }
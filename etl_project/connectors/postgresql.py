@@ -1,6 +1,89 @@
-from sqlalchemy import create_engine, Table, MetaData, Column, inspect
-from sqlalchemy.engine import URL, CursorResult
+import io
+import json
+import math
+import re
+import threading
+import datetime
+from contextlib import nullcontext
+from typing import Iterator
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv
+from sqlalchemy import Table, MetaData, Column, inspect, text, or_, literal_column, select, func, tuple_
+from sqlalchemy.engine import URL, Connection, CursorResult, Engine
 from sqlalchemy.dialects import postgresql
+from etl_project.connectors.engine_registry import get_engine
+
+
+def _format_copy_value(value) -> str:
+    """
+    Formats a single value as a CSV field for COPY. NULLs (and NaN, pandas' missing value) are written as an
+    unquoted empty field and every string is quoted, so an empty string stays distinct from NULL.
+    Dicts and lists are written as JSON, as the insert path stores them in JSON columns.
+    NaT is written as NULL too, and whole floats without a fraction, as Arrow writes them in
+    _dataframe_to_copy_csv(): pandas turns integer columns with missing values into floats, and COPY into an
+    integer column rejects `1.0`.
+    """
+    if value is None or value is pd.NaT or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+
+def _to_copy_csv(data: list[dict], columns: list[str]) -> io.BytesIO:
+    """
+    Writes the rows in `data` as a CSV buffer suitable for `COPY ... FROM STDIN WITH (FORMAT csv)`.
+    """
+    buffer = io.BytesIO()
+    for row in data:
+        line = ",".join(_format_copy_value(row.get(column)) for column in columns) + "\n"
+        buffer.write(line.encode("utf-8"))
+    buffer.seek(0)
+    return buffer
+
+
+def _dataframe_to_copy_csv(df: pd.DataFrame, columns: list[str]) -> io.BytesIO:
+    """
+    Writes the columns of df as a CSV buffer suitable for `COPY ... FROM STDIN WITH (FORMAT csv)`.
+    The frame is converted to Arrow and encoded column by column, without building a Python object per row.
+    Arrow quotes every string and writes nulls (including NaN) as an unquoted empty field, matching _to_copy_csv.
+    Object columns holding dicts or lists (judged by their first value) are serialized to JSON first.
+    """
+    buffer = io.BytesIO()
+    df = df[columns]
+    json_columns = {}
+    for column in columns:
+        first_index = df[column].first_valid_index() if df[column].dtype == object else None
+        if first_index is not None and isinstance(df[column][first_index], (dict, list)):
+            json_columns[column] = df[column].map(
+                lambda value: json.dumps(value) if isinstance(value, (dict, list)) else value
+            )
+    if json_columns:
+        df = df.assign(**json_columns)
+    arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+    pyarrow.csv.write_csv(arrow_table, buffer, pyarrow.csv.WriteOptions(include_header=False))
+    buffer.seek(0)
+    return buffer
+
+
+def _get_upsert_counts(row_count: int, written_count: int, inserted_count: int) -> dict:
+    """
+    Splits the rows of an upsert into inserted, updated and unchanged rows. written_count is the number of rows
+    the upsert returned, i.e. inserted or updated; the rest were left unchanged.
+    """
+    return {
+        "inserted": inserted_count,
+        "updated": written_count - inserted_count,
+        "unchanged": row_count - written_count,
+    }
 
 
 class PostgreSqlClient:
@@ -8,6 +91,12 @@ class PostgreSqlClient:
     A client for querying postgresql database.
     """
 
+    # the most bind parameters pg8000 can send in one statement
+    MAX_BIND_PARAMETERS = 32767
+    MONTHLY_PARTITIONS = "month"
+    YEARLY_PARTITIONS = "year"
+    PARTITION_INTERVALS = [MONTHLY_PARTITIONS, YEARLY_PARTITIONS]
+
     def __init__(
         self,
         server_name: str,
@@ -22,7 +111,7 @@ class PostgreSqlClient:
         self.password = password
         self.port = port
 
-        connection_url = URL.create(
+        self.connection_url = URL.create(
             drivername="postgresql+pg8000",
             username=username,
             password=password,
@@ -31,13 +120,50 @@ class PostgreSqlClient:
             database=database_name,
         )
 
-        self.engine = create_engine(connection_url)
+        # created on first use, and shared with every other client of the same database
+        self._engine = None
+        # schema cache: reflected tables and existence checks, keyed by table name.
+        # DDL issued through this client invalidates it; call invalidate_schema_cache() after external DDL.
+        self._table_schemas = {}
+        self._table_existence = {}
+        self._table_partitions = {}
+        self._partitions_lock = threading.Lock()
+
+    @property
+    def engine(self) -> Engine:
+        """
+        The client's engine. It comes from the engine registry the first time it is needed.
+        """
+        if self._engine is None:
+            self._engine = get_engine(self.connection_url)
+        return self._engine
+
+    def get_pool_stats(self) -> dict:
+        """
+        Returns checkout wait times and connection usage of the engine's connection pool.
+        """
+        return self.engine.pool.get_stats()
+
+    def invalidate_schema_cache(self, table_name: str = None) -> None:
+        """
+        Forgets the cached schema and existence check for table_name, or for every table if table_name is None.
+        """
+        if table_name is None:
+            self._table_schemas.clear()
+            self._table_existence.clear()
+            self._table_partitions.clear()
+        else:
+            self._table_schemas.pop(table_name, None)
+            self._table_existence.pop(table_name, None)
+            self._table_partitions.pop(table_name, None)
 
     def execute_sql(self, sql: str) -> None:
         """
         Executes the given SQL statement on the PostgreSQL database.
+        The statement may be DDL, so the schema cache is invalidated.
         """
         self.engine.execute(sql)
+        self.invalidate_schema_cache()
 
     def select_all(self, table: Table) -> list[dict]:
         """
@@ -53,6 +179,23 @@ class PostgreSqlClient:
         """
         return [dict(row) for row in self.engine.execute(sql).all()]
 
+    def run_sql_in_batches(self, sql, batch_size: int = 10000) -> Iterator[list[dict]]:
+        """
+        Executes the SQL code provided and yields the result in lists of at most batch_size dictionaries.
+        Rows are fetched through a server-side cursor, so only one batch is held in memory at a time.
+        The connection stays checked out until the iterator is exhausted or closed.
+        """
+        with self.engine.connect() as connection:
+            result = connection.execution_options(stream_results=True, max_row_buffer=batch_size).execute(sql)
+            for partition in result.partitions(batch_size):
+                yield [dict(row) for row in partition]
+
+    def select_all_in_batches(self, table: Table, batch_size: int = 10000) -> Iterator[list[dict]]:
+        """
+        Yields every row of the table in lists of at most batch_size dictionaries, streamed through a server-side cursor.
+        """
+        return self.run_sql_in_batches(table.select(), batch_size=batch_size)
+
     def get_metadata(self) -> MetaData:
         """
         Gets the metadata object for all tables for a given database
@@ -61,24 +204,201 @@ class PostgreSqlClient:
         metadata.reflect()
         return metadata
 
-    def get_table_schema(self, table_name: str) -> Table:
+    def get_table_schema(self, table_name: str) -> tuple[Table, MetaData]:
+        """
+        Gets the table schema and metadata.
+        Only the requested table is reflected, and the result is cached until the table is dropped or the cache
+        is invalidated.
+        """
+        if table_name not in self._table_schemas:
+            metadata = MetaData(bind=self.engine)
+            metadata.reflect(only=[table_name])
+            self._reflect_partitioning(metadata.tables[table_name])
+            self._table_schemas[table_name] = (metadata.tables[table_name], metadata)
+            self._table_existence[table_name] = True
+        return self._table_schemas[table_name]
+
+    @classmethod
+    def range_partitioning(cls, column_name: str, interval: str) -> dict:
         """
-        Gets the table schema and metadata
+        Returns the Table keyword arguments that declare a table range partitioned on the date column column_name,
+        with one partition per interval ("month" or "year"). For example:
+
+            ```python
+            Table("stock_price", metadata, Column("date", Date, primary_key=True), ...,
+                  **PostgreSqlClient.range_partitioning("date", "month"))
+            ```
+
+        Partitions are created on demand when data is loaded. The partition column must be part of the primary key.
+        """
+        if interval not in cls.PARTITION_INTERVALS:
+            raise Exception(f"Partition interval '{interval}' is not supported. Please choose from {cls.PARTITION_INTERVALS}.")
+        return {
+            "postgresql_partition_by": f"RANGE ({column_name})",
+            "info": {"partition_column": column_name, "partition_interval": interval},
+        }
+
+    @classmethod
+    def _get_partition_bounds(cls, value: datetime.date, interval: str) -> tuple[str, datetime.date, datetime.date]:
+        """
+        Returns the name suffix, start (inclusive) and end (exclusive) of the partition that value falls into.
+        """
+        if interval == cls.MONTHLY_PARTITIONS:
+            start = datetime.date(value.year, value.month, 1)
+            end = datetime.date(value.year + value.month // 12, value.month % 12 + 1, 1)
+            return f"p{value.year}_{value.month:02d}", start, end
+        start = datetime.date(value.year, 1, 1)
+        return f"p{value.year}", start, datetime.date(value.year + 1, 1, 1)
+
+    def _reflect_partitioning(self, table: Table) -> None:
+        """
+        Adds the range partitioning of a reflected table to its definition, so tables created from it are
+        partitioned the same way. The interval is read from the bounds of the table's newest partition; a
+        partitioned table without range partitions (none, or only a DEFAULT partition) is left unpartitioned.
+        """
+        partition_key = self.engine.execute(
+            text("select pg_get_partkeydef(partrelid) from pg_partitioned_table where partrelid = to_regclass(:table_name)"),
+            table_name=self.engine.dialect.identifier_preparer.quote(table.name),
+        ).scalar()
+        partition_key_match = re.match(r"^RANGE \((\w+)\)$", partition_key or "")
+        partition_bounds = self._get_partition_expressions(table.name) if partition_key_match else {}
+        range_bounds = [bound for bound in partition_bounds.values() if bound != "DEFAULT"]
+        if not range_bounds:
+            return
+        start, end = [
+            datetime.date.fromisoformat(bound) for bound in re.findall(r"'(\d{4}-\d{2}-\d{2})", max(range_bounds))
+        ]
+        interval = self.MONTHLY_PARTITIONS if (end.year - start.year) * 12 + end.month - start.month == 1 else self.YEARLY_PARTITIONS
+        partitioning = self.range_partitioning(partition_key_match.group(1), interval)
+        table.dialect_options["postgresql"]["partition_by"] = partitioning["postgresql_partition_by"]
+        table.info.update(partitioning["info"])
+
+    @staticmethod
+    def _is_partitioned(table: Table) -> bool:
+        return table.dialect_options["postgresql"]["partition_by"] is not None
+
+    def _get_partition_expressions(self, table_name: str) -> dict[str, str]:
+        """
+        Returns the bound expression of each partition of table_name by partition name, e.g.
+        `FOR VALUES FROM ('2024-01-01') TO ('2024-02-01')`, or `DEFAULT` for a default partition.
+        """
+        rows = self.engine.execute(
+            text("""
+                select partition_class.relname, pg_get_expr(partition_class.relpartbound, partition_class.oid)
+                from pg_inherits
+                join pg_class as partition_class on partition_class.oid = pg_inherits.inhrelid
+                where pg_inherits.inhparent = to_regclass(:table_name)
+            """),
+            table_name=self.engine.dialect.identifier_preparer.quote(table_name),
+        ).all()
+        return {partition_name: bound for partition_name, bound in rows}
+
+    def get_partitions(self, table_name: str) -> list[str]:
+        """
+        Returns the names of the range partitions of table_name, newest first. Empty if the table is not
+        partitioned. A DEFAULT partition is not included, see get_default_partition().
+        """
+        partition_bounds = self._get_partition_expressions(table_name)
+        range_partitions = [name for name, bound in partition_bounds.items() if bound != "DEFAULT"]
+        # bounds start with the partition's lower bound, so they sort by date
+        return sorted(range_partitions, key=lambda name: partition_bounds[name], reverse=True)
+
+    def get_default_partition(self, table_name: str) -> str:
+        """
+        Returns the name of the DEFAULT partition of table_name, or None if it has none.
         """
-        metadata = self.get_metadata()
-        return metadata.tables[table_name], metadata
+        partition_bounds = self._get_partition_expressions(table_name)
+        return next((name for name, bound in partition_bounds.items() if bound == "DEFAULT"), None)
+
+    def _check_partitioned(self, table: Table) -> None:
+        """
+        Raises if table is range partitioned in its definition but not in the database, as tables created by
+        earlier versions of the pipeline (with a text date column) are.
+        """
+        is_partitioned = self.engine.execute(
+            text("select 1 from pg_partitioned_table where partrelid = to_regclass(:table_name)"),
+            table_name=self.engine.dialect.identifier_preparer.quote(table.name),
+        ).first() is not None
+        if not is_partitioned:
+            raise Exception(
+                f"Table '{table.name}' is not partitioned by {table.info['partition_column']} in the database. "
+                "It was probably created by an earlier version of the pipeline with a text date column: drop it "
+                "and backfill its history, as the README describes."
+            )
+
+    def create_partitions(self, data, table: Table) -> None:
+        """
+        Creates the partitions that the rows in data (a list of dicts or a DataFrame) fall into, if table is
+        range partitioned (see range_partitioning) and they don't exist yet.
+        """
+        interval = table.info.get("partition_interval")
+        if interval is None or len(data) == 0:
+            return
+        column_name = table.info["partition_column"]
+        if isinstance(data, pd.DataFrame):
+            values = data[column_name]
+        else:
+            values = pd.Series([row.get(column_name) for row in data])
+        partition_dates = pd.to_datetime(values.drop_duplicates()).dropna().dt.date
+        quote = self.engine.dialect.identifier_preparer.quote
+        with self._partitions_lock:
+            if table.name not in self._table_partitions:
+                self._check_partitioned(table)
+                self._table_partitions[table.name] = set(self.get_partitions(table.name))
+            existing_partitions = self._table_partitions[table.name]
+            for partition_date in partition_dates:
+                suffix, start, end = self._get_partition_bounds(partition_date, interval)
+                partition_name = f"{table.name}_{suffix}"
+                if partition_name in existing_partitions:
+                    continue
+                self.engine.execute(
+                    f"create table if not exists {quote(partition_name)} partition of {quote(table.name)} "
+                    f"for values from ('{start.isoformat()}') to ('{end.isoformat()}')"
+                )
+                existing_partitions.add(partition_name)
+
+    def extension_exists(self, extension_name: str) -> bool:
+        """
+        Checks if the extension is installed in the database.
+        """
+        result = self.engine.execute(
+            text("select 1 from pg_extension where extname = :extension_name"), extension_name=extension_name
+        )
+        return result.first() is not None
+
+    def get_primary_key(self, table_name: str) -> list[str]:
+        """
+        Returns the columns of the table's primary key in the database, in key order. Empty if it has none.
+        Unlike get_table_schema(), this is never cached.
+        """
+        result = self.engine.execute(
+            text("""
+                select attribute.attname as column_name
+                from pg_index index
+                join pg_attribute attribute
+                    on attribute.attrelid = index.indrelid and attribute.attnum = any(index.indkey)
+                where index.indrelid = to_regclass(:table_name) and index.indisprimary
+                order by array_position(index.indkey::int2[], attribute.attnum)
+            """),
+            table_name=self.engine.dialect.identifier_preparer.quote(table_name),
+        )
+        return [row.column_name for row in result]
 
     def table_exists(self, table_name: str) -> bool:
         """
-        Checks if the table already exists in the database.
+        Checks if the table already exists in the database. The answer is cached.
         """
-        return inspect(self.engine).has_table(table_name)
+        if table_name not in self._table_existence:
+            self._table_existence[table_name] = inspect(self.engine).has_table(table_name)
+        return self._table_existence[table_name]
 
     def create_table(self, table_name: str, metadata: MetaData) -> None:
         """
         Creates a single table provided in the metadata object. 
         This method creates the table also if it doesn't exist.
         """
+        if self._table_existence.get(table_name):
+            return
         if table_name not in metadata.tables:
             self.create_all_tables(metadata=metadata)
         else:
@@ -88,68 +408,448 @@ class PostgreSqlClient:
                 Column(column.name, column.type, primary_key=column.primary_key)
                 for column in existing_table.columns
             ]
-            new_table = Table(table_name, new_metadata, *columns)
+            new_table = Table(table_name, new_metadata, *columns, **existing_table.kwargs)
             new_metadata.create_all(bind=self.engine)
+            self._table_existence[table_name] = True
 
     def create_all_tables(self, metadata: MetaData) -> None:
         """
         Creates tables provided in the metadata object
         """
         metadata.create_all(self.engine)
+        for table_name in metadata.tables:
+            self._table_existence[table_name] = True
 
     def drop_table(self, table_name: str) -> None:
         """
         Drops a specified table if it exists
         """
         self.engine.execute(f"drop table if exists {table_name};")
+        self.invalidate_schema_cache(table_name)
+        self._table_existence[table_name] = False
+
+    @staticmethod
+    def get_shadow_table_name(table_name: str) -> str:
+        """
+        Returns the name of the shadow table a replacement for table_name is built in before it is swapped in.
+        """
+        return f"{table_name}__shadow"
+
+    def get_shadow_table(self, table: Table) -> tuple[Table, MetaData]:
+        """
+        Returns a copy of table named after its shadow table, in a metadata object of its own.
+        """
+        shadow_metadata = MetaData()
+        shadow_table = table.to_metadata(shadow_metadata, name=self.get_shadow_table_name(table.name))
+        shadow_table.info.update(table.info)
+        return shadow_table, shadow_metadata
+
+    @staticmethod
+    def _get_swapped_name(relation_name: str, table_name: str, shadow_table_name: str) -> str:
+        """
+        Returns the name a partition or index of the shadow table is renamed to when it is swapped in, or None
+        if it keeps its name.
+        """
+        if relation_name.startswith(shadow_table_name):
+            return table_name + relation_name[len(shadow_table_name):]
+        if relation_name.endswith("__shadow"):
+            return relation_name[: -len("__shadow")]
+        return None
+
+    def _get_index_names(self, relation_names: list[str], connection: Connection = None) -> list[str]:
+        """
+        Returns the names of the indexes on the given tables.
+        """
+        return (connection or self.engine).execute(
+            text("""
+                select index_class.relname as index_name
+                from pg_index
+                join pg_class as index_class on index_class.oid = pg_index.indexrelid
+                join pg_class as table_class on table_class.oid = pg_index.indrelid
+                where table_class.relname = any(:relation_names)
+            """),
+            relation_names=relation_names,
+        ).scalars().all()
+
+    def _copy_indexes_and_grants(self, table_name: str, shadow_table_name: str) -> None:
+        """
+        Recreates the indexes (other than those backing constraints, which the shadow table defines itself) and
+        the grants of table_name on its shadow table. Copied indexes get a `__shadow` suffix until the swap.
+        Indexes the shadow table already has under the same final name are not copied.
+        """
+        quote = self.engine.dialect.identifier_preparer.quote
+        shadow_index_names = {
+            self._get_swapped_name(index_name, table_name, shadow_table_name)
+            for index_name in self._get_index_names([shadow_table_name])
+        }
+        indexes = self.engine.execute(
+            text("""
+                select index_class.relname as index_name, pg_get_indexdef(pg_index.indexrelid) as index_definition
+                from pg_index
+                join pg_class as index_class on index_class.oid = pg_index.indexrelid
+                where pg_index.indrelid = to_regclass(:table_name)
+                and not exists (select 1 from pg_constraint where pg_constraint.conindid = pg_index.indexrelid)
+            """),
+            table_name=quote(table_name),
+        ).all()
+        for index in indexes:
+            if index.index_name in shadow_index_names:
+                continue
+            # names are double quoted by pg_get_indexdef() when needed, and may then contain spaces
+            name = r'(?:"(?:[^"]|"")*"|[^\s".]+)'
+            match = re.match(
+                rf"^(CREATE (?:UNIQUE )?INDEX) {name} ON (?:ONLY )?{name}(?:\.{name})? (USING .*)$",
+                index.index_definition,
+            )
+            if match is None:
+                raise Exception(
+                    f"Cannot copy index '{index.index_name}' of '{table_name}' to its shadow table, its definition "
+                    f"was not understood: {index.index_definition}"
+                )
+            self.engine.execute(
+                f"{match.group(1)} {quote(index.index_name + '__shadow')} "
+                f"ON {quote(shadow_table_name)} {match.group(2)}"
+            )
+        grants = self.engine.execute(
+            text("""
+                select grantee, privilege_type
+                from information_schema.role_table_grants
+                where table_schema = current_schema() and table_name = :table_name
+            """),
+            table_name=table_name,
+        ).all()
+        for grant in grants:
+            grantee = "PUBLIC" if grant.grantee == "PUBLIC" else quote(grant.grantee)
+            self.engine.execute(f"GRANT {grant.privilege_type} ON {quote(shadow_table_name)} TO {grantee}")
+
+    def swap_shadow_table(self, table_name: str) -> None:
+        """
+        Replaces table_name with its fully built shadow table.
+        The indexes and grants of the current table are first recreated on the shadow table. Then, in one short
+        transaction, the current table is dropped and the shadow table, its partitions and their indexes are
+        renamed, so readers only wait for that transaction and never see a missing or half-loaded table.
+        """
+        quote = self.engine.dialect.identifier_preparer.quote
+        shadow_table_name = self.get_shadow_table_name(table_name)
+        if self.table_exists(table_name):
+            self._copy_indexes_and_grants(table_name=table_name, shadow_table_name=shadow_table_name)
+        with self.engine.begin() as connection:
+            shadow_partition_names = connection.execute(
+                text("""
+                    select partition_class.relname
+                    from pg_inherits
+                    join pg_class as partition_class on partition_class.oid = pg_inherits.inhrelid
+                    where pg_inherits.inhparent = to_regclass(:shadow_table_name)
+                """),
+                shadow_table_name=quote(shadow_table_name),
+            ).scalars().all()
+            shadow_index_names = self._get_index_names(
+                [shadow_table_name] + shadow_partition_names, connection=connection
+            )
+            connection.execute(f"drop table if exists {quote(table_name)}")
+            connection.execute(f"alter table {quote(shadow_table_name)} rename to {quote(table_name)}")
+            for partition_name in shadow_partition_names:
+                new_partition_name = self._get_swapped_name(partition_name, table_name, shadow_table_name)
+                if new_partition_name is not None:
+                    connection.execute(f"alter table {quote(partition_name)} rename to {quote(new_partition_name)}")
+            for index_name in shadow_index_names:
+                new_index_name = self._get_swapped_name(index_name, table_name, shadow_table_name)
+                if new_index_name is not None:
+                    connection.execute(f"alter index {quote(index_name)} rename to {quote(new_index_name)}")
+        self.invalidate_schema_cache(table_name)
+        self.invalidate_schema_cache(shadow_table_name)
+
+    def _overwrite_via_shadow_table(self, load_function, data, table: Table) -> None:
+        """
+        Loads data into a fresh shadow table of table with load_function, then swaps it in.
+        """
+        shadow_table, shadow_metadata = self.get_shadow_table(table)
+        self.drop_table(shadow_table.name)
+        load_function(data, table=shadow_table, metadata=shadow_metadata)
+        self.swap_shadow_table(table.name)
 
     def insert(self, data: list[dict], table: Table, metadata: MetaData) -> None:
         """
         Insert data into a database table. This method creates the table also if it doesn't exist.
         """
         self.create_table(table_name=table.name, metadata=metadata)
+        self.create_partitions(data=data, table=table)
         insert_statement = postgresql.insert(table).values(data)
         self.engine.execute(insert_statement)
 
     def overwrite(self, data: list[dict], table: Table, metadata: MetaData) -> None:
         """
         Overwrites data into a database table. This method creates the table also if it doesn't exist.
+        The data is loaded into a shadow table that is then swapped in, see swap_shadow_table().
         """
-        self.drop_table(table.name)
-        self.insert(data=data, table=table, metadata=metadata)
+        self._overwrite_via_shadow_table(self.insert, data=data, table=table)
 
-    def upsert(self, data: list[dict], table: Table, metadata: MetaData) -> None:
+    def upsert(
+        self,
+        data: list[dict],
+        table: Table,
+        metadata: MetaData,
+        connection: Connection = None,
+        skip_unchanged: bool = False,
+    ) -> dict:
         """
         Upserts data into a database table. This method creates the table also if it doesn't exist.
+        If a connection is given, the statement runs on it (and in its transaction) instead of the engine.
+        If skip_unchanged is True, existing rows are only rewritten when a non-key column actually changed,
+        which saves the dead tuple and WAL of rewriting an identical row.
+
+        Returns:
+            dict: The number of rows inserted, updated and (with skip_unchanged) left unchanged.
         """
         self.create_table(table_name=table.name, metadata=metadata)
+        self.create_partitions(data=data, table=table)
         key_columns = [
             pk_column.name for pk_column in table.primary_key.columns.values()
         ]
         insert_statement = postgresql.insert(table).values(data)
+        update_columns = {
+            c.key: c for c in insert_statement.excluded if c.key not in key_columns
+        }
+        changed_condition = None
+        if skip_unchanged:
+            changed_condition = or_(
+                *[table.c[key].is_distinct_from(column) for key, column in update_columns.items()]
+            )
         upsert_statement = insert_statement.on_conflict_do_update(
             index_elements=key_columns,
-            set_={
-                c.key: c for c in insert_statement.excluded if c.key not in key_columns
-            },
+            set_=update_columns,
+            where=changed_condition,
+        )
+        if not self._is_partitioned(table):
+            # xmax is 0 for a freshly inserted row
+            result = (connection or self.engine).execute(
+                upsert_statement.returning(literal_column("(xmax = 0)").label("inserted"))
+            )
+            inserted_flags = result.scalars().all()
+            return _get_upsert_counts(
+                row_count=len(data), written_count=len(inserted_flags), inserted_count=sum(inserted_flags)
+            )
+        # partitioned tables cannot return xmax, so the keys that already exist are counted first instead
+        existing_statement = select(func.count()).select_from(table).where(
+            tuple_(*[table.c[key] for key in key_columns]).in_(
+                [tuple(row.get(key) for key in key_columns) for row in data]
+            )
+        )
+        with (self.engine.begin() if connection is None else nullcontext(connection)) as upsert_connection:
+            existing_count = upsert_connection.execute(existing_statement).scalar()
+            written_count = len(upsert_connection.execute(upsert_statement.returning(literal_column("1"))).all())
+        return _get_upsert_counts(
+            row_count=len(data), written_count=written_count, inserted_count=len(data) - existing_count
+        )
+
+    def _copy_load(
+        self, data, table: Table, upsert: bool, connection: Connection = None, skip_unchanged: bool = False
+    ) -> dict:
+        """
+        Streams `data` (a list of dicts or a DataFrame) into `table` with COPY FROM STDIN.
+        For an insert the rows are copied straight into the table. For an upsert they are copied into a temporary
+        staging table, which is merged into the table with INSERT ... ON CONFLICT DO UPDATE and then dropped;
+        with skip_unchanged, rows whose non-key columns are all unchanged are not rewritten.
+        If a connection is given, the load runs in its transaction and is left to the caller to commit.
+
+        Returns:
+            dict: For an upsert, the number of rows inserted, updated and left unchanged. None for an insert.
+        """
+        if len(data) == 0:
+            return _get_upsert_counts(row_count=0, written_count=0, inserted_count=0) if upsert else None
+        self.create_partitions(data=data, table=table)
+        quote = self.engine.dialect.identifier_preparer.quote
+        if isinstance(data, pd.DataFrame):
+            columns = [column.name for column in table.columns if column.name in data.columns]
+            to_copy_csv = _dataframe_to_copy_csv
+        else:
+            columns = [column.name for column in table.columns if column.name in data[0]]
+            to_copy_csv = _to_copy_csv
+        column_list = ", ".join(quote(column) for column in columns)
+        target = quote(table.name)
+        copy_options = "WITH (FORMAT csv)"
+
+        dbapi_connection = self.engine.raw_connection() if connection is None else connection.connection
+        try:
+            cursor = dbapi_connection.cursor()
+            if not upsert:
+                cursor.execute(
+                    f"COPY {target} ({column_list}) FROM STDIN {copy_options}",
+                    stream=to_copy_csv(data, columns),
+                )
+            else:
+                key_columns = [pk_column.name for pk_column in table.primary_key.columns.values()]
+                staging = quote(f"{table.name}__staging")
+                cursor.execute(
+                    f"CREATE TEMPORARY TABLE {staging} (LIKE {target} INCLUDING DEFAULTS)"
+                )
+                cursor.execute(
+                    f"COPY {staging} ({column_list}) FROM STDIN {copy_options}",
+                    stream=to_copy_csv(data, columns),
+                )
+                key_column_list = ", ".join(quote(column) for column in key_columns)
+                cursor.execute(
+                    f"SELECT count(*) FROM {staging} JOIN {target} USING ({key_column_list})"
+                )
+                existing_count = cursor.fetchone()[0]
+                update_columns = [column for column in columns if column not in key_columns]
+                if update_columns:
+                    conflict_action = "DO UPDATE SET " + ", ".join(
+                        f"{quote(column)} = excluded.{quote(column)}" for column in update_columns
+                    )
+                    if skip_unchanged:
+                        conflict_action += " WHERE " + " OR ".join(
+                            f"{target}.{quote(column)} IS DISTINCT FROM excluded.{quote(column)}"
+                            for column in update_columns
+                        )
+                else:
+                    conflict_action = "DO NOTHING"
+                cursor.execute(
+                    f"INSERT INTO {target} ({column_list}) SELECT {column_list} FROM {staging} "
+                    f"ON CONFLICT ({key_column_list}) {conflict_action} RETURNING 1"
+                )
+                upsert_counts = _get_upsert_counts(
+                    row_count=len(data), written_count=len(cursor.fetchall()), inserted_count=len(data) - existing_count
+                )
+                cursor.execute(f"DROP TABLE {staging}")
+            if connection is None:
+                dbapi_connection.commit()
+            return upsert_counts if upsert else None
+        except Exception:
+            if connection is None:
+                dbapi_connection.rollback()
+            raise
+        finally:
+            if connection is None:
+                dbapi_connection.close()
+
+    def copy_insert(self, data: list[dict], table: Table, metadata: MetaData) -> None:
+        """
+        Bulk inserts data into a database table with COPY. This method creates the table also if it doesn't exist.
+        Much faster than insert() for large batches and not bound by the driver's parameter limit.
+        """
+        self.create_table(table_name=table.name, metadata=metadata)
+        self._copy_load(data=data, table=table, upsert=False)
+
+    def copy_upsert(
+        self,
+        data: list[dict],
+        table: Table,
+        metadata: MetaData,
+        connection: Connection = None,
+        skip_unchanged: bool = False,
+    ) -> dict:
+        """
+        Bulk upserts data into a database table by COPYing it into a temporary staging table and merging that
+        into the table. This method creates the table also if it doesn't exist.
+        If a connection is given, the load runs in its transaction instead of committing on its own.
+        skip_unchanged and the returned counts are as in upsert().
+        """
+        self.create_table(table_name=table.name, metadata=metadata)
+        return self._copy_load(
+            data=data, table=table, upsert=True, connection=connection, skip_unchanged=skip_unchanged
         )
-        self.engine.execute(upsert_statement)
+
+    def copy_overwrite(self, data: list[dict], table: Table, metadata: MetaData) -> None:
+        """
+        Overwrites data into a database table using COPY. This method creates the table also if it doesn't exist.
+        The data is loaded into a shadow table that is then swapped in, see swap_shadow_table().
+        """
+        self._overwrite_via_shadow_table(self.copy_insert, data=data, table=table)
+
+    def insert_dataframe(self, df: pd.DataFrame, table: Table, metadata: MetaData) -> None:
+        """
+        Bulk inserts a DataFrame into a database table with COPY, encoding it column by column instead of
+        converting it to a dict per row. This method creates the table also if it doesn't exist.
+        """
+        self.create_table(table_name=table.name, metadata=metadata)
+        self._copy_load(data=df, table=table, upsert=False)
+
+    def upsert_dataframe(
+        self, df: pd.DataFrame, table: Table, metadata: MetaData, skip_unchanged: bool = False
+    ) -> dict:
+        """
+        Bulk upserts a DataFrame into a database table through a COPY into a staging table, encoding it column by
+        column instead of converting it to a dict per row. This method creates the table also if it doesn't exist.
+        skip_unchanged and the returned counts are as in upsert().
+        """
+        self.create_table(table_name=table.name, metadata=metadata)
+        return self._copy_load(data=df, table=table, upsert=True, skip_unchanged=skip_unchanged)
+
+    def overwrite_dataframe(self, df: pd.DataFrame, table: Table, metadata: MetaData) -> None:
+        """
+        Overwrites a DataFrame into a database table using COPY. This method creates the table also if it doesn't exist.
+        The data is loaded into a shadow table that is then swapped in, see swap_shadow_table().
+        """
+        self._overwrite_via_shadow_table(self.insert_dataframe, data=df, table=table)
+
+    def get_chunksize(self, data: list[dict], table: Table, chunksize: int = None) -> int:
+        """
+        Returns the rows per INSERT ... VALUES statement: chunksize capped so that one statement never exceeds
+        MAX_BIND_PARAMETERS, or the largest chunk that fits if chunksize is None.
+        """
+        column_count = len(data[0]) if len(data) > 0 else len(table.columns)
+        max_chunksize = max(self.MAX_BIND_PARAMETERS // max(column_count, 1), 1)
+        return max_chunksize if chunksize is None else min(chunksize, max_chunksize)
 
     def upsert_in_chunks(
-        self, data: list[dict], table: Table, metadata: MetaData, chunksize: int = 1000
-    ) -> None:
+        self,
+        data: list[dict],
+        table: Table,
+        metadata: MetaData,
+        chunksize: int = None,
+        use_copy: bool = False,
+        max_workers: int = 1,
+        atomic: bool = False,
+        skip_unchanged: bool = False,
+    ) -> dict:
         """
-        Upserts data into a database table in chunks (e.g. 1000 rows at a time) in case of query timeouts or row limitations.
+        Upserts data into a database table in chunks, by default the largest the driver allows, in case of query
+        timeouts or row limitations.
         This method creates the table also if it doesn't exist.
+
+        Args:
+            chunksize: rows per chunk. Capped so that a chunk never exceeds the driver's bind parameter limit;
+                None uses the largest chunk that fits (or all rows in one COPY when use_copy is True)
+            use_copy: load each chunk with copy_upsert() instead of upsert()
+            max_workers: chunks upserted concurrently, each on its own pooled connection
+            atomic: upsert all chunks in one transaction, so either every chunk is committed or none is.
+                The chunks then share one connection, so this cannot be combined with max_workers > 1
+            skip_unchanged: only rewrite existing rows whose non-key columns changed, see upsert()
+
+        Returns:
+            dict: The number of rows inserted, updated and left unchanged, summed over the chunks.
         """
-        max_length = len(data)
-        for i in range(0, max_length, chunksize):
-            if i + chunksize >= max_length:
-                lower_bound = i
-                upper_bound = max_length
-            else:
-                lower_bound = i
-                upper_bound = i + chunksize
-            self.upsert(
-                data=data[lower_bound:upper_bound], table=table, metadata=metadata
-            )
+        if atomic and max_workers > 1:
+            raise Exception("An atomic upsert runs in a single transaction and cannot use max_workers > 1.")
+        if use_copy:
+            chunksize = chunksize or max(len(data), 1)
+        else:
+            chunksize = self.get_chunksize(data=data, table=table, chunksize=chunksize)
+        upsert = self.copy_upsert if use_copy else self.upsert
+        chunks = [data[i : i + chunksize] for i in range(0, len(data), chunksize)]
+        self.create_table(table_name=table.name, metadata=metadata)
+        self.create_partitions(data=data, table=table)
+
+        if atomic:
+            with self.engine.begin() as connection:
+                chunk_counts = [
+                    upsert(
+                        data=chunk, table=table, metadata=metadata, connection=connection, skip_unchanged=skip_unchanged
+                    )
+                    for chunk in chunks
+                ]
+        elif max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                chunk_counts = list(executor.map(
+                    lambda chunk: upsert(data=chunk, table=table, metadata=metadata, skip_unchanged=skip_unchanged),
+                    chunks,
+                ))
+        else:
+            chunk_counts = [
+                upsert(data=chunk, table=table, metadata=metadata, skip_unchanged=skip_unchanged) for chunk in chunks
+            ]
+        return {
+            count_name: sum(counts[count_name] for counts in chunk_counts)
+            for count_name in ["inserted", "updated", "unchanged"]
+        }
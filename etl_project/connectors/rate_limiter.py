@@ -0,0 +1,68 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket that allows `rate` requests per second on average with bursts of up to `capacity` requests.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        if rate <= 0:
+            raise Exception("rate must be greater than 0.")
+        if capacity < 1:
+            raise Exception("capacity must be at least 1.")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Takes one token, blocking until one is available.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+# token buckets shared by every api client in the process, keyed by provider
+_rate_limiters: dict[str, TokenBucket] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def set_rate_limit(provider: str, requests_per_second: float, burst: float = 1) -> None:
+    """
+    Limits all api clients of a provider in this process to requests_per_second, with bursts of up to burst requests.
+    """
+    with _rate_limiters_lock:
+        _rate_limiters[provider] = TokenBucket(rate=requests_per_second, capacity=burst)
+
+
+def remove_rate_limit(provider: str) -> None:
+    """
+    Removes the rate limit of a provider.
+    """
+    with _rate_limiters_lock:
+        _rate_limiters.pop(provider, None)
+
+
+def get_rate_limiter(provider: str) -> TokenBucket:
+    """
+    Returns the token bucket of a provider, or None if the provider is not rate limited.
+    """
+    with _rate_limiters_lock:
+        return _rate_limiters.get(provider)
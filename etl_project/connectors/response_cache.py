@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlparse
+
+
+class ResponseCache:
+    """
+    A persistent on-disk cache of JSON API responses.
+
+    Each response is stored as one json file named after a hash of the url and params (with credentials stripped).
+    Responses for historical dates, e.g. `/api/2024-05-24` or `date_to=2024-05-24`, never change and are kept permanently.
+    Responses for `latest` endpoints expire after `latest_ttl` seconds and all other responses after `ttl` seconds.
+    When the cache grows beyond `max_size_bytes` the least recently used entries are evicted.
+    """
+
+    SENSITIVE_PARAMS = ["access_key"]
+    HISTORICAL_PATH_PATTERN = re.compile(r"/(\d{4}-\d{2}-\d{2})/?$")
+    HISTORICAL_PARAMS = ["date_to", "end_date"]
+
+    def __init__(
+        self,
+        cache_folder_path: str,
+        max_size_bytes: int = 100 * 1024 * 1024,
+        ttl: float = 3600,
+        latest_ttl: float = 300,
+    ):
+        self.cache_folder_path = Path(cache_folder_path)
+        self.cache_folder_path.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_bytes
+        self.ttl = ttl
+        self.latest_ttl = latest_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # entry sizes keyed by cache key, ordered from least to most recently used
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        # the sum of the entry sizes, kept up to date so eviction doesn't have to add them up again
+        self._size_bytes = 0
+        for file_path in sorted(self.cache_folder_path.glob("*.json"), key=lambda path: path.stat().st_mtime):
+            self._set_entry(file_path.stem, file_path.stat().st_size)
+
+    def get_key(self, url: str, params: dict) -> str:
+        """
+        Returns the cache key for a request. Credentials are stripped from the params so keys can be shared across api keys.
+        """
+        cacheable_params = sorted(
+            (name, str(value)) for name, value in params.items() if name not in ResponseCache.SENSITIVE_PARAMS
+        )
+        return hashlib.sha256(json.dumps([url, cacheable_params]).encode("utf-8")).hexdigest()
+
+    def get_ttl(self, url: str, params: dict) -> float:
+        """
+        Returns the number of seconds a response may be cached for, or None if it never expires.
+        A historical date only counts as immutable once it is in the past (UTC).
+        """
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        path = urlparse(url).path
+        match = ResponseCache.HISTORICAL_PATH_PATTERN.search(path)
+        historical_dates = [match.group(1)] if match else []
+        historical_dates += [str(params[name])[:10] for name in ResponseCache.HISTORICAL_PARAMS if name in params]
+        if historical_dates and all(date < today for date in historical_dates):
+            return None
+        if path.rstrip("/").endswith("/latest"):
+            return self.latest_ttl
+        return self.ttl
+
+    def _get_file_path(self, key: str) -> Path:
+        return self.cache_folder_path / f"{key}.json"
+
+    def get(self, url: str, params: dict) -> dict:
+        """
+        Returns the cached response for the request, or None if it is missing or expired.
+        """
+        key = self.get_key(url, params)
+        file_path = self._get_file_path(key)
+        with self._lock:
+            try:
+                with open(file_path, "r") as file:
+                    entry = json.load(file)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self.misses += 1
+                return None
+            if entry["expires_at"] is not None and entry["expires_at"] < time.time():
+                self._remove(key)
+                self.misses += 1
+                return None
+            os.utime(file_path)
+            self._set_entry(key, file_path.stat().st_size)
+            self.hits += 1
+            return entry["data"]
+
+    def set(self, url: str, params: dict, data: dict) -> None:
+        """
+        Stores a response and evicts the least recently used entries if the cache exceeds max_size_bytes.
+        """
+        key = self.get_key(url, params)
+        ttl = self.get_ttl(url, params)
+        entry = {
+            "url": url,
+            "created_at": time.time(),
+            "expires_at": None if ttl is None else time.time() + ttl,
+            "data": data,
+        }
+        file_path = self._get_file_path(key)
+        temp_file_path = file_path.with_suffix(f".{threading.get_ident()}.tmp")
+        with self._lock:
+            with open(temp_file_path, "w") as file:
+                json.dump(entry, file)
+            os.replace(temp_file_path, file_path)
+            self._set_entry(key, file_path.stat().st_size)
+            while self._size_bytes > self.max_size_bytes and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+
+    def _set_entry(self, key: str, size_bytes: int) -> None:
+        """
+        Records the size of an entry and marks it as the most recently used.
+        """
+        self._size_bytes += size_bytes - self._entries.get(key, 0)
+        self._entries[key] = size_bytes
+        self._entries.move_to_end(key)
+
+    def _remove(self, key: str) -> None:
+        self._size_bytes -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._get_file_path(key))
+        except FileNotFoundError:
+            pass
+
+    def get_stats(self) -> dict:
+        """
+        Returns the cache hit and miss counts and the current number of entries and bytes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "size_bytes": self._size_bytes,
+            }
+
+    def reset_stats(self) -> None:
+        """
+        Clears the hit and miss counters.
+        """
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
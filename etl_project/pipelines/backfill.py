@@ -0,0 +1,146 @@
+"""
+Backfills the raw stock_price and currency_exchange_rate tables for a past date range.
+
+The range is split into partitions that are run across a pool of workers through raw_pipeline, which upserts
+each partition. Completed partitions are recorded in the logging database, so re-running an interrupted backfill
+with the same arguments skips the partitions that already succeeded.
+
+Usage:
+    python -m etl_project.pipelines.backfill --start-date 2023-01-01 --end-date 2023-12-31 --partition-days 30 --max-workers 4
+
+Note that the serving pipeline's incremental extracts only copy rows newer than what the serving database already has,
+so serving tables need a full refresh to pick up backfilled history.
+"""
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from etl_project.assets.metadata_logging import MetaDataLogging, MetaDataLoggingStatus
+from etl_project.assets.pipeline_logging import PipelineLogging
+from etl_project.assets.api_usage_logging import ApiUsageLogging
+from etl_project.assets.backfill import get_partitions, BackfillCheckpoint
+from etl_project.pipelines.run import (
+    load_environment_variables,
+    load_pipeline_config,
+    setup_clients,
+    create_clients,
+    get_monthly_quotas,
+    raw_pipeline,
+)
+
+
+def run_backfill(
+        backfill_name: str,
+        pipeline_config: dict,
+        env_vars: dict,
+        start_date: str,
+        end_date: str,
+        partition_days: int = 30,
+        max_workers: int = 1,
+    ) -> None:
+    """
+    Runs raw_pipeline for every partition of [start_date, end_date] that has not completed yet.
+    Each worker thread uses its own set of clients (and so its own http sessions), which share the process-wide
+    rate limits and one response cache.
+    """
+    config = pipeline_config.get("config")
+    # sets the rate limits, response cache and pool settings once, for every worker
+    fixer_api_client, _, _, postgresql_logging_client, _ = setup_clients(env_vars, config=config)
+    response_cache = fixer_api_client.response_cache
+    worker_clients = threading.local()
+
+    def get_worker_clients() -> tuple:
+        if not hasattr(worker_clients, "clients"):
+            worker_clients.clients = create_clients(env_vars, config=config, response_cache=response_cache)
+        return worker_clients.clients
+
+    pipeline_logging = PipelineLogging(
+        pipeline_name=backfill_name,
+        log_folder_path=config.get("log_folder_path"),
+    )
+    metadata_logger = MetaDataLogging(
+        pipeline_name=backfill_name,
+        postgresql_client=postgresql_logging_client,
+        config={**config, "start_date": start_date, "end_date": end_date, "partition_days": partition_days},
+    )
+    api_usage_logging = ApiUsageLogging(
+        postgresql_client=postgresql_logging_client, monthly_quotas=get_monthly_quotas(config)
+    )
+    checkpoint = BackfillCheckpoint(backfill_name=backfill_name, postgresql_client=postgresql_logging_client)
+
+    def run_partition(partition: tuple[str, str]) -> None:
+        partition_start, partition_end = partition
+        fixer_api_client, market_stack_api_client, postgresql_client, _, _ = get_worker_clients()
+        pipeline_logging.logger.info(f"Backfilling partition {partition_start} to {partition_end}")
+        raw_pipeline(
+            fixer_api_client=fixer_api_client,
+            market_stack_api_client=market_stack_api_client,
+            postgresql_client=postgresql_client,
+            pipeline_logging=pipeline_logging,
+            date_from=partition_start,
+            date_to=partition_end,
+            api_usage_logging=api_usage_logging,
+        )
+        checkpoint.mark_completed(partition_start, partition_end)
+        pipeline_logging.logger.info(f"Completed partition {partition_start} to {partition_end}")
+
+    try:
+        metadata_logger.log()  # log start
+        partitions = get_partitions(start_date=start_date, end_date=end_date, partition_days=partition_days)
+        completed_partitions = checkpoint.get_completed_partitions()
+        pending_partitions = [partition for partition in partitions if partition not in completed_partitions]
+        pipeline_logging.logger.info(
+            f"Backfilling {start_date} to {end_date}: {len(partitions)} partitions, "
+            f"{len(partitions) - len(pending_partitions)} already completed"
+        )
+
+        failed_partitions = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(run_partition, partition): partition for partition in pending_partitions}
+            for future, partition in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    pipeline_logging.logger.error(f"Partition {partition[0]} to {partition[1]} failed: {e}")
+                    failed_partitions.append(partition)
+        if failed_partitions:
+            raise Exception(
+                f"{len(failed_partitions)} of {len(pending_partitions)} partitions failed: {failed_partitions}. "
+                "Re-run the backfill to retry them."
+            )
+
+        pipeline_logging.logger.info("Backfill run successful")
+        metadata_logger.log(
+            status=MetaDataLoggingStatus.RUN_SUCCESS, logs=pipeline_logging.get_logs()
+        )  # log end
+        pipeline_logging.logger.handlers.clear()
+    except Exception as e:
+        pipeline_logging.logger.error(f"Backfill run failed. See detailed logs: {e}")
+        pipeline_logging.logger.exception(e)
+        metadata_logger.log(
+            status=MetaDataLoggingStatus.RUN_FAILURE, logs=pipeline_logging.get_logs()
+        )  # log error
+        pipeline_logging.logger.handlers.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start-date", required=True, help="first date to backfill, YYYY-MM-DD")
+    parser.add_argument("--end-date", required=True, help="last date to backfill, YYYY-MM-DD")
+    parser.add_argument("--partition-days", type=int, default=30, help="number of days per partition")
+    parser.add_argument("--max-workers", type=int, default=1, help="number of partitions to run concurrently")
+    args = parser.parse_args()
+
+    env_vars = load_environment_variables()
+    pipeline_config = load_pipeline_config(str(Path(__file__).with_name("run.yaml")))
+
+    run_backfill(
+        backfill_name=f"{pipeline_config.get('pipeline_name')}_backfill",
+        pipeline_config=pipeline_config,
+        env_vars=env_vars,
+        start_date=args.start_date,
+        end_date=args.end_date,
+        partition_days=args.partition_days,
+        max_workers=args.max_workers,
+    )
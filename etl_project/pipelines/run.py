@@ -3,20 +3,27 @@ import os
 import yaml
 from pathlib import Path
 import time
-from sqlalchemy import Table, MetaData, Column, String, Float
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from sqlalchemy import Table, MetaData, Column, String, Float, Date
 from jinja2 import Environment, FileSystemLoader
 from graphlib import TopologicalSorter
 
 from etl_project.connectors.postgresql import PostgreSqlClient
+from etl_project.connectors.engine_registry import configure_pools, get_pool_stats
+from etl_project.connectors.base_api_client import BaseApiClient
+from etl_project.connectors.response_cache import ResponseCache
+from etl_project.connectors.rate_limiter import set_rate_limit
 from etl_project.connectors.fixer_api import FixerApiClient
 from etl_project.connectors.market_stack_api import MarketStackApiClient
 
 from etl_project.assets.metadata_logging import MetaDataLogging, MetaDataLoggingStatus
 from etl_project.assets.pipeline_logging import PipelineLogging
+from etl_project.assets.api_usage_logging import ApiUsageLogging
 
 from etl_project.assets.etl_raw import (
     extract_fixer_table,
-    extract_market_stack_table,
+    extract_market_stack_pages,
     transform_fixer_table,
     transform_market_stack_table,
     load,
@@ -25,6 +32,7 @@ from etl_project.assets.etl_serving import (
     extract_load,
     transform,
     SqlTransform,
+    TransformFingerprintStore,
 )
 
 
@@ -48,12 +56,110 @@ def load_environment_variables() -> dict:
     return env_vars
 
 
-def setup_clients(env_vars) -> tuple:
+def load_symbols(market_stack_config: dict) -> list[str]:
     """
-    Set up and initialize the required clients for the ETL pipeline.
+    Returns the stock symbols to track. Symbols are read from `symbols_file` (one symbol per line, `#` for comments)
+    if it is set, otherwise from the `symbols` list, otherwise the MarketStackApiClient defaults are used.
     """
-    fixer_api_client = FixerApiClient(fixer_access_key=env_vars['FIXER_ACCESS_KEY'])
-    market_stack_api_client = MarketStackApiClient(market_stack_access_key=env_vars['MARKET_STACK_ACCESS_KEY'])
+    symbols_file = market_stack_config.get("symbols_file")
+    if symbols_file is not None:
+        with open(symbols_file, "r") as file:
+            lines = [line.split("#")[0].strip() for line in file.readlines()]
+        return [line.upper() for line in lines if line != ""]
+    return market_stack_config.get("symbols", MarketStackApiClient.DEFAULT_SYMBOLS)
+
+
+def get_currencies(config: dict) -> list[str]:
+    """
+    Returns the currencies Fixer rates are extracted for, from `fixer.currencies`. They must include USD, as
+    MarketStack prices are in USD and are converted into the other currencies through the USD rate.
+    """
+    currencies = config.get("fixer", {}).get("currencies", FixerApiClient.DEFAULT_CURRENCIES)
+    if "USD" not in [currency.upper() for currency in currencies]:
+        raise Exception(f"fixer.currencies {currencies} must include USD, the currency MarketStack prices are in.")
+    return currencies
+
+
+def load_pipeline_config(yaml_file_path: str) -> dict:
+    """
+    Loads the pipeline config from a yaml file.
+    """
+    if Path(yaml_file_path).exists():
+        with open(yaml_file_path) as yaml_file:
+            return yaml.safe_load(yaml_file)
+    else:
+        raise Exception(
+            f"Missing {yaml_file_path} file! Please create the yaml file with at least a `name` key for the pipeline name."
+        )
+
+
+def setup_rate_limits(config: dict = {}) -> None:
+    """
+    Sets the process-wide rate limit of every provider in the `rate_limits` config with a requests_per_second.
+    This replaces the providers' token buckets, so it should run once per process, not once per client.
+    """
+    for provider, rate_limit in config.get("rate_limits", {}).items():
+        if rate_limit.get("requests_per_second") is not None:
+            set_rate_limit(provider, rate_limit["requests_per_second"], burst=rate_limit.get("burst", 1))
+
+
+def setup_response_cache(config: dict = {}) -> ResponseCache:
+    """
+    Returns the response cache set in the `cache` config, or None if there is none.
+    Clients that store responses in the same folder should share one cache, so its size limit holds.
+    """
+    cache_config = config.get("cache")
+    if cache_config is None:
+        return None
+    return ResponseCache(
+        cache_folder_path=cache_config.get("cache_folder_path"),
+        max_size_bytes=cache_config.get("max_size_bytes", 100 * 1024 * 1024),
+        ttl=cache_config.get("ttl", 3600),
+        latest_ttl=cache_config.get("latest_ttl", 300),
+    )
+
+
+def setup_clients(env_vars, config: dict = {}) -> tuple:
+    """
+    Set up and initialize the required clients for the ETL pipeline, along with the process-wide rate limits,
+    response cache and connection pool settings they use.
+    """
+    setup_rate_limits(config)
+    # engines are created lazily and shared by clients of the same database
+    configure_pools(**config.get("postgres_pool", {}))
+    return create_clients(env_vars, config=config, response_cache=setup_response_cache(config))
+
+
+def create_clients(env_vars, config: dict = {}, response_cache: ResponseCache = None) -> tuple:
+    """
+    Creates the api and database clients of the ETL pipeline, each api client with an http session of its own.
+    Unlike setup_clients(), no process-wide state is changed, so this can be called once per worker thread with the
+    response cache returned by setup_response_cache().
+    """
+    http_config = config.get("http", {})
+    fixer_config = config.get("fixer", {})
+    fixer_api_client = FixerApiClient(
+        fixer_access_key=env_vars['FIXER_ACCESS_KEY'],
+        base_url=fixer_config.get("base_url", "http://data.fixer.io/api"),
+        currencies=get_currencies(config),
+        window_days=fixer_config.get("window_days", 6),
+        max_workers=fixer_config.get("max_workers", 1),
+        extraction_mode=fixer_config.get("extraction_mode", FixerApiClient.DAILY_MODE),
+        response_cache=response_cache,
+        **http_config,
+    )
+    market_stack_config = config.get("market_stack", {})
+    market_stack_api_client = MarketStackApiClient(
+        market_stack_access_key=env_vars['MARKET_STACK_ACCESS_KEY'],
+        base_url=market_stack_config.get("base_url", "http://api.marketstack.com/v1"),
+        symbols=load_symbols(market_stack_config),
+        batch_size=market_stack_config.get("batch_size", MarketStackApiClient.MAX_SYMBOLS_PER_REQUEST),
+        limit=market_stack_config.get("limit", 1000),
+        max_workers=market_stack_config.get("max_workers", 1),
+        window_days=market_stack_config.get("window_days"),
+        response_cache=response_cache,
+        **http_config,
+    )
 
     postgresql_client = PostgreSqlClient(
         server_name=env_vars['SERVER_NAME'],
@@ -82,55 +188,112 @@ def setup_clients(env_vars) -> tuple:
     return fixer_api_client, market_stack_api_client, postgresql_client, postgresql_logging_client, postgresql_target_client
 
 
-def raw_pipeline(
-        fixer_api_client: FixerApiClient, 
-        market_stack_api_client: MarketStackApiClient, 
-        postgresql_client: PostgreSqlClient, 
-        pipeline_logging: PipelineLogging
+def get_monthly_quotas(config: dict) -> dict:
+    """
+    Returns the monthly credit quota of every provider in the `rate_limits` config that has one.
+    """
+    return {
+        provider: rate_limit["monthly_quota"]
+        for provider, rate_limit in config.get("rate_limits", {}).items()
+        if rate_limit.get("monthly_quota") is not None
+    }
+
+
+def log_api_request_stats(
+        api_name: str,
+        api_client: BaseApiClient,
+        pipeline_logging: PipelineLogging,
+        api_usage_logging: ApiUsageLogging = None,
     ) -> None:
     """
-    Executes the raw data pipeline.
+    Writes the latency and retry count of every request made by the api client to the pipeline log,
+    followed by a summary including response cache hits/misses, and then clears the client's request stats.
+    If api_usage_logging is given, the credits used are added to the provider's monthly total.
     """
-    pipeline_logging.logger.info("Starting raw_pipeline")
+    for stat in api_client.request_stats:
+        pipeline_logging.logger.info(
+            f"{api_name} GET {stat['url']} status={stat['status_code']} latency={stat['latency']:.3f}s retries={stat['retries']}"
+        )
+    request_stats = api_client.get_request_stats()
+    pipeline_logging.logger.info(f"{api_name} request stats: {request_stats}")
+    api_client.reset_request_stats()
+    if api_usage_logging is not None and request_stats["credits"] > 0:
+        monthly_credits = api_usage_logging.log(provider=api_client.PROVIDER, credits=request_stats["credits"])
+        pipeline_logging.logger.info(f"{api_name} credits used this month: {monthly_credits}")
+        if api_usage_logging.is_over_quota(api_client.PROVIDER, monthly_credits):
+            pipeline_logging.logger.warning(
+                f"{api_name} has used {monthly_credits} credits this month, "
+                f"more than its quota of {api_usage_logging.monthly_quotas[api_client.PROVIDER]}"
+            )
+
+
+def log_pool_stats(pipeline_logging: PipelineLogging) -> None:
+    """
+    Writes the checkout wait times and connection usage of every database connection pool to the pipeline log.
+    """
+    for database, pool_stats in get_pool_stats().items():
+        pipeline_logging.logger.info(f"Connection pool stats for {database}: {pool_stats}")
+
+
+def currency_pipeline(
+        fixer_api_client: FixerApiClient,
+        postgresql_client: PostgreSqlClient,
+        pipeline_logging: PipelineLogging,
+        date_from: str = None,
+        date_to: str = None,
+        api_usage_logging: ApiUsageLogging = None,
+    ) -> None:
+    """
+    Extracts, transforms and loads the Fixer exchange rates into currency_exchange_rate.
+    """
+    metadata = MetaData()
+    currency_table = Table(
+        "currency_exchange_rate",
+        metadata,
+        Column("date", Date, primary_key=True),
+        Column("base", String),
+        *[Column(f"rate_{currency.lower()}", Float) for currency in fixer_api_client.currencies],
+        **PostgreSqlClient.range_partitioning("date", PostgreSqlClient.YEARLY_PARTITIONS),
+    )
 
     # extract
     pipeline_logging.logger.info("Extracting data from Fixer API")
-    df_currency = extract_fixer_table(fixer_api_client=fixer_api_client)
-    pipeline_logging.logger.info("Extracting data from MarketStack API")
-    df_stocks = extract_market_stack_table(market_stack_api_client=market_stack_api_client)
-     
+    df_currency = extract_fixer_table(fixer_api_client=fixer_api_client, start_date=date_from, end_date=date_to)
+    log_api_request_stats("Fixer API", fixer_api_client, pipeline_logging, api_usage_logging)
+
     # transform
     pipeline_logging.logger.info("Transforming Fixer dataframe")
     df_currency_transformed = transform_fixer_table(df_currency=df_currency)
-    pipeline_logging.logger.info("Transforming MarketStack dataframe")
-    df_stocks_transformed = transform_market_stack_table(df_stocks=df_stocks)
 
     # load
-    metadata = MetaData()
     pipeline_logging.logger.info("Loading Fixer data to Postgres")
-    currency_table = Table(
-        "currency_exchange_rate",
-        metadata,
-        Column("date", String, primary_key=True),
-        Column("base", String),
-        Column("rate_usd", Float),
-        Column("rate_cny", Float),
-        Column("rate_inr", Float),
-        Column("rate_aud", Float),
-    )
-    load(
+    load_counts = load(
         df=df_currency_transformed,
         postgresql_client=postgresql_client,
         table=currency_table,
         metadata=metadata,
         load_method="upsert",
+        skip_unchanged=True,
     )
+    pipeline_logging.logger.info(f"Loaded Fixer data: {load_counts}")
+
 
-    pipeline_logging.logger.info("Loading MarketStack data to Postgres")
+def stock_pipeline(
+        market_stack_api_client: MarketStackApiClient,
+        postgresql_client: PostgreSqlClient,
+        pipeline_logging: PipelineLogging,
+        date_from: str = None,
+        date_to: str = None,
+        api_usage_logging: ApiUsageLogging = None,
+    ) -> None:
+    """
+    Extracts, transforms and loads the MarketStack stock prices into stock_price, one page at a time.
+    """
+    metadata = MetaData()
     stock_table = Table(
         "stock_price",
         metadata,
-        Column("date", String, primary_key=True),
+        Column("date", Date, primary_key=True),
         Column("symbol", String, primary_key=True),
         Column("open", Float),
         Column("high", Float),
@@ -138,53 +301,149 @@ def raw_pipeline(
         Column("close", Float),
         Column("volume", Float),
         Column("exchange", String),
+        **PostgreSqlClient.range_partitioning("date", PostgreSqlClient.MONTHLY_PARTITIONS),
     )
-    load(
-        df=df_stocks_transformed,
-        postgresql_client=postgresql_client,
-        table=stock_table,
-        metadata=metadata,
-        load_method="upsert",
+
+    # extract, transform and load one page at a time
+    pipeline_logging.logger.info("Extracting, transforming and loading MarketStack data page by page")
+    stock_pages = extract_market_stack_pages(
+        market_stack_api_client=market_stack_api_client, date_from=date_from, date_to=date_to
     )
+    for page_number, df_stocks in enumerate(stock_pages, start=1):
+        df_stocks_transformed = transform_market_stack_table(df_stocks=df_stocks)
+        if len(df_stocks_transformed) == 0:
+            continue
+        load_counts = load(
+            df=df_stocks_transformed,
+            postgresql_client=postgresql_client,
+            table=stock_table,
+            metadata=metadata,
+            load_method="upsert",
+            skip_unchanged=True,
+        )
+        pipeline_logging.logger.info(f"Loaded MarketStack page {page_number}: {load_counts}")
+    log_api_request_stats("MarketStack API", market_stack_api_client, pipeline_logging, api_usage_logging)
+    for batch_report in market_stack_api_client.batch_reports:
+        pipeline_logging.logger.info(f"MarketStack batch report: {batch_report}")
+    failed_batches = market_stack_api_client.get_failed_batches()
+    if failed_batches:
+        raise Exception(
+            f"{len(failed_batches)} of {len(market_stack_api_client.batch_reports)} MarketStack batches failed. "
+            f"The other batches were loaded. Failed batches: {failed_batches}"
+        )
+
+
+def raw_pipeline(
+        fixer_api_client: FixerApiClient, 
+        market_stack_api_client: MarketStackApiClient, 
+        postgresql_client: PostgreSqlClient, 
+        pipeline_logging: PipelineLogging,
+        date_from: str = None,
+        date_to: str = None,
+        api_usage_logging: ApiUsageLogging = None,
+    ) -> None:
+    """
+    Executes the raw data pipeline.
+    The currency and stock branches share nothing until the serving stage, so they run concurrently and the
+    raw stage takes as long as the slower branch. A failing branch does not stop the other one; once both
+    have finished, any failures are raised together.
+    Both APIs are optionally limited to [date_from, date_to].
+    If api_usage_logging is given, the API credits used are recorded in it.
+    """
+    pipeline_logging.logger.info("Starting raw_pipeline")
+
+    def run_branch(branch_name: str, branch: Callable, **kwargs) -> None:
+        start = time.perf_counter()
+        branch(
+            postgresql_client=postgresql_client,
+            pipeline_logging=pipeline_logging,
+            date_from=date_from,
+            date_to=date_to,
+            api_usage_logging=api_usage_logging,
+            **kwargs,
+        )
+        pipeline_logging.logger.info(f"{branch_name} branch finished in {time.perf_counter() - start:.2f}s")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = {
+            "Fixer": executor.submit(run_branch, "Fixer", currency_pipeline, fixer_api_client=fixer_api_client),
+            "MarketStack": executor.submit(
+                run_branch, "MarketStack", stock_pipeline, market_stack_api_client=market_stack_api_client
+            ),
+        }
+    failed_branches = []
+    for branch_name, future in futures.items():
+        if future.exception() is not None:
+            pipeline_logging.logger.error(f"{branch_name} branch failed: {future.exception()}")
+            failed_branches.append(f"{branch_name}: {future.exception()}")
+
+    if fixer_api_client.response_cache is not None:
+        pipeline_logging.logger.info(f"Response cache stats: {fixer_api_client.response_cache.get_stats()}")
+    if failed_branches:
+        raise Exception(f"{len(failed_branches)} raw_pipeline branches failed. {' | '.join(failed_branches)}")
     pipeline_logging.logger.info("Raw pipeline run successful")
 
 
 def serving_pipeline(
         postgresql_client: PostgreSqlClient, 
         postgresql_target_client: PostgreSqlClient,
-        pipeline_logging: PipelineLogging
+        pipeline_logging: PipelineLogging,
+        config: dict = {},
     ) -> None:
     """
     Executes the serving pipeline.
+    The `serving` block of config sets how the extracted tables are upserted into the serving database.
     """
+    serving_config = config.get("serving") or {}
     pipeline_logging.logger.info("Starting serving_pipeline")
+    # the templates select a rate_<currency> (and build a close_<currency>) column per configured currency
+    template_globals = {"currencies": [currency.lower() for currency in get_currencies(config)]}
+
+    # unchanged tables are skipped, based on the fingerprints of the inputs they were last built from;
+    # extract and load records which of the tables it loads changed
+    fingerprint_store = None
+    if serving_config.get("skip_unchanged_transforms", False):
+        fingerprint_store = TransformFingerprintStore(postgresql_client=postgresql_target_client)
 
     # extract and load
     extract_template_environment = Environment(
         loader=FileSystemLoader("etl_project/assets/sql/extract")
     )
+    extract_template_environment.globals.update(template_globals)
     pipeline_logging.logger.info("Perform extract and load")
     extract_load(
         template_environment=extract_template_environment,
         source_postgresql_client=postgresql_client,
         target_postgresql_client=postgresql_target_client,
+        max_workers=serving_config.get("upsert_max_workers", 1),
+        atomic=serving_config.get("atomic", False),
+        batch_size=serving_config.get("extract_batch_size"),
+        transfer_mode=serving_config.get("transfer_mode", "auto"),
+        table_max_workers=serving_config.get("extract_max_workers", 1),
+        pipeline_logging=pipeline_logging,
+        fingerprint_store=fingerprint_store,
     )
 
     # transform
     transform_template_environment = Environment(
         loader=FileSystemLoader("etl_project/assets/sql/transform")
     )
+    transform_template_environment.globals.update(template_globals)
 
     # create nodes
     stock_prices_in_currencies = SqlTransform(
         table_name="stock_prices_in_currencies",
         postgresql_client=postgresql_target_client,
         environment=transform_template_environment,
+        full_refresh=serving_config.get("full_refresh", False),
+        fingerprint_store=fingerprint_store,
     )
     aggregated_stock_profiles = SqlTransform(
         table_name="aggregated_stock_profiles",
         postgresql_client=postgresql_target_client,
         environment=transform_template_environment,
+        full_refresh=serving_config.get("full_refresh", False),
+        fingerprint_store=fingerprint_store,
     )
 
     # create DAG
@@ -193,7 +452,7 @@ def serving_pipeline(
     dag.add(aggregated_stock_profiles, stock_prices_in_currencies)
     # run transform
     pipeline_logging.logger.info("Perform transform")
-    transform(dag=dag)
+    transform(dag=dag, pipeline_logging=pipeline_logging, max_workers=serving_config.get("transform_max_workers", 1))
     pipeline_logging.logger.info("Serving pipeline run successful")
 
 
@@ -218,19 +477,28 @@ def run_pipeline(
         postgresql_client=postgresql_logging_client,
         config=pipeline_config.get("config"),
     )
+    api_usage_logging = ApiUsageLogging(
+        postgresql_client=postgresql_logging_client,
+        monthly_quotas=get_monthly_quotas(pipeline_config.get("config")),
+    )
     try:
         metadata_logger.log()  # log start
         raw_pipeline(
             fixer_api_client=fixer_api_client, 
             market_stack_api_client=market_stack_api_client, 
             postgresql_client=postgresql_client, 
-            pipeline_logging=pipeline_logging
+            pipeline_logging=pipeline_logging,
+            date_from=pipeline_config.get("config").get("date_from"),
+            date_to=pipeline_config.get("config").get("date_to"),
+            api_usage_logging=api_usage_logging,
         )
         serving_pipeline(
             postgresql_client=postgresql_client, 
             postgresql_target_client=postgresql_target_client,
-            pipeline_logging=pipeline_logging
+            pipeline_logging=pipeline_logging,
+            config=pipeline_config.get("config"),
         )
+        log_pool_stats(pipeline_logging)
         metadata_logger.log(
             status=MetaDataLoggingStatus.RUN_SUCCESS, logs=pipeline_logging.get_logs()
         )  # log end
@@ -238,6 +506,7 @@ def run_pipeline(
     except Exception as e:
         pipeline_logging.logger.error(f"Pipeline run failed. See detailed logs: {e}")
         pipeline_logging.logger.exception(e)
+        log_pool_stats(pipeline_logging)
         metadata_logger.log(
             status=MetaDataLoggingStatus.RUN_FAILURE, logs=pipeline_logging.get_logs()
         )  # log error
@@ -246,18 +515,14 @@ def run_pipeline(
 
 if __name__ == "__main__":
     env_vars = load_environment_variables()
-    fixer_api_client, market_stack_api_client, postgresql_client, postgresql_logging_client, postgresql_target_client = setup_clients(env_vars)
 
     # get config variables
-    yaml_file_path = __file__.replace(".py", ".yaml")
-    if Path(yaml_file_path).exists():
-        with open(yaml_file_path) as yaml_file:
-            pipeline_config = yaml.safe_load(yaml_file)
-            PIPELINE_NAME = pipeline_config.get("pipeline_name")
-    else:
-        raise Exception(
-            f"Missing {yaml_file_path} file! Please create the yaml file with at least a `name` key for the pipeline name."
-        )
+    pipeline_config = load_pipeline_config(__file__.replace(".py", ".yaml"))
+    PIPELINE_NAME = pipeline_config.get("pipeline_name")
+
+    fixer_api_client, market_stack_api_client, postgresql_client, postgresql_logging_client, postgresql_target_client = setup_clients(
+        env_vars, config=pipeline_config.get("config")
+    )
 
     # run pipelines
     run_pipeline(
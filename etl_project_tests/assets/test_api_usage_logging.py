@@ -0,0 +1,37 @@
+import pytest
+from dotenv import load_dotenv
+import os
+from datetime import datetime
+from etl_project.connectors.postgresql import PostgreSqlClient
+from etl_project.assets.api_usage_logging import ApiUsageLogging
+
+
+@pytest.fixture
+def setup_postgresql_client():
+    load_dotenv()
+    postgresql_client = PostgreSqlClient(
+        server_name=os.environ.get("LOGGING_SERVER_NAME"),
+        database_name=os.environ.get("LOGGING_DATABASE_NAME"),
+        username=os.environ.get("LOGGING_USERNAME"),
+        password=os.environ.get("LOGGING_PASSWORD"),
+        port=os.environ.get("LOGGING_PORT"),
+    )
+    return postgresql_client
+
+
+def test_api_usage_logging_accumulates_monthly_credits(setup_postgresql_client):
+    postgresql_client = setup_postgresql_client
+    postgresql_client.drop_table("test_api_usage")
+    api_usage_logging = ApiUsageLogging(
+        postgresql_client=postgresql_client, monthly_quotas={"fixer": 10}, usage_table_name="test_api_usage"
+    )
+
+    api_usage_logging.log(provider="fixer", credits=7, timestamp=datetime(2024, 5, 1))
+    monthly_credits = api_usage_logging.log(provider="fixer", credits=5, timestamp=datetime(2024, 5, 20))
+    api_usage_logging.log(provider="fixer", credits=1, timestamp=datetime(2024, 6, 1))
+
+    assert monthly_credits == 12
+    assert api_usage_logging.is_over_quota("fixer", monthly_credits)
+    assert api_usage_logging.get_credits("fixer", "2024-06") == 1
+
+    postgresql_client.drop_table("test_api_usage")
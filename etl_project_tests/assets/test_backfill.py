@@ -0,0 +1,19 @@
+import pytest
+from etl_project.assets.backfill import get_partitions
+
+
+def test_get_partitions():
+    # Act
+    partitions = get_partitions(start_date="2024-01-01", end_date="2024-03-05", partition_days=30)
+
+    # Assert
+    assert partitions == [
+        ("2024-01-01", "2024-01-30"),
+        ("2024-01-31", "2024-02-29"),
+        ("2024-03-01", "2024-03-05"),
+    ]
+
+
+def test_get_partitions_rejects_reversed_range():
+    with pytest.raises(Exception):
+        get_partitions(start_date="2024-03-05", end_date="2024-01-01", partition_days=30)
@@ -64,3 +64,14 @@ def test_transform_market_stack_table(setup_input_market_stack_df):
 
     # Assert
     pd.testing.assert_frame_equal(left=actual_df, right=expected_df, check_exact=True)
+
+
+def test_transform_market_stack_table_reads_every_page(setup_input_market_stack_df):
+    # Assemble
+    df_stocks = pd.concat([setup_input_market_stack_df, setup_input_market_stack_df], ignore_index=True)
+
+    # Act
+    actual_df = transform_market_stack_table(df_stocks)
+
+    # Assert
+    assert actual_df['symbol'].tolist() == ['AAPL', 'MSFT', 'AAPL', 'MSFT']
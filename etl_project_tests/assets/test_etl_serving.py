@@ -0,0 +1,471 @@
+import pytest
+from dotenv import load_dotenv
+import os
+import time
+from graphlib import TopologicalSorter
+from jinja2 import Environment, DictLoader
+from etl_project.assets.etl_serving import (
+    SqlTransform,
+    SqlTransformConfig,
+    TransformFingerprintStore,
+    extract_load,
+    transform,
+)
+from etl_project.connectors.postgresql import PostgreSqlClient
+
+
+@pytest.fixture
+def setup_postgresql_client():
+    load_dotenv()
+    return PostgreSqlClient(
+        server_name=os.environ.get("SERVER_NAME"),
+        database_name=os.environ.get("DATABASE_NAME"),
+        username=os.environ.get("DB_USERNAME"),
+        password=os.environ.get("DB_PASSWORD"),
+        port=os.environ.get("PORT"),
+    )
+
+
+@pytest.fixture
+def setup_target_postgresql_client():
+    load_dotenv()
+    return PostgreSqlClient(
+        server_name=os.environ.get("TARGET_SERVER_NAME"),
+        database_name=os.environ.get("TARGET_DATABASE_NAME"),
+        username=os.environ.get("TARGET_DB_USERNAME"),
+        password=os.environ.get("TARGET_DB_PASSWORD"),
+        port=os.environ.get("TARGET_PORT"),
+    )
+
+
+def test_extract_load_on_the_same_server(setup_postgresql_client, setup_target_postgresql_client):
+    source_postgresql_client, target_postgresql_client = setup_postgresql_client, setup_target_postgresql_client
+    for postgresql_client in [source_postgresql_client, target_postgresql_client]:
+        postgresql_client.drop_table("test_extract")
+    source_postgresql_client.execute_sql("""
+        create table test_extract (id integer primary key, value text);
+        insert into test_extract values (1, 'a'), (2, 'b');
+    """)
+    template = """
+        {% set config = {"extract_type": "full", "source_table_name": "test_extract"} %}
+        select id, value from test_extract
+    """
+    environment = Environment(loader=DictLoader({"test_extract.sql": template}))
+
+    # pushed down with dblink where the target database has it, otherwise transferred through python
+    extract_load(
+        template_environment=environment,
+        source_postgresql_client=source_postgresql_client,
+        target_postgresql_client=target_postgresql_client,
+    )
+
+    result = target_postgresql_client.run_sql("select id, value from test_extract order by id")
+    assert result == [{"id": 1, "value": "a"}, {"id": 2, "value": "b"}]
+    with pytest.raises(Exception, match="not supported"):
+        extract_load(environment, source_postgresql_client, target_postgresql_client, transfer_mode="rsync")
+
+    for postgresql_client in [source_postgresql_client, target_postgresql_client]:
+        postgresql_client.drop_table("test_extract")
+
+
+def test_extract_load_reextracts_rows_within_the_lookback(setup_postgresql_client, setup_target_postgresql_client):
+    source_postgresql_client, target_postgresql_client = setup_postgresql_client, setup_target_postgresql_client
+    for postgresql_client in [source_postgresql_client, target_postgresql_client]:
+        postgresql_client.drop_table("test_extract")
+    source_postgresql_client.execute_sql("""
+        create table test_extract (id integer primary key, value text);
+        insert into test_extract values (1, 'old'), (2, 'old'), (3, 'old');
+    """)
+    template = """
+        {% set config = {
+            "extract_type": "incremental", "incremental_column": "id", "incremental_lookback": 1,
+            "source_table_name": "test_extract"
+        } %}
+        select id, value from test_extract
+        {% if is_incremental %} where id > {{ incremental_value }} {% endif %}
+    """
+    environment = Environment(loader=DictLoader({"test_extract.sql": template}))
+
+    extract_load(environment, source_postgresql_client, target_postgresql_client, transfer_mode="python")
+    source_postgresql_client.execute_sql("update test_extract set value = 'new'")
+    extract_load(environment, source_postgresql_client, target_postgresql_client, transfer_mode="python")
+
+    # only the row within the lookback of the target's max id (3) is extracted again
+    result = target_postgresql_client.run_sql("select id, value from test_extract order by id")
+    assert result == [{"id": 1, "value": "old"}, {"id": 2, "value": "old"}, {"id": 3, "value": "new"}]
+
+    for postgresql_client in [source_postgresql_client, target_postgresql_client]:
+        postgresql_client.drop_table("test_extract")
+
+
+def test_extract_load_pushdown_errors_hide_the_source_password(
+    setup_postgresql_client, setup_target_postgresql_client
+):
+    source_postgresql_client, target_postgresql_client = setup_postgresql_client, setup_target_postgresql_client
+    for postgresql_client in [source_postgresql_client, target_postgresql_client]:
+        postgresql_client.drop_table("test_extract")
+    source_postgresql_client.execute_sql("create table test_extract (id integer primary key, value text)")
+    # stands in for a dblink that cannot connect to the source
+    target_postgresql_client.execute_sql("""
+        create function dblink(text, text) returns setof record language plpgsql as $$
+        begin raise exception 'could not establish connection'; end $$
+    """)
+    template = """
+        {% set config = {"extract_type": "full", "source_table_name": "test_extract"} %}
+        select id, value from test_extract
+    """
+    environment = Environment(loader=DictLoader({"test_extract.sql": template}))
+
+    try:
+        with pytest.raises(Exception, match="could not establish connection") as error:
+            extract_load(environment, source_postgresql_client, target_postgresql_client, transfer_mode="pushdown")
+        assert f"password='{source_postgresql_client.password}'" not in str(error.value)
+    finally:
+        target_postgresql_client.execute_sql("drop function dblink(text, text)")
+        for postgresql_client in [source_postgresql_client, target_postgresql_client]:
+            postgresql_client.drop_table("test_extract")
+
+
+def test_extract_load_pushdown_into_partitioned_table(setup_postgresql_client, setup_target_postgresql_client):
+    source_postgresql_client, target_postgresql_client = setup_postgresql_client, setup_target_postgresql_client
+    for postgresql_client in [source_postgresql_client, target_postgresql_client]:
+        postgresql_client.drop_table("test_extract")
+    target_postgresql_client.drop_table("test_extract_rows")
+    source_postgresql_client.execute_sql("""
+        create table test_extract (date date, id integer, primary key (date, id)) partition by range (date);
+        create table test_extract_p2024_01 partition of test_extract for values from ('2024-01-01') to ('2024-02-01');
+    """)
+    # stands in for dblink by running the extract on the target, where the rows to extract are
+    target_postgresql_client.execute_sql("""
+        create table test_extract_rows as select date '2024-01-05' as date, 1 as id union all select date '2024-03-01', 2;
+        create function dblink(text, text) returns setof record language plpgsql as $$
+        begin return query execute $2; end $$
+    """)
+    template = """
+        {% set config = {"extract_type": "full", "source_table_name": "test_extract"} %}
+        select date, id from test_extract_rows
+    """
+    environment = Environment(loader=DictLoader({"test_extract.sql": template}))
+
+    try:
+        for _ in range(2):
+            extract_load(environment, source_postgresql_client, target_postgresql_client, transfer_mode="pushdown")
+
+        assert len(target_postgresql_client.run_sql("select * from test_extract")) == 2
+        assert target_postgresql_client.get_partitions("test_extract") == ["test_extract_p2024_03", "test_extract_p2024_01"]
+    finally:
+        target_postgresql_client.execute_sql("drop function dblink(text, text)")
+        for postgresql_client in [source_postgresql_client, target_postgresql_client]:
+            postgresql_client.drop_table("test_extract")
+        target_postgresql_client.drop_table("test_extract_rows")
+
+
+def test_extract_load_reports_failed_tables_without_hiding_the_others(
+    setup_postgresql_client, setup_target_postgresql_client
+):
+    source_postgresql_client, target_postgresql_client = setup_postgresql_client, setup_target_postgresql_client
+    for postgresql_client in [source_postgresql_client, target_postgresql_client]:
+        postgresql_client.drop_table("test_extract")
+    source_postgresql_client.execute_sql("""
+        create table test_extract (id integer primary key, value text);
+        insert into test_extract values (1, 'a'), (2, 'b');
+    """)
+    environment = Environment(loader=DictLoader({
+        "test_extract.sql": """
+            {% set config = {"extract_type": "full", "source_table_name": "test_extract"} %}
+            select id, value from test_extract
+        """,
+        "test_extract_missing.sql": """
+            {% set config = {"extract_type": "full", "source_table_name": "test_extract_missing"} %}
+            select id from test_extract_missing
+        """,
+    }))
+
+    with pytest.raises(Exception, match="1 of 2 tables failed .* 1 succeeded.*test_extract_missing"):
+        extract_load(
+            template_environment=environment,
+            source_postgresql_client=source_postgresql_client,
+            target_postgresql_client=target_postgresql_client,
+            transfer_mode="python",
+            table_max_workers=2,
+        )
+
+    result = target_postgresql_client.run_sql("select id, value from test_extract order by id")
+    assert result == [{"id": 1, "value": "a"}, {"id": 2, "value": "b"}]
+
+    for postgresql_client in [source_postgresql_client, target_postgresql_client]:
+        postgresql_client.drop_table("test_extract")
+
+
+def test_sql_transform_create_table_as_keeps_indexes(setup_postgresql_client):
+    postgresql_client = setup_postgresql_client
+    postgresql_client.drop_table("test_transform")
+    environment = Environment(loader=DictLoader({"test_transform.sql": "select 1 as id, 'hello' as value"}))
+    sql_transform = SqlTransform(
+        postgresql_client=postgresql_client, environment=environment, table_name="test_transform"
+    )
+
+    sql_transform.create_table_as()
+    postgresql_client.execute_sql("create index test_transform_id_idx on test_transform (id)")
+    sql_transform.create_table_as()
+
+    assert postgresql_client.run_sql("select * from test_transform") == [{"id": 1, "value": "hello"}]
+    indexes = postgresql_client.run_sql("select indexname from pg_indexes where tablename = 'test_transform'")
+    assert indexes == [{"indexname": "test_transform_id_idx"}]
+    assert postgresql_client.table_exists("test_transform__shadow") is False
+
+    postgresql_client.drop_table("test_transform")
+
+
+def test_sql_transform_builds_declared_keys_and_indexes(setup_postgresql_client):
+    postgresql_client = setup_postgresql_client
+    postgresql_client.drop_table("test_transform")
+    template = """
+        {% set config = {
+            "primary_key": ["id"],
+            "indexes": [["value"], {"columns": ["id", "value"], "unique": true}],
+            "cluster_by": ["value"]
+        } %}
+        select generate_series(1, 10) as id, 'hello' as value
+    """
+    environment = Environment(loader=DictLoader({"test_transform.sql": template}))
+    sql_transform = SqlTransform(
+        postgresql_client=postgresql_client, environment=environment, table_name="test_transform"
+    )
+
+    for _ in range(2):
+        step_seconds = sql_transform.create_table_as()
+
+        assert list(step_seconds) == [
+            "create_table_as", "primary_key", "index test_transform_value_idx", "index test_transform_id_value_idx",
+            "cluster", "analyze", "swap",
+        ]
+        indexes = postgresql_client.run_sql("select indexname from pg_indexes where tablename = 'test_transform'")
+        assert sorted(index["indexname"] for index in indexes) == [
+            "test_transform_id_value_idx", "test_transform_pkey", "test_transform_value_idx",
+        ]
+
+    postgresql_client.drop_table("test_transform")
+
+
+def test_sql_transform_config_rejects_unindexed_cluster_by():
+    with pytest.raises(Exception):
+        SqlTransformConfig(primary_key=["id"], indexes=[["value"]], cluster_by=["date"])
+
+
+class FakeTransform:
+    """Stands in for SqlTransform: records when it ran and optionally fails."""
+
+    def __init__(self, table_name: str, seconds: float = 0.0, fail: bool = False):
+        self.table_name = table_name
+        self.seconds = seconds
+        self.fail = fail
+        self.ran = False
+
+    def materialize(self) -> dict:
+        time.sleep(self.seconds)
+        self.ran = True
+        if self.fail:
+            raise Exception(f"{self.table_name} failed")
+        return {"create_table_as": self.seconds}
+
+
+def test_transform_runs_independent_nodes_concurrently():
+    first, second = FakeTransform("first", seconds=0.3), FakeTransform("second", seconds=0.3)
+    downstream = FakeTransform("downstream")
+    dag = TopologicalSorter()
+    dag.add(downstream, first, second)
+
+    start = time.perf_counter()
+    node_seconds = transform(dag=dag, max_workers=2)
+
+    assert time.perf_counter() - start < 0.55
+    assert sorted(node_seconds) == ["downstream", "first", "second"]
+    assert node_seconds["first"] >= 0.3
+
+
+def test_transform_skips_nodes_downstream_of_a_failure():
+    failing, independent = FakeTransform("failing", fail=True), FakeTransform("independent", seconds=0.2)
+    downstream = FakeTransform("downstream")
+    dag = TopologicalSorter()
+    dag.add(downstream, failing)
+    dag.add(independent)
+
+    with pytest.raises(Exception, match="failing"):
+        transform(dag=dag, max_workers=2)
+
+    assert independent.ran is True
+    assert downstream.ran is False
+
+
+def test_sql_transform_incremental_materialization(setup_postgresql_client):
+    postgresql_client = setup_postgresql_client
+    for table_name in ["test_transform", "test_transform_source"]:
+        postgresql_client.drop_table(table_name)
+    postgresql_client.execute_sql(
+        "create table test_transform_source as select generate_series(1, 3) as id, 'old' as value"
+    )
+    template = """
+        {% set config = {
+            "materialized": "incremental", "incremental_column": "id", "incremental_lookback": 1, "primary_key": ["id"]
+        } %}
+        select id, value from test_transform_source
+        {% if is_incremental %} where id > {{ incremental_value }} {% endif %}
+    """
+    environment = Environment(loader=DictLoader({"test_transform.sql": template}))
+    sql_transform = SqlTransform(
+        postgresql_client=postgresql_client, environment=environment, table_name="test_transform"
+    )
+
+    assert "create_table_as" in sql_transform.materialize()  # the first run builds the table in full
+    postgresql_client.execute_sql("update test_transform_source set value = 'new'")
+    postgresql_client.execute_sql("insert into test_transform_source values (4, 'new'), (5, 'new')")
+
+    assert list(sql_transform.materialize()) == ["merge", "analyze"]
+    result = postgresql_client.run_sql("select id, value from test_transform order by id")
+    # rows after the watermark (3) less the lookback (1) are merged, so the restated row 3 is updated too
+    assert result == [{"id": 1, "value": "old"}, {"id": 2, "value": "old"}, {"id": 3, "value": "new"},
+                      {"id": 4, "value": "new"}, {"id": 5, "value": "new"}]
+
+    sql_transform.full_refresh = True
+    sql_transform.materialize()
+    result = postgresql_client.run_sql("select distinct value from test_transform")
+    assert result == [{"value": "new"}]
+
+    for table_name in ["test_transform", "test_transform_source"]:
+        postgresql_client.drop_table(table_name)
+
+
+def test_sql_transform_incremental_rebuilds_a_table_without_the_primary_key(setup_postgresql_client):
+    postgresql_client = setup_postgresql_client
+    for table_name in ["test_transform", "test_transform_source"]:
+        postgresql_client.drop_table(table_name)
+    postgresql_client.execute_sql("""
+        create table test_transform_source as select generate_series(1, 3) as id;
+        create table test_transform as select 1 as id;
+    """)
+    template = """
+        {% set config = {"materialized": "incremental", "incremental_column": "id", "primary_key": ["id"]} %}
+        select id from test_transform_source
+        {% if is_incremental %} where id > {{ incremental_value }} {% endif %}
+    """
+    environment = Environment(loader=DictLoader({"test_transform.sql": template}))
+    sql_transform = SqlTransform(
+        postgresql_client=postgresql_client, environment=environment, table_name="test_transform"
+    )
+
+    # the existing table has no primary key to merge on, so it is rebuilt in full with one
+    assert "create_table_as" in sql_transform.materialize()
+    assert postgresql_client.get_primary_key("test_transform") == ["id"]
+    assert list(sql_transform.materialize()) == ["merge", "analyze"]
+    assert len(postgresql_client.run_sql("select * from test_transform")) == 3
+
+    for table_name in ["test_transform", "test_transform_source"]:
+        postgresql_client.drop_table(table_name)
+
+
+def test_transform_skips_nodes_with_unchanged_fingerprints(setup_postgresql_client):
+    postgresql_client = setup_postgresql_client
+    table_names = ["test_transform_downstream", "test_transform", "test_transform_source", "test_transform_fingerprints"]
+    for table_name in table_names:
+        postgresql_client.drop_table(table_name)
+    postgresql_client.execute_sql("create table test_transform_source as select generate_series(1, 3) as id")
+    environment = Environment(loader=DictLoader({
+        "test_transform.sql": """
+            {% set config = {"sources": [{"table": "test_transform_source", "watermark": "id"}]} %}
+            select id from test_transform_source
+        """,
+        "test_transform_downstream.sql": """
+            {% set config = {"sources": ["test_transform"]} %}
+            select count(*) as row_count from test_transform
+        """,
+    }))
+    fingerprint_store = TransformFingerprintStore(
+        postgresql_client=postgresql_client, fingerprint_table_name="test_transform_fingerprints"
+    )
+    nodes = [
+        SqlTransform(
+            postgresql_client=postgresql_client,
+            environment=environment,
+            table_name=table_name,
+            fingerprint_store=fingerprint_store,
+        )
+        for table_name in ["test_transform", "test_transform_downstream"]
+    ]
+
+    def run_transform() -> list:
+        dag = TopologicalSorter()
+        dag.add(nodes[1], nodes[0])
+        transform(dag=dag)
+        return [node.build_reason for node in nodes]
+
+    assert run_transform() == ["table does not exist", "table does not exist"]
+    assert run_transform() == [None, None]  # nothing changed, so both are skipped
+    postgresql_client.execute_sql("insert into test_transform_source values (4)")
+    assert run_transform() == ["fingerprint changed", "fingerprint changed"]
+    assert postgresql_client.run_sql("select row_count from test_transform_downstream") == [{"row_count": 4}]
+    assert run_transform() == [None, None]
+
+    for table_name in table_names:
+        postgresql_client.drop_table(table_name)
+
+
+def test_transform_rebuilds_nodes_whose_sources_extract_load_changed_in_place(
+    setup_postgresql_client, setup_target_postgresql_client
+):
+    source_postgresql_client, target_postgresql_client = setup_postgresql_client, setup_target_postgresql_client
+    for postgresql_client in [source_postgresql_client, target_postgresql_client]:
+        postgresql_client.drop_table("test_extract")
+    for table_name in ["test_transform", "test_transform_fingerprints"]:
+        target_postgresql_client.drop_table(table_name)
+    source_postgresql_client.execute_sql("""
+        create table test_extract (id integer primary key, value text);
+        insert into test_extract values (1, 'old'), (2, 'old');
+    """)
+    extract_environment = Environment(loader=DictLoader({
+        "test_extract.sql": """
+            {% set config = {"extract_type": "full", "source_table_name": "test_extract"} %}
+            select id, value from test_extract
+        """,
+    }))
+    transform_environment = Environment(loader=DictLoader({
+        "test_transform.sql": """
+            {% set config = {"sources": [{"table": "test_extract", "watermark": "id"}]} %}
+            select id, value from test_extract
+        """,
+    }))
+    fingerprint_store = TransformFingerprintStore(
+        postgresql_client=target_postgresql_client, fingerprint_table_name="test_transform_fingerprints"
+    )
+    node = SqlTransform(
+        postgresql_client=target_postgresql_client,
+        environment=transform_environment,
+        table_name="test_transform",
+        fingerprint_store=fingerprint_store,
+    )
+
+    def run_pipeline() -> str:
+        extract_load(
+            extract_environment,
+            source_postgresql_client,
+            target_postgresql_client,
+            transfer_mode="python",
+            fingerprint_store=fingerprint_store,
+        )
+        dag = TopologicalSorter()
+        dag.add(node)
+        transform(dag=dag)
+        return node.build_reason
+
+    assert run_pipeline() == "table does not exist"
+    assert run_pipeline() is None  # the rows extracted again are unchanged
+    # a restatement keeps the row count and the watermark as they were
+    source_postgresql_client.execute_sql("update test_extract set value = 'new' where id = 1")
+    assert run_pipeline() == "fingerprint changed"
+    result = target_postgresql_client.run_sql("select id, value from test_transform order by id")
+    assert result == [{"id": 1, "value": "new"}, {"id": 2, "value": "old"}]
+
+    for postgresql_client in [source_postgresql_client, target_postgresql_client]:
+        postgresql_client.drop_table("test_extract")
+    for table_name in ["test_transform", "test_transform_fingerprints"]:
+        target_postgresql_client.drop_table(table_name)
@@ -0,0 +1,127 @@
+"""
+Benchmarks the Fixer and MarketStack connectors against the local replay server, which serves the recorded
+payloads in `fixtures/` with configurable latency, error rate and page count.
+
+For each connector it reports requests/sec, rows/sec and p50/p99 request latency (a request's latency includes its
+retries).
+With --raw-pipeline it also times an end-to-end raw_pipeline run, which loads into the database configured by the
+SERVER_NAME, DATABASE_NAME, DB_USERNAME, DB_PASSWORD and PORT environment variables: use a scratch database.
+
+Usage:
+    python -m etl_project_tests.benchmarks.benchmark_connectors --latency 0.05 --error-rate 0.02 --pages 20 --max-workers 8
+"""
+import argparse
+import logging
+import math
+import os
+import time
+from dotenv import load_dotenv
+from etl_project.assets.etl_raw import extract_fixer_table, extract_market_stack_pages
+from etl_project.connectors.base_api_client import BaseApiClient
+from etl_project.connectors.fixer_api import FixerApiClient
+from etl_project.connectors.market_stack_api import MarketStackApiClient
+from etl_project.connectors.postgresql import PostgreSqlClient
+from etl_project.pipelines.run import raw_pipeline
+from etl_project_tests.benchmarks.mock_server import run_mock_api_server
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Returns the q-th percentile (0-100) of values using the nearest-rank method.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(max(math.ceil(q / 100 * len(ordered)) - 1, 0), len(ordered) - 1)]
+
+
+def report(name: str, api_client: BaseApiClient, seconds: float, rows: int) -> dict:
+    """
+    Summarises the requests an api client made, and the rows they returned, in `seconds` of wall-clock time.
+    """
+    latencies = [stat["latency"] for stat in api_client.request_stats]
+    request_stats = api_client.get_request_stats()
+    return {
+        "benchmark": name,
+        "requests": request_stats["requests"],
+        "retries": request_stats["retries"],
+        "seconds": round(seconds, 3),
+        "requests_per_sec": round(request_stats["requests"] / seconds, 1) if seconds else 0.0,
+        "rows": rows,
+        "rows_per_sec": round(rows / seconds, 1) if seconds else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+class BenchmarkLogging:
+    """Stands in for PipelineLogging so raw_pipeline can run without writing a log file."""
+
+    def __init__(self):
+        self.logger = logging.getLogger("benchmark_connectors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="replay server latency per request in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with a 503")
+    parser.add_argument("--pages", type=int, default=20, help="MarketStack pages per symbol batch")
+    parser.add_argument("--limit", type=int, default=1000, help="MarketStack rows per page")
+    parser.add_argument("--window-days", type=int, default=90, help="Fixer dates requested in daily mode")
+    parser.add_argument("--max-workers", type=int, default=8)
+    parser.add_argument("--raw-pipeline", action="store_true", help="also time an end-to-end raw_pipeline run")
+    args = parser.parse_args()
+
+    client_options = {"max_retries": 5, "pool_maxsize": args.max_workers}
+    results = []
+    with run_mock_api_server(
+        latency=args.latency, error_rate=args.error_rate, total_rows=args.pages * args.limit
+    ) as root_url:
+        fixer_api_client = FixerApiClient(
+            fixer_access_key="benchmark", base_url=f"{root_url}/api", window_days=args.window_days,
+            max_workers=args.max_workers, **client_options,
+        )
+        start = time.perf_counter()
+        rows = len(extract_fixer_table(fixer_api_client))
+        results.append(report("fixer_daily", fixer_api_client, time.perf_counter() - start, rows))
+
+        market_stack_api_client = MarketStackApiClient(
+            market_stack_access_key="benchmark", base_url=f"{root_url}/v1", limit=args.limit,
+            max_workers=args.max_workers, **client_options,
+        )
+        start = time.perf_counter()
+        # each page is a one-row frame whose `data` column holds the page's rows
+        rows = sum(
+            len(data)
+            for df_stocks in extract_market_stack_pages(market_stack_api_client)
+            for data in df_stocks["data"]
+        )
+        results.append(report("market_stack_pages", market_stack_api_client, time.perf_counter() - start, rows))
+
+        if args.raw_pipeline:
+            load_dotenv()
+            postgresql_client = PostgreSqlClient(
+                server_name=os.environ.get("SERVER_NAME"),
+                database_name=os.environ.get("DATABASE_NAME"),
+                username=os.environ.get("DB_USERNAME"),
+                password=os.environ.get("DB_PASSWORD"),
+                port=os.environ.get("PORT"),
+            )
+            fixer_api_client.reset_request_stats()
+            market_stack_api_client.reset_request_stats()
+            start = time.perf_counter()
+            raw_pipeline(
+                fixer_api_client=fixer_api_client,
+                market_stack_api_client=market_stack_api_client,
+                postgresql_client=postgresql_client,
+                pipeline_logging=BenchmarkLogging(),
+            )
+            results.append({"benchmark": "raw_pipeline", "seconds": round(time.perf_counter() - start, 3)})
+
+    print(f"latency={args.latency}s error_rate={args.error_rate} pages={args.pages} max_workers={args.max_workers}")
+    for result in results:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Compares the serial and concurrent FixerApiClient.get_exchange_rates against a local mock Fixer server.
+
+Usage:
+    python -m etl_project_tests.benchmarks.benchmark_fixer_api --window-days 90 --max-workers 8 --latency 0.05
+"""
+import argparse
+import time
+from etl_project.connectors.fixer_api import FixerApiClient
+from etl_project_tests.benchmarks.mock_server import run_mock_fixer_server
+
+
+def time_get_exchange_rates(fixer_api_client: FixerApiClient) -> tuple[float, int]:
+    """
+    Returns the wall-clock seconds taken by get_exchange_rates and the number of dates returned.
+    """
+    start = time.perf_counter()
+    exchange_rates = fixer_api_client.get_exchange_rates()
+    return time.perf_counter() - start, len(exchange_rates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--window-days", type=int, default=90)
+    parser.add_argument("--max-workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="mock server latency per request in seconds")
+    args = parser.parse_args()
+
+    with run_mock_fixer_server(latency=args.latency) as base_url:
+        serial_client = FixerApiClient(
+            fixer_access_key="benchmark", base_url=base_url, window_days=args.window_days
+        )
+        concurrent_client = FixerApiClient(
+            fixer_access_key="benchmark", base_url=base_url, window_days=args.window_days, max_workers=args.max_workers
+        )
+        serial_seconds, serial_dates = time_get_exchange_rates(serial_client)
+        concurrent_seconds, concurrent_dates = time_get_exchange_rates(concurrent_client)
+
+    print(f"window_days={args.window_days} latency={args.latency}s max_workers={args.max_workers}")
+    print(f"serial:     {serial_dates} dates in {serial_seconds:.3f}s")
+    print(f"concurrent: {concurrent_dates} dates in {concurrent_seconds:.3f}s")
+    print(f"speedup:    {serial_seconds / concurrent_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
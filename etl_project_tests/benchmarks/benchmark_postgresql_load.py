@@ -0,0 +1,158 @@
+"""
+Benchmarks the PostgreSqlClient load paths.
+
+The row benchmarks compare the multi-row INSERT ... VALUES upsert with the COPY-based upsert. Each run upserts the
+same synthetic stock_price-shaped rows into a fresh table, then upserts half of them a second time so the conflict
+path is exercised too, and reports rows/sec.
+
+The DataFrame benchmarks load a synthetic stock_price frame (a million rows by default) with etl_raw.load(), once
+through the per-row dict path (df.to_dict + COPY) and once through the columnar Arrow path. They report rows/sec,
+peak Python heap (tracemalloc) and peak Arrow memory. Loads into the database configured by the SERVER_NAME,
+DATABASE_NAME, DB_USERNAME, DB_PASSWORD and PORT environment variables: use a scratch database.
+
+Usage:
+    python -m etl_project_tests.benchmarks.benchmark_postgresql_load --rows 100000 --chunksize 1000 --dataframe-rows 1000000
+"""
+import argparse
+import datetime
+import os
+import random
+import time
+import tracemalloc
+import pandas as pd
+import pyarrow as pa
+from dotenv import load_dotenv
+from sqlalchemy import Table, MetaData, Column, String, Float
+from etl_project.assets.etl_raw import load
+from etl_project.connectors.postgresql import PostgreSqlClient
+
+
+def make_rows(row_count: int, seed: int = 0) -> list[dict]:
+    """
+    Returns row_count synthetic stock price rows with unique (date, symbol) keys.
+    """
+    rng = random.Random(seed)
+    symbols = [f"SYM{i:03d}" for i in range(100)]
+    start_date = datetime.date(2000, 1, 1)
+    return [
+        {
+            "date": (start_date + datetime.timedelta(days=i // len(symbols))).isoformat(),
+            "symbol": symbols[i % len(symbols)],
+            "open": rng.uniform(1, 500),
+            "high": rng.uniform(1, 500),
+            "low": rng.uniform(1, 500),
+            "close": rng.uniform(1, 500),
+            "volume": float(rng.randint(1000, 10_000_000)),
+            "exchange": "XNAS",
+        }
+        for i in range(row_count)
+    ]
+
+
+def make_stock_table() -> tuple[Table, MetaData]:
+    """
+    Returns a stock_price-shaped benchmark table and its metadata.
+    """
+    metadata = MetaData()
+    table = Table(
+        "benchmark_stock_price",
+        metadata,
+        Column("date", String, primary_key=True),
+        Column("symbol", String, primary_key=True),
+        Column("open", Float),
+        Column("high", Float),
+        Column("low", Float),
+        Column("close", Float),
+        Column("volume", Float),
+        Column("exchange", String),
+    )
+    return table, metadata
+
+
+def benchmark_upsert(
+    postgresql_client: PostgreSqlClient, rows: list[dict], chunksize: int, use_copy: bool
+) -> dict:
+    """
+    Upserts rows into a fresh table, then upserts the first half of them again, and reports rows/sec.
+    """
+    table, metadata = make_stock_table()
+    postgresql_client.drop_table(table.name)
+    loaded_rows = rows + rows[: len(rows) // 2]
+    start = time.perf_counter()
+    postgresql_client.upsert_in_chunks(
+        data=rows, table=table, metadata=metadata, chunksize=chunksize, use_copy=use_copy
+    )
+    postgresql_client.upsert_in_chunks(
+        data=rows[: len(rows) // 2], table=table, metadata=metadata, chunksize=chunksize, use_copy=use_copy
+    )
+    seconds = time.perf_counter() - start
+    postgresql_client.drop_table(table.name)
+    return {
+        "benchmark": "copy_upsert" if use_copy else "upsert",
+        "rows": len(loaded_rows),
+        "chunksize": chunksize,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(len(loaded_rows) / seconds, 1) if seconds else 0.0,
+    }
+
+
+def benchmark_dataframe_load(postgresql_client: PostgreSqlClient, df: pd.DataFrame, columnar: bool) -> dict:
+    """
+    Upserts df into a fresh table with etl_raw.load() and reports rows/sec and peak memory.
+    The dict path converts the frame with df.to_dict before its COPY, as load() did before the columnar path.
+    """
+    table, metadata = make_stock_table()
+    postgresql_client.drop_table(table.name)
+    pa.default_memory_pool().release_unused()
+    arrow_bytes_before = pa.total_allocated_bytes()
+    tracemalloc.start()
+    start = time.perf_counter()
+    if columnar:
+        load(df=df, postgresql_client=postgresql_client, table=table, metadata=metadata, load_method="upsert")
+    else:
+        postgresql_client.copy_upsert(data=df.to_dict(orient="records"), table=table, metadata=metadata)
+    seconds = time.perf_counter() - start
+    _, python_peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    postgresql_client.drop_table(table.name)
+    return {
+        "benchmark": "dataframe_columnar_copy" if columnar else "dataframe_dict_copy",
+        "rows": len(df),
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(len(df) / seconds, 1) if seconds else 0.0,
+        "python_peak_mb": round(python_peak_bytes / 2**20, 1),
+        "arrow_peak_mb": round(max(pa.default_memory_pool().max_memory() - arrow_bytes_before, 0) / 2**20, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--chunksize", type=int, default=1000, help="rows per INSERT ... VALUES statement")
+    parser.add_argument("--copy-chunksize", type=int, default=100_000, help="rows per COPY")
+    parser.add_argument("--dataframe-rows", type=int, default=1_000_000, help="rows in the DataFrame benchmarks, 0 to skip")
+    args = parser.parse_args()
+
+    load_dotenv()
+    postgresql_client = PostgreSqlClient(
+        server_name=os.environ.get("SERVER_NAME"),
+        database_name=os.environ.get("DATABASE_NAME"),
+        username=os.environ.get("DB_USERNAME"),
+        password=os.environ.get("DB_PASSWORD"),
+        port=os.environ.get("PORT"),
+    )
+    rows = make_rows(args.rows)
+    results = [
+        benchmark_upsert(postgresql_client, rows, chunksize=args.chunksize, use_copy=False),
+        benchmark_upsert(postgresql_client, rows, chunksize=args.copy_chunksize, use_copy=True),
+    ]
+    if args.dataframe_rows:
+        df = pd.DataFrame(make_rows(args.dataframe_rows))
+        results.append(benchmark_dataframe_load(postgresql_client, df, columnar=False))
+        results.append(benchmark_dataframe_load(postgresql_client, df, columnar=True))
+    for result in results:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
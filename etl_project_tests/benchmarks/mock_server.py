@@ -0,0 +1,206 @@
+import copy
+import json
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_PATH = Path(__file__).parent / "fixtures"
+
+
+def load_fixture(file_name: str) -> dict:
+    """
+    Loads a recorded api response from the fixtures folder.
+    """
+    with open(FIXTURES_PATH / file_name, "r") as file:
+        return json.load(file)
+
+
+class MockApiRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves a local stand-in for the Fixer `/api/latest`, `/api/YYYY-MM-DD` and `/api/timeseries` endpoints
+    and the paginated MarketStack `/v1/eod` endpoint by replaying the recorded payloads in `fixtures/`,
+    with dates and symbols rewritten to match each request.
+
+    Every response is delayed by the server's `latency` (in seconds) to simulate network round trips.
+    The first `failures` requests, and then a random `error_rate` fraction of requests, are answered with
+    a 503 and a `Retry-After: 0` header.
+    When the server's `timeseries_supported` is false, timeseries requests get Fixer's "function_access_restricted" error,
+    and eod requests for any of the server's `failing_symbols` get a 422 "no_valid_symbols_provided" error.
+    """
+
+    HISTORICAL_PATH = re.compile(r"^/api/(\d{4}-\d{2}-\d{2})$")
+    FIXER_LATEST = load_fixture("fixer_latest.json")
+    FIXER_HISTORICAL = load_fixture("fixer_historical.json")
+    FIXER_TIMESERIES = load_fixture("fixer_timeseries.json")
+    MARKET_STACK_EOD = load_fixture("market_stack_eod.json")
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            fail = self.server.failures > 0 or self.server.random.random() < self.server.error_rate
+            self.server.failures -= 1 if self.server.failures > 0 else 0
+            self.server.requests += 1
+        if fail:
+            self._send_json(
+                {"success": False, "error": {"code": 503, "type": "service_unavailable"}},
+                status=503,
+                headers={"Retry-After": "0"},
+            )
+            return
+        url = urlparse(self.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        if url.path == "/api/latest":
+            self._send_json(self._rates_payload(date=self.server.latest_date, historical=False))
+            return
+        if url.path == "/api/timeseries":
+            self._send_json(self._timeseries_payload(params))
+            return
+        match = self.HISTORICAL_PATH.match(url.path)
+        if match:
+            self._send_json(self._rates_payload(date=match.group(1), historical=True))
+            return
+        if url.path == "/v1/eod":
+            if set(params.get("symbols", "").split(",")) & set(self.server.failing_symbols):
+                self._send_json(
+                    {"error": {"code": "no_valid_symbols_provided", "message": "invalid symbols"}}, status=422
+                )
+                return
+            self._send_json(self._eod_payload(params))
+            return
+        self._send_json({"success": False, "error": {"code": 404, "type": "not_found"}}, status=404)
+
+    def _recorded_rates(self, date: str) -> dict:
+        """
+        Returns one of the recorded daily rate sets, picked deterministically by date.
+        """
+        recorded_rates = list(self.FIXER_TIMESERIES["rates"].values())
+        return recorded_rates[datetime.strptime(date, "%Y-%m-%d").toordinal() % len(recorded_rates)]
+
+    def _rates_payload(self, date: str, historical: bool) -> dict:
+        payload = copy.deepcopy(self.FIXER_HISTORICAL if historical else self.FIXER_LATEST)
+        payload["timestamp"] = int(datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+        payload["date"] = date
+        payload["rates"] = self._recorded_rates(date)
+        return payload
+
+    def _timeseries_payload(self, params: dict) -> dict:
+        if not self.server.timeseries_supported:
+            return {"success": False, "error": {"code": 105, "type": "function_access_restricted"}}
+        start_date = datetime.strptime(params["start_date"], "%Y-%m-%d")
+        end_date = datetime.strptime(params["end_date"], "%Y-%m-%d")
+        payload = copy.deepcopy(self.FIXER_TIMESERIES)
+        payload["start_date"] = params["start_date"]
+        payload["end_date"] = params["end_date"]
+        payload["rates"] = {}
+        date = start_date
+        while date <= end_date:
+            payload["rates"][date.strftime("%Y-%m-%d")] = self._recorded_rates(date.strftime("%Y-%m-%d"))
+            date += timedelta(days=1)
+        return payload
+
+    def _eod_payload(self, params: dict) -> dict:
+        symbols = params.get("symbols", "AAPL").split(",")
+        limit = min(int(params.get("limit", 100)), 1000)
+        offset = int(params.get("offset", 0))
+        total = self.server.total_rows
+        latest_date = datetime.strptime(self.server.latest_date, "%Y-%m-%d")
+        recorded_rows = self.MARKET_STACK_EOD["data"]
+        data = []
+        for row in range(offset, min(offset + limit, total)):
+            entry = dict(recorded_rows[row % len(recorded_rows)])
+            entry["symbol"] = symbols[row % len(symbols)]
+            entry["date"] = (latest_date - timedelta(days=row // len(symbols))).strftime("%Y-%m-%dT00:00:00+0000")
+            data.append(entry)
+        return {
+            "pagination": {"limit": limit, "offset": offset, "count": len(data), "total": total},
+            "data": data,
+        }
+
+    def _send_json(self, payload: dict, status: int = 200, headers: dict = {}):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def run_mock_api_server(
+    latency: float = 0.05,
+    latest_date: str = "2024-05-25",
+    failures: int = 0,
+    error_rate: float = 0.0,
+    total_rows: int = 0,
+    timeseries_supported: bool = True,
+    failing_symbols: list[str] = [],
+    seed: int = 0,
+):
+    """
+    Runs a mock api server on a free local port in a background thread.
+
+    Yields:
+        str: The root url of the mock server, e.g. "http://127.0.0.1:54321".
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockApiRequestHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.latest_date = latest_date
+    server.failures = failures
+    server.error_rate = error_rate
+    server.total_rows = total_rows
+    server.timeseries_supported = timeseries_supported
+    server.failing_symbols = failing_symbols
+    server.random = random.Random(seed)
+    server.requests = 0
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def run_mock_fixer_server(
+    latency: float = 0.05, latest_date: str = "2024-05-25", failures: int = 0, timeseries_supported: bool = True
+):
+    """
+    Runs a mock Fixer server.
+
+    Yields:
+        str: The base url of the mock api, e.g. "http://127.0.0.1:54321/api".
+    """
+    with run_mock_api_server(
+        latency=latency, latest_date=latest_date, failures=failures, timeseries_supported=timeseries_supported
+    ) as root_url:
+        yield f"{root_url}/api"
+
+
+@contextmanager
+def run_mock_market_stack_server(
+    latency: float = 0.05, latest_date: str = "2024-05-25", total_rows: int = 1000, failing_symbols: list[str] = []
+):
+    """
+    Runs a mock MarketStack server whose `/v1/eod` endpoint paginates `total_rows` rows.
+
+    Yields:
+        str: The base url of the mock api, e.g. "http://127.0.0.1:54321/v1".
+    """
+    with run_mock_api_server(
+        latency=latency, latest_date=latest_date, total_rows=total_rows, failing_symbols=failing_symbols
+    ) as root_url:
+        yield f"{root_url}/v1"
@@ -0,0 +1,44 @@
+import pytest
+from etl_project.connectors.base_api_client import BaseApiClient
+from etl_project_tests.benchmarks.mock_server import run_mock_fixer_server
+
+
+def test_base_api_client_retries_retryable_status_codes():
+    with run_mock_fixer_server(latency=0, failures=2) as base_url:
+        base_api_client = BaseApiClient(access_key="test", max_retries=3)
+        data = base_api_client.get_data(f"{base_url}/latest", params={})
+
+    assert data["success"] is True
+    assert base_api_client.request_stats[0]["retries"] == 2
+    assert base_api_client.get_request_stats()["requests"] == 1
+
+
+def test_base_api_client_raises_after_max_retries():
+    with run_mock_fixer_server(latency=0, failures=5) as base_url:
+        base_api_client = BaseApiClient(access_key="test", max_retries=2)
+        with pytest.raises(Exception, match="Status Code: 503"):
+            base_api_client.get_data(f"{base_url}/latest", params={})
+
+    request_stats = base_api_client.get_request_stats()
+    assert request_stats["requests"] == 1
+    assert request_stats["retries"] == 2
+    assert request_stats["failed"] == 1
+
+
+def test_base_api_client_respects_retry_after_header():
+    base_api_client = BaseApiClient(access_key="test")
+
+    class Response:
+        headers = {"Retry-After": "7"}
+
+    assert base_api_client._get_retry_delay(attempt=0, response=Response()) == 7
+    assert 0 <= base_api_client._get_retry_delay(attempt=2) <= 0.5 * 2 ** 2
+
+
+def test_base_api_client_caps_retry_after_at_max_backoff():
+    base_api_client = BaseApiClient(access_key="test", max_backoff=30)
+
+    class Response:
+        headers = {"Retry-After": "86400"}
+
+    assert base_api_client._get_retry_delay(attempt=0, response=Response()) == 30
@@ -0,0 +1,50 @@
+import pytest
+from dotenv import load_dotenv
+import os
+from concurrent.futures import ThreadPoolExecutor
+from etl_project.connectors.engine_registry import configure_pools, dispose_engines, get_pool_stats
+from etl_project.connectors.postgresql import PostgreSqlClient
+
+
+@pytest.fixture
+def setup_client_kwargs():
+    load_dotenv()
+    dispose_engines()
+    yield {
+        "server_name": os.environ.get("SERVER_NAME"),
+        "database_name": os.environ.get("DATABASE_NAME"),
+        "username": os.environ.get("DB_USERNAME"),
+        "password": os.environ.get("DB_PASSWORD"),
+        "port": os.environ.get("PORT"),
+    }
+    configure_pools(pool_size=5, max_overflow=10)
+    dispose_engines()
+
+
+def test_clients_of_the_same_database_share_a_lazily_created_engine(setup_client_kwargs):
+    postgresql_client = PostgreSqlClient(**setup_client_kwargs)
+    other_postgresql_client = PostgreSqlClient(**setup_client_kwargs)
+    assert postgresql_client._engine is None
+    assert get_pool_stats() == {}
+
+    assert postgresql_client.engine is other_postgresql_client.engine
+    assert len(get_pool_stats()) == 1
+
+
+def test_pool_stats(setup_client_kwargs):
+    configure_pools(pool_size=2, max_overflow=0)
+    postgresql_client = PostgreSqlClient(**setup_client_kwargs)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: postgresql_client.run_sql("select pg_sleep(0.2)"), range(4)))
+
+    pool_stats = postgresql_client.get_pool_stats()
+    assert pool_stats["pool_size"] == 2
+    assert pool_stats["peak_checked_out"] == 2
+    assert pool_stats["checkouts"] >= 4
+    assert pool_stats["max_wait"] > 0.1  # two of the queries waited for a connection
+
+
+def test_configure_pools_rejects_unknown_options():
+    with pytest.raises(Exception):
+        configure_pools(pool_sizes=5)
@@ -2,6 +2,7 @@ import pytest
 from dotenv import load_dotenv
 import os
 from etl_project.connectors.fixer_api import FixerApiClient
+from etl_project_tests.benchmarks.mock_server import run_mock_fixer_server
 
 
 @pytest.fixture
@@ -15,3 +16,45 @@ def test_fixer_client_get_exchange_rates(setup):
 
     assert type(data) == list
     assert len(data) > 0
+
+
+def test_fixer_client_get_exchange_rates_concurrent_keeps_date_order():
+    with run_mock_fixer_server(latency=0.01, latest_date="2024-05-25") as base_url:
+        fixer_api_client = FixerApiClient(
+            fixer_access_key="test", base_url=base_url, window_days=10, max_workers=4
+        )
+        data = fixer_api_client.get_exchange_rates()
+
+    assert [rates["date"] for rates in data] == [
+        "2024-05-25", "2024-05-24", "2024-05-23", "2024-05-22", "2024-05-21",
+        "2024-05-20", "2024-05-19", "2024-05-18", "2024-05-17", "2024-05-16",
+    ]
+
+
+@pytest.mark.parametrize("timeseries_supported, expected_requests", [(True, 1), (False, 1 + 365)])
+def test_fixer_client_timeseries_mode(timeseries_supported, expected_requests):
+    with run_mock_fixer_server(latency=0, timeseries_supported=timeseries_supported) as base_url:
+        fixer_api_client = FixerApiClient(
+            fixer_access_key="test", base_url=base_url, extraction_mode="timeseries", max_workers=8
+        )
+        data = fixer_api_client.get_exchange_rates(start_date="2023-05-26", end_date="2024-05-24")
+
+    assert len(data) == 365
+    assert data[0]["date"] == "2024-05-24"
+    assert data[-1]["date"] == "2023-05-26"
+    assert list(data[0].keys()) == ["success", "timestamp", "historical", "base", "date", "rates"]
+    assert fixer_api_client.get_request_stats()["requests"] == expected_requests
+
+
+def test_fixer_client_stops_requesting_an_unsupported_timeseries():
+    with run_mock_fixer_server(latency=0, timeseries_supported=False) as base_url:
+        fixer_api_client = FixerApiClient(
+            fixer_access_key="test", base_url=base_url, extraction_mode="timeseries", max_workers=8
+        )
+        # two windows of at most 365 days, then a second call
+        fixer_api_client.get_exchange_rates(start_date="2023-05-26", end_date="2024-06-10")
+        fixer_api_client.get_exchange_rates(start_date="2024-06-01", end_date="2024-06-10")
+
+    timeseries_requests = [stat for stat in fixer_api_client.request_stats if stat["url"].endswith("/timeseries")]
+    assert len(timeseries_requests) == 1
+    assert fixer_api_client.extraction_mode == FixerApiClient.DAILY_MODE
@@ -2,6 +2,7 @@ import pytest
 from dotenv import load_dotenv
 import os
 from etl_project.connectors.market_stack_api import MarketStackApiClient
+from etl_project_tests.benchmarks.mock_server import run_mock_market_stack_server
 
 
 @pytest.fixture
@@ -15,3 +16,36 @@ def test_market_stack_get_stocks_info(setup):
 
     assert type(data) == dict
     assert len(data) > 0
+
+
+def test_market_stack_get_stocks_pages_fetches_every_offset():
+    with run_mock_market_stack_server(latency=0.01, total_rows=2500) as base_url:
+        market_stack_api_client = MarketStackApiClient(
+            market_stack_access_key="test", base_url=base_url, limit=1000, max_workers=4
+        )
+        pages = list(market_stack_api_client.get_stocks_pages())
+
+    assert [page["pagination"]["offset"] for page in pages] == [0, 1000, 2000]
+    assert sum(len(page["data"]) for page in pages) == 2500
+
+
+def test_market_stack_get_stocks_info_combines_pages():
+    with run_mock_market_stack_server(latency=0, total_rows=150) as base_url:
+        market_stack_api_client = MarketStackApiClient(market_stack_access_key="test", base_url=base_url, limit=100)
+        data = market_stack_api_client.get_stocks_info()
+
+    assert len(data["data"]) == 150
+
+
+def test_market_stack_get_stocks_pages_isolates_failing_batches():
+    symbols = [f"SYM{i}" for i in range(250)]
+    with run_mock_market_stack_server(latency=0, total_rows=300, failing_symbols=["SYM150"]) as base_url:
+        market_stack_api_client = MarketStackApiClient(
+            market_stack_access_key="test", base_url=base_url, symbols=symbols, max_workers=3, max_retries=0
+        )
+        pages = list(market_stack_api_client.get_stocks_pages())
+
+    assert [len(batch) for batch in market_stack_api_client.get_symbol_batches()] == [100, 100, 50]
+    assert len(pages) == 2
+    assert [batch_report["rows"] for batch_report in market_stack_api_client.batch_reports] == [300, 0, 300]
+    assert [batch_report["batch"] for batch_report in market_stack_api_client.get_failed_batches()] == [1]
@@ -1,7 +1,9 @@
+import datetime
 import pytest
+import pandas as pd
 from dotenv import load_dotenv
 import os
-from sqlalchemy import Table, Column, Integer, String, MetaData
+from sqlalchemy import Table, Column, Integer, BigInteger, String, MetaData, Date, JSON
 from etl_project.connectors.postgresql import PostgreSqlClient
 
 
@@ -50,3 +52,361 @@ def test_postgresqlclient_insert(setup_postgresql_client, setup_table):
     assert len(result) == 2
 
     postgresql_client.drop_table(table_name)
+
+
+def test_postgresqlclient_copy_insert(setup_postgresql_client, setup_table):
+    postgresql_client = setup_postgresql_client
+    table_name, table, metadata = setup_table
+    postgresql_client.drop_table(table_name)
+
+    data = [{"id": 1, "value": 'say "hi", world\nbye'}, {"id": 2, "value": ""}, {"id": 3, "value": None}]
+
+    postgresql_client.copy_insert(data=data, table=table, metadata=metadata)
+
+    result = sorted(postgresql_client.select_all(table=table), key=lambda row: row["id"])
+    assert result == data
+
+    postgresql_client.drop_table(table_name)
+
+
+def test_postgresqlclient_copy_insert_json(setup_postgresql_client):
+    postgresql_client = setup_postgresql_client
+    table_name = "test_json_table"
+    metadata = MetaData()
+    table = Table(table_name, metadata, Column("id", Integer, primary_key=True), Column("payload", JSON))
+    data = [{"id": 1, "payload": {"a": 1, "b": None, "c": True}}, {"id": 2, "payload": [1, "two"]}]
+
+    for load in [
+        postgresql_client.insert,
+        postgresql_client.copy_insert,
+        lambda data, table, metadata: postgresql_client.insert_dataframe(pd.DataFrame(data), table, metadata),
+    ]:
+        postgresql_client.drop_table(table_name)
+        load(data=data, table=table, metadata=metadata)
+
+        result = sorted(postgresql_client.select_all(table=table), key=lambda row: row["id"])
+        assert result == data
+
+    postgresql_client.drop_table(table_name)
+
+
+def test_postgresqlclient_copy_insert_pandas_missing_values(setup_postgresql_client):
+    postgresql_client = setup_postgresql_client
+    table_name = "test_missing_values_table"
+    metadata = MetaData()
+    table = Table(
+        table_name,
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("volume", BigInteger),
+        Column("date", Date),
+    )
+    # an integer column with a missing value is float in pandas, a date column's missing value is NaT
+    df = pd.DataFrame({"id": [1, 2], "volume": [100, None], "date": pd.to_datetime(["2024-01-01", None])})
+    assert df["volume"].dtype == float
+
+    for load in [
+        lambda: postgresql_client.copy_insert(data=df.to_dict("records"), table=table, metadata=metadata),
+        lambda: postgresql_client.insert_dataframe(df, table=table, metadata=metadata),
+    ]:
+        postgresql_client.drop_table(table_name)
+        load()
+
+        result = sorted(postgresql_client.select_all(table=table), key=lambda row: row["id"])
+        assert result == [
+            {"id": 1, "volume": 100, "date": datetime.date(2024, 1, 1)},
+            {"id": 2, "volume": None, "date": None},
+        ]
+
+    postgresql_client.drop_table(table_name)
+
+
+def test_postgresqlclient_copy_upsert(setup_postgresql_client, setup_table):
+    postgresql_client = setup_postgresql_client
+    table_name, table, metadata = setup_table
+    postgresql_client.drop_table(table_name)
+
+    postgresql_client.insert(data=[{"id": 1, "value": "hello"}, {"id": 2, "value": "world"}], table=table, metadata=metadata)
+    postgresql_client.upsert_in_chunks(
+        data=[{"id": 2, "value": "there"}, {"id": 3, "value": "again"}],
+        table=table,
+        metadata=metadata,
+        chunksize=1,
+        use_copy=True,
+    )
+
+    result = sorted(postgresql_client.select_all(table=table), key=lambda row: row["id"])
+    assert result == [{"id": 1, "value": "hello"}, {"id": 2, "value": "there"}, {"id": 3, "value": "again"}]
+
+    postgresql_client.drop_table(table_name)
+
+
+def test_postgresqlclient_schema_cache(setup_postgresql_client, setup_table):
+    postgresql_client = setup_postgresql_client
+    table_name, table, metadata = setup_table
+    postgresql_client.drop_table(table_name)
+    assert postgresql_client.table_exists(table_name) is False
+
+    postgresql_client.insert(data=[{"id": 1, "value": "hello"}], table=table, metadata=metadata)
+    assert postgresql_client.table_exists(table_name) is True
+
+    table_schema, table_metadata = postgresql_client.get_table_schema(table_name)
+    assert list(table_metadata.tables) == [table_name]  # only the requested table is reflected
+    assert [column.name for column in table_schema.columns] == ["id", "value"]
+    assert postgresql_client.get_table_schema(table_name)[0] is table_schema
+
+    postgresql_client.execute_sql(f"alter table {table_name} add column note text")
+    table_schema, _ = postgresql_client.get_table_schema(table_name)
+    assert [column.name for column in table_schema.columns] == ["id", "value", "note"]
+
+    postgresql_client.drop_table(table_name)
+    assert postgresql_client.table_exists(table_name) is False
+
+
+def test_postgresqlclient_get_chunksize(setup_postgresql_client, setup_table):
+    postgresql_client = setup_postgresql_client
+    _, table, _ = setup_table
+    wide_row = {f"column_{i}": i for i in range(100)}
+
+    assert postgresql_client.get_chunksize(data=[wide_row], table=table, chunksize=1000) == 327
+    assert postgresql_client.get_chunksize(data=[wide_row], table=table, chunksize=10) == 10
+    assert postgresql_client.get_chunksize(data=[wide_row], table=table, chunksize=None) == 327
+    assert postgresql_client.get_chunksize(data=[], table=table, chunksize=None) == 16383
+
+
+@pytest.mark.parametrize("use_copy", [False, True])
+def test_postgresqlclient_upsert_in_chunks_concurrently(setup_postgresql_client, setup_table, use_copy):
+    postgresql_client = setup_postgresql_client
+    table_name, table, metadata = setup_table
+    postgresql_client.drop_table(table_name)
+
+    data = [{"id": i, "value": f"value {i}"} for i in range(1000)]
+    postgresql_client.upsert_in_chunks(
+        data=data, table=table, metadata=metadata, chunksize=100, use_copy=use_copy, max_workers=4
+    )
+
+    result = sorted(postgresql_client.select_all(table=table), key=lambda row: row["id"])
+    assert result == data
+
+    postgresql_client.drop_table(table_name)
+
+
+@pytest.mark.parametrize("use_copy", [False, True])
+def test_postgresqlclient_upsert_in_chunks_atomic(setup_postgresql_client, setup_table, use_copy):
+    postgresql_client = setup_postgresql_client
+    table_name, table, metadata = setup_table
+    postgresql_client.drop_table(table_name)
+
+    data = [{"id": 1, "value": "hello"}, {"id": 2, "value": "world"}, {"id": None, "value": "no key"}]
+    with pytest.raises(Exception):
+        postgresql_client.upsert_in_chunks(
+            data=data, table=table, metadata=metadata, chunksize=1, use_copy=use_copy, atomic=True
+        )
+    assert postgresql_client.select_all(table=table) == []  # the chunks before the failing one were rolled back
+
+    postgresql_client.upsert_in_chunks(data=data[:2], table=table, metadata=metadata, chunksize=1, use_copy=use_copy, atomic=True)
+    assert len(postgresql_client.select_all(table=table)) == 2
+
+    with pytest.raises(Exception):
+        postgresql_client.upsert_in_chunks(data=data, table=table, metadata=metadata, atomic=True, max_workers=2)
+
+    postgresql_client.drop_table(table_name)
+
+
+def test_postgresqlclient_select_all_in_batches(setup_postgresql_client, setup_table):
+    postgresql_client = setup_postgresql_client
+    table_name, table, metadata = setup_table
+    postgresql_client.drop_table(table_name)
+
+    data = [{"id": i, "value": f"value {i}"} for i in range(25)]
+    postgresql_client.insert(data=data, table=table, metadata=metadata)
+
+    batches = list(postgresql_client.select_all_in_batches(table=table, batch_size=10))
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert sorted((row for batch in batches for row in batch), key=lambda row: row["id"]) == data
+
+    batches = list(postgresql_client.run_sql_in_batches(f"select id from {table_name} where id < 3 order by id", batch_size=10))
+    assert batches == [[{"id": 0}, {"id": 1}, {"id": 2}]]
+
+    postgresql_client.drop_table(table_name)
+
+
+def test_postgresqlclient_upsert_dataframe(setup_postgresql_client, setup_table):
+    postgresql_client = setup_postgresql_client
+    table_name, table, metadata = setup_table
+    postgresql_client.drop_table(table_name)
+
+    df = pd.DataFrame({"id": [1, 2, 3, 4], "value": ['say "hi", world\nbye', "", None, "four"]})
+    postgresql_client.insert_dataframe(df=df, table=table, metadata=metadata)
+    postgresql_client.upsert_dataframe(
+        df=pd.DataFrame({"value": ["there", "five"], "id": [4, 5]}), table=table, metadata=metadata
+    )
+
+    result = sorted(postgresql_client.select_all(table=table), key=lambda row: row["id"])
+    assert result == [
+        {"id": 1, "value": 'say "hi", world\nbye'},
+        {"id": 2, "value": ""},
+        {"id": 3, "value": None},
+        {"id": 4, "value": "there"},
+        {"id": 5, "value": "five"},
+    ]
+
+    postgresql_client.drop_table(table_name)
+
+
+@pytest.mark.parametrize("overwrite_method", ["overwrite", "copy_overwrite"])
+def test_postgresqlclient_overwrite_swaps_in_a_shadow_table(setup_postgresql_client, setup_table, overwrite_method):
+    postgresql_client = setup_postgresql_client
+    table_name, table, metadata = setup_table
+    postgresql_client.drop_table(table_name)
+    overwrite = getattr(postgresql_client, overwrite_method)
+
+    overwrite(data=[{"id": 1, "value": "hello"}], table=table, metadata=metadata)
+    postgresql_client.execute_sql(f"create index test_table_value_idx on {table_name} (value)")
+    postgresql_client.execute_sql(f"grant select on {table_name} to public")
+
+    for _ in range(2):
+        overwrite(data=[{"id": 2, "value": "world"}], table=table, metadata=metadata)
+
+        assert postgresql_client.select_all(table=table) == [{"id": 2, "value": "world"}]
+        assert postgresql_client.table_exists(postgresql_client.get_shadow_table_name(table_name)) is False
+        indexes = postgresql_client.run_sql(f"select indexname from pg_indexes where tablename = '{table_name}'")
+        assert sorted(index["indexname"] for index in indexes) == ["test_table_pkey", "test_table_value_idx"]
+        grants = postgresql_client.run_sql(
+            f"select privilege_type from information_schema.role_table_grants "
+            f"where table_name = '{table_name}' and grantee = 'PUBLIC'"
+        )
+        assert grants == [{"privilege_type": "SELECT"}]
+
+    postgresql_client.drop_table(table_name)
+
+
+def test_postgresqlclient_overwrite_copies_indexes_with_quoted_names(setup_postgresql_client, setup_table):
+    postgresql_client = setup_postgresql_client
+    table_name, table, metadata = setup_table
+    postgresql_client.drop_table(table_name)
+
+    postgresql_client.overwrite(data=[{"id": 1, "value": "hello"}], table=table, metadata=metadata)
+    postgresql_client.execute_sql(f'create index "{table_name} value idx" on {table_name} (value)')
+    postgresql_client.overwrite(data=[{"id": 2, "value": "world"}], table=table, metadata=metadata)
+
+    indexes = postgresql_client.run_sql(f"select indexname from pg_indexes where tablename = '{table_name}'")
+    assert sorted(index["indexname"] for index in indexes) == [f"{table_name} value idx", "test_table_pkey"]
+
+    postgresql_client.drop_table(table_name)
+
+
+@pytest.mark.parametrize("use_copy", [False, True])
+def test_postgresqlclient_upsert_skip_unchanged(setup_postgresql_client, setup_table, use_copy):
+    postgresql_client = setup_postgresql_client
+    table_name, table, metadata = setup_table
+    postgresql_client.drop_table(table_name)
+
+    data = [{"id": 1, "value": "hello"}, {"id": 2, "value": None}, {"id": 3, "value": "world"}]
+    counts = postgresql_client.upsert_in_chunks(
+        data=data, table=table, metadata=metadata, chunksize=2, use_copy=use_copy, skip_unchanged=True
+    )
+    assert counts == {"inserted": 3, "updated": 0, "unchanged": 0}
+
+    data = [{"id": 1, "value": "hello"}, {"id": 2, "value": None}, {"id": 3, "value": "there"}, {"id": 4, "value": "new"}]
+    counts = postgresql_client.upsert_in_chunks(
+        data=data, table=table, metadata=metadata, chunksize=2, use_copy=use_copy, skip_unchanged=True
+    )
+    assert counts == {"inserted": 1, "updated": 1, "unchanged": 2}
+    assert sorted(postgresql_client.select_all(table=table), key=lambda row: row["id"]) == data
+
+    counts = postgresql_client.upsert_in_chunks(data=data, table=table, metadata=metadata, use_copy=use_copy)
+    assert counts == {"inserted": 0, "updated": 4, "unchanged": 0}
+
+    postgresql_client.drop_table(table_name)
+
+
+@pytest.fixture
+def setup_partitioned_table():
+    table_name = "test_partitioned_table"
+    metadata = MetaData()
+    table = Table(
+        table_name,
+        metadata,
+        Column("date", Date, primary_key=True),
+        Column("value", String),
+        **PostgreSqlClient.range_partitioning("date", PostgreSqlClient.MONTHLY_PARTITIONS),
+    )
+    return table_name, table, metadata
+
+
+@pytest.mark.parametrize("use_copy", [False, True])
+def test_postgresqlclient_creates_partitions_on_demand(setup_postgresql_client, setup_partitioned_table, use_copy):
+    postgresql_client = setup_postgresql_client
+    table_name, table, metadata = setup_partitioned_table
+    postgresql_client.drop_table(table_name)
+
+    data = [{"date": "2023-12-31", "value": "a"}, {"date": "2024-01-01", "value": "b"}]
+    postgresql_client.upsert_in_chunks(data=data, table=table, metadata=metadata, use_copy=use_copy)
+    postgresql_client.upsert_in_chunks(
+        data=[{"date": "2024-01-15", "value": "c"}], table=table, metadata=metadata, use_copy=use_copy
+    )
+
+    assert postgresql_client.get_partitions(table_name) == [f"{table_name}_p2024_01", f"{table_name}_p2023_12"]
+    assert len(postgresql_client.run_sql(f"select * from {table_name}_p2024_01")) == 2
+
+    counts = postgresql_client.upsert_in_chunks(
+        data=[{"date": "2023-12-31", "value": "a"}, {"date": "2024-01-01", "value": "changed"}, {"date": "2024-02-01", "value": "d"}],
+        table=table,
+        metadata=metadata,
+        use_copy=use_copy,
+        skip_unchanged=True,
+    )
+    assert counts == {"inserted": 1, "updated": 1, "unchanged": 1}
+
+    postgresql_client.invalidate_schema_cache()
+    reflected_table, _ = postgresql_client.get_table_schema(table_name)
+    assert reflected_table.info == {"partition_column": "date", "partition_interval": "month"}
+    assert reflected_table.dialect_options["postgresql"]["partition_by"] == "RANGE (date)"
+
+    postgresql_client.drop_table(table_name)
+
+
+def test_postgresqlclient_partitioned_table_with_default_partition(setup_postgresql_client, setup_partitioned_table):
+    postgresql_client = setup_postgresql_client
+    table_name, table, metadata = setup_partitioned_table
+    postgresql_client.drop_table(table_name)
+    postgresql_client.upsert(data=[{"date": "2024-01-01", "value": "a"}], table=table, metadata=metadata)
+    postgresql_client.execute_sql(f"create table {table_name}_default partition of {table_name} default")
+
+    postgresql_client.upsert(data=[{"date": "2024-02-01", "value": "b"}], table=table, metadata=metadata)
+
+    assert postgresql_client.get_partitions(table_name) == [f"{table_name}_p2024_02", f"{table_name}_p2024_01"]
+    assert postgresql_client.get_default_partition(table_name) == f"{table_name}_default"
+    reflected_table, _ = postgresql_client.get_table_schema(table_name)
+    assert reflected_table.info == {"partition_column": "date", "partition_interval": "month"}
+
+    postgresql_client.drop_table(table_name)
+
+
+def test_postgresqlclient_rejects_unpartitioned_legacy_table(setup_postgresql_client, setup_partitioned_table):
+    postgresql_client = setup_postgresql_client
+    table_name, table, metadata = setup_partitioned_table
+    postgresql_client.drop_table(table_name)
+    postgresql_client.execute_sql(f"create table {table_name} (date text primary key, value text)")
+
+    with pytest.raises(Exception, match="not partitioned by date"):
+        postgresql_client.upsert(data=[{"date": "2024-01-01", "value": "a"}], table=table, metadata=metadata)
+
+    postgresql_client.drop_table(table_name)
+
+
+def test_postgresqlclient_overwrite_partitioned_table(setup_postgresql_client, setup_partitioned_table):
+    postgresql_client = setup_postgresql_client
+    table_name, table, metadata = setup_partitioned_table
+    postgresql_client.drop_table(table_name)
+
+    for value in ["a", "b"]:
+        postgresql_client.overwrite_dataframe(
+            df=pd.DataFrame({"date": ["2024-01-01", "2025-02-01"], "value": [value, value]}), table=table, metadata=metadata
+        )
+
+    assert sorted(row["value"] for row in postgresql_client.select_all(table=table)) == ["b", "b"]
+    assert postgresql_client.get_partitions(table_name) == [f"{table_name}_p2025_02", f"{table_name}_p2024_01"]
+
+    postgresql_client.drop_table(table_name)
@@ -0,0 +1,36 @@
+import time
+from etl_project.connectors.rate_limiter import TokenBucket, set_rate_limit, remove_rate_limit
+from etl_project.connectors.fixer_api import FixerApiClient
+from etl_project_tests.benchmarks.mock_server import run_mock_fixer_server
+
+
+def test_token_bucket_limits_rate():
+    token_bucket = TokenBucket(rate=20, capacity=1)
+
+    start = time.perf_counter()
+    for _ in range(6):
+        token_bucket.acquire()
+    elapsed = time.perf_counter() - start
+
+    # the first token is available immediately, the other 5 take 1/20s each
+    assert elapsed >= 5 / 20 * 0.9
+
+
+def test_rate_limit_is_shared_by_clients_of_a_provider():
+    set_rate_limit("fixer", requests_per_second=20, burst=1)
+    try:
+        with run_mock_fixer_server(latency=0) as base_url:
+            fixer_api_clients = [
+                FixerApiClient(fixer_access_key="test", base_url=base_url, window_days=3, max_workers=3)
+                for _ in range(2)
+            ]
+            start = time.perf_counter()
+            for fixer_api_client in fixer_api_clients:
+                fixer_api_client.get_exchange_rates()
+            elapsed = time.perf_counter() - start
+    finally:
+        remove_rate_limit("fixer")
+
+    # 2 clients x (1 latest + 3 dates) = 8 requests at 20 requests per second
+    assert elapsed >= 7 / 20 * 0.9
+    assert sum(fixer_api_client.get_request_stats()["credits"] for fixer_api_client in fixer_api_clients) == 8
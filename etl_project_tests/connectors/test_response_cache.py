@@ -0,0 +1,61 @@
+import pytest
+from etl_project.connectors.response_cache import ResponseCache
+from etl_project.connectors.fixer_api import FixerApiClient
+from etl_project_tests.benchmarks.mock_server import run_mock_fixer_server
+
+
+@pytest.fixture
+def setup_response_cache(tmp_path):
+    return ResponseCache(cache_folder_path=tmp_path, ttl=60, latest_ttl=10)
+
+
+def test_response_cache_key_ignores_access_key(setup_response_cache):
+    response_cache = setup_response_cache
+    url = "http://data.fixer.io/api/2024-05-24"
+
+    assert response_cache.get_key(url, {"access_key": "a", "symbols": "USD"}) == response_cache.get_key(
+        url, {"symbols": "USD", "access_key": "b"}
+    )
+    assert response_cache.get_key(url, {"symbols": "USD"}) != response_cache.get_key(url, {"symbols": "CNY"})
+
+
+def test_response_cache_ttl(setup_response_cache):
+    response_cache = setup_response_cache
+
+    assert response_cache.get_ttl("http://data.fixer.io/api/2024-05-24", {}) is None
+    assert response_cache.get_ttl("http://api.marketstack.com/v1/eod", {"date_to": "2024-05-24"}) is None
+    assert response_cache.get_ttl("http://data.fixer.io/api/2999-01-01", {}) == 60
+    assert response_cache.get_ttl("http://data.fixer.io/api/latest", {}) == 10
+    assert response_cache.get_ttl("http://api.marketstack.com/v1/eod", {}) == 60
+
+
+def test_response_cache_evicts_least_recently_used(tmp_path):
+    response_cache = ResponseCache(cache_folder_path=tmp_path, max_size_bytes=500)
+    payload = {"rates": "x" * 100}
+    response_cache.set("http://test/api/2024-05-01", {}, payload)
+    response_cache.set("http://test/api/2024-05-02", {}, payload)
+    response_cache.get("http://test/api/2024-05-01", {})
+    response_cache.set("http://test/api/2024-05-03", {}, payload)
+
+    assert response_cache.get("http://test/api/2024-05-01", {}) == payload
+    assert response_cache.get("http://test/api/2024-05-02", {}) is None
+    assert response_cache.get("http://test/api/2024-05-03", {}) == payload
+    # the running size matches the files left on disk, also for a cache reopened on the same folder
+    size_bytes = sum(file_path.stat().st_size for file_path in tmp_path.glob("*.json"))
+    assert response_cache.get_stats()["size_bytes"] == size_bytes
+    assert ResponseCache(cache_folder_path=tmp_path).get_stats()["size_bytes"] == size_bytes
+
+
+def test_fixer_client_reuses_cached_historical_dates(tmp_path):
+    response_cache = ResponseCache(cache_folder_path=tmp_path, latest_ttl=0)
+    with run_mock_fixer_server(latency=0, latest_date="2024-05-25") as base_url:
+        for _ in range(2):
+            fixer_api_client = FixerApiClient(
+                fixer_access_key="test", base_url=base_url, response_cache=response_cache
+            )
+            data = fixer_api_client.get_exchange_rates()
+
+    assert len(data) == 6
+    # the second run only re-requests the short-lived /latest response
+    assert fixer_api_client.get_request_stats()["requests"] == 1
+    assert fixer_api_client.get_request_stats()["cache_hits"] == 6
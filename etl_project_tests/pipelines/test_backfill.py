@@ -0,0 +1,69 @@
+import os
+import threading
+from dotenv import load_dotenv
+from etl_project.pipelines import backfill
+from etl_project.connectors.postgresql import PostgreSqlClient
+from etl_project.connectors.rate_limiter import get_rate_limiter, remove_rate_limit
+
+
+def test_run_backfill_resumes_after_a_failed_partition(tmp_path, monkeypatch):
+    load_dotenv()
+    env_vars = {**os.environ, "FIXER_ACCESS_KEY": "test", "MARKET_STACK_ACCESS_KEY": "test"}
+    pipeline_config = {
+        "config": {
+            "log_folder_path": str(tmp_path),
+            "cache": {"cache_folder_path": str(tmp_path / "cache")},
+            "rate_limits": {"fixer": {"requests_per_second": 100}},
+        }
+    }
+    backfill_name = "test_run_backfill_resumes"
+    postgresql_logging_client = PostgreSqlClient(
+        server_name=os.environ.get("LOGGING_SERVER_NAME"),
+        database_name=os.environ.get("LOGGING_DATABASE_NAME"),
+        username=os.environ.get("LOGGING_USERNAME"),
+        password=os.environ.get("LOGGING_PASSWORD"),
+        port=os.environ.get("LOGGING_PORT"),
+    )
+    fetched_partitions = []
+    shared_state = set()
+    lock = threading.Lock()
+
+    def fake_raw_pipeline(fixer_api_client, date_from, date_to, **kwargs):
+        with lock:
+            fetched_partitions.append((date_from, date_to))
+            shared_state.add((id(fixer_api_client.response_cache), id(get_rate_limiter("fixer"))))
+        if date_from == "2024-01-31" and fail_partition:
+            raise Exception("the api went away")
+
+    monkeypatch.setattr(backfill, "raw_pipeline", fake_raw_pipeline)
+
+    def run_backfill() -> None:
+        backfill.run_backfill(
+            backfill_name=backfill_name,
+            pipeline_config=pipeline_config,
+            env_vars=env_vars,
+            start_date="2024-01-01",
+            end_date="2024-03-05",
+            partition_days=30,
+            max_workers=2,
+        )
+
+    try:
+        fail_partition = True
+        run_backfill()
+        assert sorted(fetched_partitions) == [
+            ("2024-01-01", "2024-01-30"), ("2024-01-31", "2024-02-29"), ("2024-03-01", "2024-03-05"),
+        ]
+        # the workers' clients share one response cache and one rate limiter
+        assert len(shared_state) == 1
+
+        fetched_partitions.clear()
+        fail_partition = False
+        run_backfill()
+        # only the partition that failed is fetched again
+        assert fetched_partitions == [("2024-01-31", "2024-02-29")]
+    finally:
+        remove_rate_limit("fixer")
+        postgresql_logging_client.execute_sql(
+            f"delete from backfill_checkpoints where backfill_name = '{backfill_name}'"
+        )
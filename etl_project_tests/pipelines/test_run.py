@@ -0,0 +1,60 @@
+import logging
+import threading
+from types import SimpleNamespace
+import pytest
+from jinja2 import Environment, FileSystemLoader
+from etl_project.pipelines import run
+from etl_project.pipelines.run import get_currencies
+
+
+def test_get_currencies_requires_usd():
+    assert get_currencies({"fixer": {"currencies": ["usd", "GBP"]}}) == ["usd", "GBP"]
+    with pytest.raises(Exception, match="must include USD"):
+        get_currencies({"fixer": {"currencies": ["GBP", "CNY"]}})
+
+
+def test_templates_select_the_configured_currencies():
+    rendered = ""
+    for folder, template_name in [
+        ("extract", "currency_exchange_rate.sql"),
+        ("transform", "stock_prices_in_currencies.sql"),
+        ("transform", "aggregated_stock_profiles.sql"),
+    ]:
+        environment = Environment(loader=FileSystemLoader(f"etl_project/assets/sql/{folder}"))
+        environment.globals["currencies"] = ["usd", "gbp"]
+        rendered += environment.get_template(template_name).render()
+
+    assert "rate_gbp" in rendered and "close_gbp" in rendered and "avg_close_gbp" in rendered
+    assert "rate_cny" not in rendered and "close_cny" not in rendered
+
+
+def test_raw_pipeline_runs_the_branches_concurrently_and_reports_failures(monkeypatch, caplog):
+    # both branches must be running at the same time to get past the barrier
+    barrier = threading.Barrier(2, timeout=5)
+    finished_branches = []
+
+    def fake_currency_pipeline(fixer_api_client, **kwargs):
+        barrier.wait()
+        raise Exception("the api went away")
+
+    def fake_stock_pipeline(market_stack_api_client, **kwargs):
+        barrier.wait()
+        finished_branches.append("MarketStack")
+
+    monkeypatch.setattr(run, "currency_pipeline", fake_currency_pipeline)
+    monkeypatch.setattr(run, "stock_pipeline", fake_stock_pipeline)
+    pipeline_logging = SimpleNamespace(logger=logging.getLogger("test_raw_pipeline"))
+
+    with caplog.at_level(logging.INFO, logger="test_raw_pipeline"):
+        with pytest.raises(Exception, match="1 raw_pipeline branches failed. Fixer: the api went away"):
+            run.raw_pipeline(
+                fixer_api_client=SimpleNamespace(response_cache=None),
+                market_stack_api_client=SimpleNamespace(),
+                postgresql_client=None,
+                pipeline_logging=pipeline_logging,
+            )
+
+    # the failing branch didn't stop the other one
+    assert finished_branches == ["MarketStack"]
+    assert "Fixer branch failed: the api went away" in caplog.messages
+    assert any(message.startswith("MarketStack branch finished") for message in caplog.messages)
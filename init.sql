@@ -14,3 +14,6 @@ BEGIN
    END IF;
 END
 $do$;
+
+-- the serving database reads the raw tables through dblink
+SELECT dblink_exec('dbname=serving', 'CREATE EXTENSION IF NOT EXISTS dblink');